@@ -0,0 +1 @@
+window.DASHBOARD_DATA = {"version":3,"range":["2026-02-02","2026-02-14"],"ranges":{"event":["2026-02-13","2026-02-14"],"screen":["2026-02-02","2026-02-02"]},"events":["apology_fix_now_tapped","apology_screen_shown","migration_confirm_accepted","migration_thank_you_done","onboarding_action","onboarding_complete","onboarding_start","onboarding_step_complete","onboarding_step_view","paywall_impression","permission_prompt","pipeline_migration_onboarding_started","plan_selected","purchase_start","purchase_success","quiz_answer","restore_completed","restore_fail","screen_view"],"countries":["AR","AU","GB","SG","SK","US"],"screens":["(not set)","OnboardingView","PHPickerViewController","PaywallView","PlatformAlertController","SettingsView","onboarding_install_sheet","onboarding_multi_quiz_But before we start,","onboarding_multi_quiz_Last one: what's you","onboarding_pain_point_question","onboarding_pain_point_stats","onboarding_personalization_loading","onboarding_quiz_And how often do you","onboarding_results_insight","onboarding_results_preview","onboarding_setup_complete","onboarding_setup_intro","onboarding_trajectory","shortcuts_check_alert","troubleshooting_modal"],"distinct_users":[2,2,2,1,10,1,8,8,10,4,6,2,3,2,2,6,8,2,11],"funnel":[{"label":"Quiz (Start)","source":"screen","name":"onboarding_multi_quiz_But before we start,"},{"label":"Results Preview","source":"screen","name":"onboarding_results_preview"},{"label":"Setup Intro","source":"screen","name":"onboarding_setup_intro"},{"label":"Pain Point","source":"screen","name":"onboarding_pain_point_question"},{"label":"Social Proof","source":"screen","name":"onboarding_social_proof"},{"label":"Setup Complete","source":"screen","name":"onboarding_setup_complete"}],"days":{"2026-02-02":{"screens":[[0,0],[1,277],[2,1],[3,20],[4,19],[5,9],[6,35],[7,16],[8,16],[9,16],[10,17],[11,16],[12,16],[13,16],[14,16],[15,12],[16,16],[17,16],[18,18],[19,8]],"retention":[18]},"2026-02-13":{"events":{"SK":[2,2,2,1,93,2,3,68,69,11,16,4,11,5,10,17,10,0,126],"US":[0,0,0,0,2,0,2,0,2,0,0,0,0,0,0,0,1,1,2]},"users":{"SK":[1,1,1,1,2,1,1,2,2,2,2,1,2,2,2,1,1,0,2],"US":[0,0,0,0,2,0,2,0,2,0,0,0,0,0,0,0,1,1,2]}},"2026-02-14":{"events":{"AR":[0,0,0,0,20,0,2,12,14,0,2,0,0,0,0,3,2,0,24],"AU":[0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,1],"GB":[0,0,0,0,19,0,1,11,12,0,2,0,0,0,0,3,1,0,20],"SG":[0,0,0,0,42,0,2,37,39,2,0,0,0,0,0,7,2,0,55],"SK":[1,1,1,0,35,0,3,23,27,4,2,2,12,0,0,3,5,0,50],"US":[0,0,0,0,30,0,3,25,28,0,2,0,0,0,0,3,3,0,39]},"users":{"AR":[0,0,0,0,1,0,1,1,1,0,1,0,0,0,0,1,1,0,1],"AU":[0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,1],"GB":[0,0,0,0,1,0,1,1,1,0,1,0,0,0,0,1,1,0,1],"SG":[0,0,0,0,1,0,1,1,1,1,0,0,0,0,0,1,1,0,1],"SK":[1,1,1,0,2,0,1,2,2,1,1,1,1,0,0,1,3,0,3],"US":[0,0,0,0,1,0,1,1,1,0,1,0,0,0,0,1,1,0,1]}}}};
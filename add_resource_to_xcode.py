@@ -2,25 +2,20 @@
 import uuid
 import re
 import sys
+from pathlib import Path
 
-def add_resource_to_xcode_project(project_file_path, file_name, file_type="text.xml"):
-    """Add a resource file to an Xcode project"""
-    
-    # Read the project file
-    try:
-        with open(project_file_path, 'r') as f:
-            content = f.read()
-    except FileNotFoundError:
-        print(f"❌ Error: Could not find project file at {project_file_path}")
-        return False
+import instrumentation
+
+def insert_resource_entries(content, file_name, file_type="text.xml", out=None):
+    """Return the project text with the resource added, or None if a section is missing"""
     
     # Generate unique IDs
     file_ref_id = str(uuid.uuid4()).replace('-', '').upper()[:24]
     build_file_id = str(uuid.uuid4()).replace('-', '').upper()[:24]
     
-    print(f"📝 Adding {file_name} to Xcode project...")
-    print(f"   File Reference ID: {file_ref_id}")
-    print(f"   Build File ID: {build_file_id}")
+    print(f"📝 Adding {file_name} to Xcode project...", file=out)
+    print(f"   File Reference ID: {file_ref_id}", file=out)
+    print(f"   Build File ID: {build_file_id}", file=out)
     
     # Step 1: Add to PBXFileReference section
     # Matches typical pbxproj section header format
@@ -28,8 +23,8 @@ def add_resource_to_xcode_project(project_file_path, file_name, file_type="text.
     file_ref_match = re.search(file_ref_pattern, content, re.DOTALL)
     
     if not file_ref_match:
-        print("❌ Could not find PBXFileReference section")
-        return False
+        print("❌ Could not find PBXFileReference section", file=out)
+        return None
     
     file_ref_entry = f'\t\t{file_ref_id} /* {file_name} */ = {{isa = PBXFileReference; lastKnownFileType = {file_type}; path = {file_name}; sourceTree = "<group>"; }};\n'
     
@@ -39,15 +34,15 @@ def add_resource_to_xcode_project(project_file_path, file_name, file_type="text.
         content[file_ref_match.end(2):]
     )
     
-    print("   ✅ Added to PBXFileReference section")
+    print("   ✅ Added to PBXFileReference section", file=out)
     
     # Step 2: Add to PBXBuildFile section
     build_file_pattern = r'(/\* Begin PBXBuildFile section \*/\s*)(.*?)(\s*/\* End PBXBuildFile section \*/)'
     build_file_match = re.search(build_file_pattern, content, re.DOTALL)
     
     if not build_file_match:
-        print("❌ Could not find PBXBuildFile section")
-        return False
+        print("❌ Could not find PBXBuildFile section", file=out)
+        return None
     
     build_file_entry = f'\t\t{build_file_id} /* {file_name} in Resources */ = {{isa = PBXBuildFile; fileRef = {file_ref_id} /* {file_name} */; }};\n'
     
@@ -57,7 +52,7 @@ def add_resource_to_xcode_project(project_file_path, file_name, file_type="text.
         content[build_file_match.end(2):]
     )
     
-    print("   ✅ Added to PBXBuildFile section")
+    print("   ✅ Added to PBXBuildFile section", file=out)
     
     # Step 3: Add to NoteWall group children
     # Find the main group for NoteWall using known ID
@@ -65,8 +60,8 @@ def add_resource_to_xcode_project(project_file_path, file_name, file_type="text.
     group_match = re.search(group_pattern, content, re.DOTALL)
     
     if not group_match:
-        print("❌ Could not find NoteWall group")
-        return False
+        print("❌ Could not find NoteWall group", file=out)
+        return None
     
     children_content = group_match.group(2)
     children_entry = f'\n\t\t\t\t{file_ref_id} /* {file_name} */,'
@@ -77,15 +72,15 @@ def add_resource_to_xcode_project(project_file_path, file_name, file_type="text.
         content[group_match.end(2):]
     )
     
-    print("   ✅ Added to NoteWall group")
+    print("   ✅ Added to NoteWall group", file=out)
     
     # Step 4: Add to PBXResourcesBuildPhase
     resources_pattern = r'(isa = PBXResourcesBuildPhase;[^}]*?files = \()(.*?)(\);)'
     resources_match = re.search(resources_pattern, content, re.DOTALL)
     
     if not resources_match:
-        print("❌ Could not find PBXResourcesBuildPhase section")
-        return False
+        print("❌ Could not find PBXResourcesBuildPhase section", file=out)
+        return None
     
     resources_entry = f'\n\t\t\t\t{build_file_id} /* {file_name} in Resources */,'
     
@@ -95,21 +90,47 @@ def add_resource_to_xcode_project(project_file_path, file_name, file_type="text.
         content[resources_match.end(2):]
     )
     
-    print("   ✅ Added to PBXResourcesBuildPhase")
+    print("   ✅ Added to PBXResourcesBuildPhase", file=out)
+    
+    return content
+
+def add_resource_to_xcode_project(project_file_path, file_name, file_type="text.xml", out=None):
+    """Add a resource file to an Xcode project, reporting progress to ``out`` (default stdout)"""
+    
+    # Read the project file
+    try:
+        with instrumentation.stage("pbxproj parse"):
+            with open(project_file_path, 'r') as f:
+                content = f.read()
+            instrumentation.record_read(project_file_path)
+    except FileNotFoundError:
+        print(f"❌ Error: Could not find project file at {project_file_path}", file=out)
+        return False
+    
+    if f'/* {file_name} in Resources */' in content:
+        print(f"✅ {file_name} is already in the Resources build phase", file=out)
+        return True
+    
+    with instrumentation.stage("mutate"):
+        content = insert_resource_entries(content, file_name, file_type, out)
+    if content is None:
+        return False
     
     # Write back to file
     try:
-        with open(project_file_path, 'w') as f:
-            f.write(content)
-        print(f"\n✅ Successfully added {file_name} to Xcode project!")
+        with instrumentation.stage("serialize"):
+            with open(project_file_path, 'w') as f:
+                f.write(content)
+            instrumentation.record_write(project_file_path)
+        print(f"\n✅ Successfully added {file_name} to Xcode project!", file=out)
         return True
     except Exception as e:
-        print(f"❌ Error writing to project file: {e}")
+        print(f"❌ Error writing to project file: {e}", file=out)
         return False
 
 if __name__ == "__main__":
-    project_file = "NoteWall.xcodeproj/project.pbxproj"
-    resource_file = "PrivacyInfo.xcprivacy"
+    project_file = str(Path(__file__).resolve().parent / "NoteWall.xcodeproj" / "project.pbxproj")
+    resource_file = sys.argv[1] if len(sys.argv) > 1 else "PrivacyInfo.xcprivacy"
     
     success = add_resource_to_xcode_project(project_file, resource_file)
     sys.exit(0 if success else 1)
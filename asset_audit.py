@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Asset Catalog Auditor
+Reports unused, missing-scale and over-resolution imagesets in an asset
+catalog, with the bytes that could be saved.
+
+Image sizes come from the PNG/JPEG headers only (no pixels are decoded), and
+the imagesets are inspected in parallel. Usage is found by scanning the Swift
+sources for Image("...") / UIImage(named: "...") calls.
+"""
+
+import argparse
+import json
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+import instrumentation
+from swift_scan import compile_scanner, find_swift_files, literal, scan_file
+
+# Largest screen the app targets, in points (iPhone Pro Max, portrait)
+MAX_SCREEN_POINTS = (440, 956)
+# Largest device scale: a lone or universal rendition is what 3x screens show
+MAX_DEVICE_SCALE = 3
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers carry the dimensions; C4/C8/CC are not frames
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+IMAGE_SCANNER = compile_scanner({
+    "image": r'\bImage\(\s*' + literal("image"),
+    "uiimage": r'\bUIImage\(\s*named:\s*' + literal("uiimage"),
+    # Any other literal may still name an image, e.g. Image(dark ? "a" : "b")
+    "literal": literal("literal"),
+})
+
+
+@dataclass
+class Rendition:
+    filename: str
+    scale: Optional[str]
+    path: str
+    bytes: int = 0
+    width: Optional[int] = None
+    height: Optional[int] = None
+    appearance: str = ""
+
+    @property
+    def scale_factor(self) -> int:
+        return int(self.scale[0]) if self.scale and self.scale[0].isdigit() else 1
+
+
+@dataclass
+class ImageSet:
+    name: str
+    path: str
+    renditions: List[Rendition] = field(default_factory=list)
+    empty_scales: List[str] = field(default_factory=list)
+    missing_files: List[str] = field(default_factory=list)
+    stray_files: List[str] = field(default_factory=list)
+
+    @property
+    def bytes(self) -> int:
+        return sum(r.bytes for r in self.renditions)
+
+
+@dataclass
+class Finding:
+    imageset: str
+    kind: str
+    message: str
+    savings: int = 0
+
+
+def image_size(path) -> Optional[Tuple[int, int]]:
+    """(width, height) from a PNG or JPEG header, or None for other formats"""
+    with open(path, "rb") as f:
+        head = f.read(24)
+        if head.startswith(PNG_SIGNATURE) and head[12:16] in (b"IHDR", b"CgBI"):
+            if head[12:16] == b"CgBI":
+                # Xcode-crushed PNG: a CgBI chunk precedes the usual IHDR
+                f.seek(8 + 12 + struct.unpack(">I", head[8:12])[0])
+                head = head[:8] + f.read(16)
+            return struct.unpack(">II", head[16:24])
+        if head.startswith(b"\xff\xd8"):
+            return _jpeg_size(f)
+    return None
+
+
+def _jpeg_size(f) -> Optional[Tuple[int, int]]:
+    # Walk the segment headers, skipping each segment body, until a frame header
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue
+        header = f.read(2)
+        if len(header) < 2:
+            return None
+        length = struct.unpack(">H", header)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, 1)
+
+
+def inspect_imageset(directory: Path) -> ImageSet:
+    """Parse one imageset's Contents.json and read each rendition's header"""
+    imageset = ImageSet(name=directory.stem, path=str(directory))
+    with open(directory / "Contents.json", "r", encoding="utf-8") as f:
+        contents = json.load(f)
+    instrumentation.record_read(directory / "Contents.json")
+
+    listed = set()
+    for entry in contents.get("images", []):
+        appearance = ",".join(a.get("value", "") for a in entry.get("appearances", []))
+        filename = entry.get("filename")
+        if not filename:
+            if entry.get("scale"):
+                imageset.empty_scales.append(entry["scale"] + (f" ({appearance})" if appearance else ""))
+            continue
+        listed.add(filename)
+        file_path = directory / filename
+        if not file_path.exists():
+            imageset.missing_files.append(filename)
+            continue
+        rendition = Rendition(filename=filename, scale=entry.get("scale"), path=str(file_path),
+                              bytes=file_path.stat().st_size, appearance=appearance)
+        size = image_size(file_path)
+        instrumentation.record_read(file_path, 24)
+        if size:
+            rendition.width, rendition.height = size
+        imageset.renditions.append(rendition)
+
+    imageset.stray_files = sorted(
+        p.name for p in directory.iterdir()
+        if p.is_file() and p.name != "Contents.json" and p.name not in listed
+    )
+    return imageset
+
+
+def load_catalog(catalog: Path, max_workers: Optional[int] = None) -> List[ImageSet]:
+    """Inspect every imageset in the catalog (including inside folders) in parallel"""
+    directories = sorted(catalog.rglob("*.imageset"))
+    with instrumentation.stage("read catalog"):
+        # Header reads are tiny and I/O bound, so threads are enough
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(inspect_imageset, directories))
+
+
+def find_image_references(swift_roots: List[Path]) -> Tuple[Set[str], Set[str]]:
+    """(names passed directly to Image/UIImage, every other string literal)"""
+    direct, literals = set(), set()
+    with instrumentation.stage("scan swift"):
+        for path in find_swift_files(swift_roots):
+            for kind, text, _, _ in scan_file(path, IMAGE_SCANNER):
+                (literals if kind == "literal" else direct).add(text)
+    return direct, literals
+
+
+def _display_scale(imageset: ImageSet, rendition: Rendition) -> int:
+    """Largest screen scale the rendition is shown at
+
+    iOS falls back to the only rendition of an appearance (or a universal one)
+    on every screen, so those must hold up at the largest device scale.
+    """
+    siblings = [r for r in imageset.renditions if r.appearance == rendition.appearance]
+    if rendition.scale is None or len(siblings) == 1:
+        return MAX_DEVICE_SCALE
+    return rendition.scale_factor
+
+
+def _over_resolution(rendition: Rendition, max_points: Tuple[int, int],
+                     scale: Optional[int] = None) -> Optional[Tuple[float, int]]:
+    """(downscale ratio, bytes saved) when a rendition exceeds the largest screen at ``scale``"""
+    if not rendition.width or not rendition.height:
+        return None
+    short_limit, long_limit = (p * (scale or rendition.scale_factor) for p in sorted(max_points))
+    short_side, long_side = sorted((rendition.width, rendition.height))
+    ratio = min(short_limit / short_side, long_limit / long_side)
+    if ratio >= 1:
+        return None
+    # Encoded size scales roughly with pixel count
+    return ratio, int(rendition.bytes * (1 - ratio * ratio))
+
+
+def audit(imagesets: List[ImageSet], direct: Set[str], literals: Set[str],
+          max_points: Tuple[int, int] = MAX_SCREEN_POINTS) -> List[Finding]:
+    findings = []
+    for imageset in imagesets:
+        name = imageset.name
+        if name not in direct:
+            if name in literals:
+                findings.append(Finding(name, "indirect", "only referenced through a string literal; check it is used"))
+            else:
+                findings.append(Finding(name, "unused", "no Image()/UIImage(named:) reference or literal found",
+                                        imageset.bytes))
+                # Nothing else about an unused imageset matters
+                continue
+
+        for filename in imageset.missing_files:
+            findings.append(Finding(name, "missing-file", f"{filename} is listed in Contents.json but does not exist"))
+        for filename in imageset.stray_files:
+            size = (Path(imageset.path) / filename).stat().st_size
+            findings.append(Finding(name, "stray-file", f"{filename} is not listed in Contents.json", size))
+
+        if imageset.empty_scales and imageset.renditions:
+            findings.append(Finding(name, "missing-scale", f"no image for {', '.join(imageset.empty_scales)}"))
+
+        base = min(imageset.renditions, key=lambda r: r.scale_factor, default=None)
+        for rendition in imageset.renditions:
+            if rendition.scale_factor != base.scale_factor and rendition.width \
+                    and (rendition.width, rendition.height) == (base.width, base.height):
+                findings.append(Finding(name, "scale-mismatch",
+                                        f"{rendition.filename} ({rendition.scale}) has the same pixel size as "
+                                        f"{base.filename} ({base.scale})", rendition.bytes))
+                continue
+            scale = _display_scale(imageset, rendition)
+            over = _over_resolution(rendition, max_points, scale)
+            if over:
+                ratio, savings = over
+                findings.append(Finding(name, "over-resolution",
+                                        f"{rendition.filename} is {rendition.width}x{rendition.height}, shown "
+                                        f"at up to {scale}x, larger than the largest screen; "
+                                        f"{ratio:.0%} of that size is enough",
+                                        savings))
+    return findings
+
+
+def audit_catalog(catalog: Path, swift_roots: List[Path], max_workers: Optional[int] = None,
+                  max_points: Tuple[int, int] = MAX_SCREEN_POINTS) -> dict:
+    imagesets = load_catalog(catalog, max_workers)
+    direct, literals = find_image_references(swift_roots)
+    findings = audit(imagesets, direct, literals, max_points)
+    return {
+        "catalog": str(catalog),
+        "imagesets": len(imagesets),
+        "bytes": sum(s.bytes for s in imagesets),
+        "savings": sum(f.savings for f in findings),
+        "findings": [asdict(f) for f in findings],
+        "renditions": {s.name: [asdict(r) for r in s.renditions] for s in imagesets},
+    }
+
+
+def _format_bytes(count: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if count < 1024 or unit == "MB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def main(argv=None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Audit an asset catalog for unused and oversized images")
+    parser.add_argument("catalog", nargs="?", type=Path, default=root / "NoteWall" / "Assets.xcassets")
+    parser.add_argument("--swift-root", action="append", type=Path,
+                        help="folder of Swift sources to scan (default: the catalog's parent)")
+    parser.add_argument("--max-points", type=int, nargs=2, metavar=("W", "H"), default=MAX_SCREEN_POINTS,
+                        help="largest screen size in points (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    swift_roots = args.swift_root or [args.catalog.parent]
+    report = audit_catalog(args.catalog, swift_roots, max_points=tuple(args.max_points))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"🖼  {report['imagesets']} imagesets, {_format_bytes(report['bytes'])}")
+    for finding in report["findings"]:
+        savings = f" (saves ~{_format_bytes(finding['savings'])})" if finding["savings"] else ""
+        print(f"   {finding['imageset']}: {finding['kind']}: {finding['message']}{savings}")
+    print(f"\n💾 Potential savings: {_format_bytes(report['savings'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
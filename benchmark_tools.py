@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Tooling Benchmarks
+Times the hot paths of the localization, Xcode project and analytics scripts
+on seeded synthetic inputs at several sizes, and compares against a stored
+baseline to catch regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BASELINE = ROOT / "benchmark-baseline.json"
+
+SIZES = {"small": 1, "medium": 10, "large": 50}
+LANGUAGES = ["en", "de", "es", "fr"]
+
+WORDS = (
+    "note wallpaper lock screen update delete settings premium widget shortcut focus "
+    "reminder goal daily habit text style background photo library permission continue "
+    "restore purchase trial onboarding quiz answer step preview install help support"
+).split()
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus generators
+# ---------------------------------------------------------------------------
+
+def _phrase(rng: random.Random, low: int = 2, high: int = 7) -> str:
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return " ".join(words).capitalize()
+
+
+def generate_swift_files(directory: Path, literal_count: int, rng: random.Random,
+                         literals_per_file: int = 200) -> List[str]:
+    """SwiftUI view files with ``literal_count`` Text() literals in total"""
+    directory.mkdir(parents=True, exist_ok=True)
+    phrases = [_phrase(rng) for _ in range(max(literal_count // 3, 1))]
+    file_count = max(1, -(-literal_count // literals_per_file))
+    remaining = literal_count
+    for index in range(file_count):
+        count = min(literals_per_file, remaining)
+        remaining -= count
+        lines = ["import SwiftUI", "", f"struct GeneratedView{index}: View {{",
+                 "    var body: some View {", "        VStack {"]
+        for i in range(count):
+            text = rng.choice(phrases)
+            kind = i % 5
+            if kind == 0:
+                lines.append(f'            Text("{text}")')
+            elif kind == 1:
+                lines.append(f'            Text("{text}")\n                .font(.headline)')
+            elif kind == 2:
+                lines.append(f'            Button(action: {{}}) {{ Text("{text}") }}')
+            elif kind == 3:
+                lines.append(f'            Text("{text} \\(count)")')
+            else:
+                lines.append(f'            .alert(isPresented: $show) {{ Alert(title: Text("{text}")) }}')
+        lines += ["        }", "    }", "}", ""]
+        (directory / f"GeneratedView{index}.swift").write_text("\n".join(lines), encoding="utf-8")
+    return phrases
+
+
+def generate_strings_catalogs(notewall_dir: Path, entry_count: int, rng: random.Random,
+                              languages: List[str] = LANGUAGES):
+    """Localizable.strings with ``entry_count`` entries for every locale"""
+    keys = sorted({f"{_phrase(rng)} {i}" for i in range(entry_count)})
+    for lang in languages:
+        lines = [f"/* Localizable.strings ({lang}) */", ""]
+        for key in keys:
+            value = key if lang == "en" else f"[{lang}] {key}"
+            lines.append(f'"{key}" = "{value}";')
+        lproj = notewall_dir / f"{lang}.lproj"
+        lproj.mkdir(parents=True, exist_ok=True)
+        (lproj / "Localizable.strings").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return keys
+
+
+def _object_id(rng: random.Random) -> str:
+    return "".join(rng.choices("0123456789ABCDEF", k=24))
+
+
+def generate_pbxproj(path: Path, object_count: int, rng: random.Random):
+    """A project.pbxproj with roughly ``object_count`` file refs and build files"""
+    file_refs, build_files, children, resources = [], [], [], []
+    for i in range(object_count // 2):
+        ref_id, build_id = _object_id(rng), _object_id(rng)
+        if i % 4 == 0:
+            name, file_type = "Contents.json", "text.json"
+        elif i % 4 == 1:
+            name, file_type = f"mockup_{i}.png", "image.png"
+        else:
+            name, file_type = f"Resource{i}.json", "text.json"
+        file_refs.append(
+            f'\t\t{ref_id} /* {name} */ = {{isa = PBXFileReference; lastKnownFileType = {file_type}; '
+            f'path = {name}; sourceTree = "<group>"; }};'
+        )
+        build_files.append(
+            f'\t\t{build_id} /* {name} in Resources */ = {{isa = PBXBuildFile; fileRef = {ref_id} /* {name} */; }};'
+        )
+        children.append(f"\t\t\t\t{ref_id} /* {name} */,")
+        resources.append(f"\t\t\t\t{build_id} /* {name} in Resources */,")
+
+    text = "\n".join([
+        "// !$*UTF8*$!",
+        "{",
+        "\tarchiveVersion = 1;",
+        "\tclasses = {",
+        "\t};",
+        "\tobjectVersion = 56;",
+        "\tobjects = {",
+        "",
+        "/* Begin PBXBuildFile section */",
+        *build_files,
+        "/* End PBXBuildFile section */",
+        "",
+        "/* Begin PBXFileReference section */",
+        *file_refs,
+        "/* End PBXFileReference section */",
+        "",
+        "/* Begin PBXGroup section */",
+        "\t\tA5000002000000000000001 /* NoteWall */ = {",
+        "\t\t\tisa = PBXGroup;",
+        "\t\t\tchildren = (",
+        *children,
+        "\t\t\t);",
+        "\t\t\tpath = NoteWall;",
+        '\t\t\tsourceTree = "<group>";',
+        "\t\t};",
+        "/* End PBXGroup section */",
+        "",
+        "/* Begin PBXResourcesBuildPhase section */",
+        "\t\tA5000009000000000000001 /* Resources */ = {",
+        "\t\t\tisa = PBXResourcesBuildPhase;",
+        "\t\t\tbuildActionMask = 2147483647;",
+        "\t\t\tfiles = (",
+        *resources,
+        "\t\t\t);",
+        "\t\t\trunOnlyForDeploymentPostprocessing = 0;",
+        "\t\t};",
+        "/* End PBXResourcesBuildPhase section */",
+        "\t};",
+        "\trootObject = A5000001000000000000001 /* Project object */;",
+        "}",
+        "",
+    ])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+EVENT_NAMES = [
+    ("screen_view", 30), ("onboarding_action", 22), ("onboarding_step_view", 17),
+    ("onboarding_step_complete", 16), ("quiz_answer", 4), ("paywall_impression", 2),
+    ("permission_prompt", 2), ("plan_selected", 2), ("restore_completed", 2),
+    ("onboarding_start", 1), ("purchase_success", 1), ("onboarding_complete", 1),
+]
+COUNTRIES = [("US", 30), ("GB", 15), ("SK", 15), ("DE", 10), ("SG", 10), ("AR", 10), ("AU", 10)]
+
+
+def generate_event_csv(path: Path, row_count: int, rng: random.Random,
+                       user_count: Optional[int] = None, days: int = 30):
+    """A Mixpanel-style export with ``row_count`` events, newest first"""
+    user_count = user_count or max(row_count // 60, 1)
+    users = [f"$device:{_object_id(rng)[:8]}-{_object_id(rng)[:4]}" for _ in range(user_count)]
+    countries = [rng.choices([c for c, _ in COUNTRIES], [w for _, w in COUNTRIES])[0] for _ in users]
+    names = [n for n, _ in EVENT_NAMES]
+    weights = [w for _, w in EVENT_NAMES]
+
+    start = 1_771_000_000.0
+    times = sorted((start + rng.random() * days * 86400 for _ in range(row_count)), reverse=True)
+    user_index = rng.choices(range(user_count), k=row_count)
+    events = rng.choices(names, weights, k=row_count)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("Event Name,Time,Distinct ID,City,Country,Operating System\n")
+        for t, u, e in zip(times, user_index, events):
+            f.write(f"{e},{t:.3f},{users[u]},City,{countries[u]},iOS\n")
+
+
+# ---------------------------------------------------------------------------
+# Benchmark cases
+# ---------------------------------------------------------------------------
+
+# A case gets (workdir, scale, rng) and returns (size parameter, run, reset)
+Case = Callable[[Path, int, random.Random], Tuple[int, Callable[[], object], Optional[Callable[[], None]]]]
+
+
+def case_extract(workdir: Path, scale: int, rng: random.Random):
+    from localize_app import extract_all_strings
+
+    n = 200 * scale
+    generate_swift_files(workdir / "NoteWall", n, rng)
+    return n, lambda: extract_all_strings(workdir / "NoteWall", verbose=False), None
+
+
+def case_catalog_parse(workdir: Path, scale: int, rng: random.Random):
+    from localize_app import read_existing_translations
+
+    m = 200 * scale
+    generate_strings_catalogs(workdir / "NoteWall", m, rng)
+    paths = [str(workdir / "NoteWall" / f"{lang}.lproj" / "Localizable.strings") for lang in LANGUAGES]
+    return m, lambda: [read_existing_translations(p) for p in paths], None
+
+
+def case_catalog_write(workdir: Path, scale: int, rng: random.Random):
+    from localize_app import write_localizable_file
+
+    m = 200 * scale
+    translations = {f"{_phrase(rng)} {i}": _phrase(rng) for i in range(m)}
+    out = workdir / "Localizable.strings"
+
+    def run():
+        for lang in LANGUAGES:
+            write_localizable_file(str(out), translations, lang)
+    return m, run, None
+
+
+def case_categorize(workdir: Path, scale: int, rng: random.Random):
+    from localize_app import categorize_strings
+
+    m = 200 * scale
+    texts = [f"{_phrase(rng)} {i}" for i in range(m)] + ["Continue", "Settings", "Get Premium"]
+    return m, lambda: categorize_strings(texts), None
+
+
+def case_sync_strings(workdir: Path, scale: int, rng: random.Random):
+    from localize_app import sync_strings
+
+    n = 200 * scale
+    notewall_dir = workdir / "NoteWall"
+    generate_swift_files(notewall_dir, n, rng)
+    generate_strings_catalogs(notewall_dir, n // 2, rng)
+    snapshot = workdir / "snapshot"
+    shutil.copytree(notewall_dir, snapshot)
+
+    def reset():
+        shutil.rmtree(notewall_dir)
+        shutil.copytree(snapshot, notewall_dir)
+    return n, lambda: sync_strings(notewall_dir), reset
+
+
+def _pbxproj_case(workdir: Path, scale: int, rng: random.Random):
+    k = 200 * scale
+    project = workdir / "project.pbxproj"
+    generate_pbxproj(project, k, rng)
+    pristine = project.read_bytes()
+    return k, project, lambda: project.write_bytes(pristine)
+
+
+def case_resource_add(workdir: Path, scale: int, rng: random.Random):
+    from add_resource_to_xcode import add_resource_to_xcode_project
+
+    k, project, reset = _pbxproj_case(workdir, scale, rng)
+    return k, lambda: add_resource_to_xcode_project(str(project), "PrivacyInfo.xcprivacy"), reset
+
+
+def case_resource_prune(workdir: Path, scale: int, rng: random.Random):
+    from fix_xcode_resources import fix_xcode_project
+
+    k, project, reset = _pbxproj_case(workdir, scale, rng)
+    return k, lambda: fix_xcode_project(str(project)), reset
+
+
+def case_events_load(workdir: Path, scale: int, rng: random.Random):
+    from event_store import load_event_export
+
+    r = 10_000 * scale
+    path = workdir / "events-export.csv"
+    generate_event_csv(path, r, rng)
+    return r, lambda: load_event_export(str(path)), None
+
+
+def case_retention(workdir: Path, scale: int, rng: random.Random):
+    from event_store import load_event_export
+    from retention import retention_matrix, sessionize
+
+    r = 10_000 * scale
+    path = workdir / "events-export.csv"
+    generate_event_csv(path, r, rng)
+    store = load_event_export(str(path))
+    return r, lambda: (sessionize(store), retention_matrix(store)), None
+
+
+def case_dashboard(workdir: Path, scale: int, rng: random.Random):
+    from build_dashboard_data import build_dashboard_data
+
+    r = 10_000 * scale
+    exports = workdir / "exports"
+    exports.mkdir()
+    generate_event_csv(exports / "events-export.csv", r, rng)
+    output = workdir / "dashboard-data.json"
+    cache = workdir / ".dashboard-cache.json"
+
+    def reset():
+        cache.unlink(missing_ok=True)
+    return r, lambda: build_dashboard_data(str(exports), str(output), str(cache)), reset
+
+
+CASES: Dict[str, Case] = {
+    "extract": case_extract,
+    "catalog-parse": case_catalog_parse,
+    "catalog-write": case_catalog_write,
+    "categorize": case_categorize,
+    "sync-strings": case_sync_strings,
+    "resource-add": case_resource_add,
+    "resource-prune": case_resource_prune,
+    "events-load": case_events_load,
+    "retention": case_retention,
+    "dashboard": case_dashboard,
+}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def run_case(name: str, size: str, repeats: int, seed: int) -> dict:
+    """Time one case at one size; setup and resets are not timed"""
+    rng = random.Random(f"{seed}:{name}:{size}")
+    with tempfile.TemporaryDirectory(prefix=f"nw-bench-{name}-") as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            n, run, reset = CASES[name](Path(tmp), SIZES[size], rng)
+            timings = []
+            for _ in range(repeats):
+                if reset:
+                    reset()
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+    return {"n": n, "min": min(timings), "median": statistics.median(timings)}
+
+
+def run_benchmarks(cases: List[str], sizes: List[str], repeats: int = 3, seed: int = 1234) -> dict:
+    results: Dict[str, Dict[str, dict]] = {}
+    for name in cases:
+        for size in sizes:
+            results.setdefault(name, {})[size] = run_case(name, size, repeats, seed)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[dict]:
+    """Cases whose best time grew by more than ``tolerance`` over the baseline"""
+    regressions = []
+    for name, sizes in current["results"].items():
+        for size, result in sizes.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if not base or base.get("n") != result["n"] or base["min"] <= 0:
+                continue
+            ratio = result["min"] / base["min"]
+            result["baseline_ratio"] = round(ratio, 3)
+            if ratio > 1 + tolerance:
+                regressions.append({"case": name, "size": size, "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the NoteWall tooling hot paths")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--sizes", default="small,medium", help=f"comma-separated sizes from {list(SIZES)}")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES] + [c for c in args.cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown cases or sizes: {', '.join(unknown)}")
+
+    current = run_benchmarks(args.cases or list(CASES), sizes, args.repeats, args.seed)
+
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(current, baseline, args.tolerance)
+    current["regressions"] = regressions
+
+    print(f"{'case':<16}{'size':<8}{'n':>9}{'min (ms)':>12}{'median (ms)':>13}{'vs base':>9}")
+    for name, results in current["results"].items():
+        for size, result in results.items():
+            ratio = result.get("baseline_ratio")
+            marker = f"{ratio:.2f}x" if ratio else "-"
+            print(f"{name:<16}{size:<8}{result['n']:>9}{result['min'] * 1000:>12.2f}"
+                  f"{result['median'] * 1000:>13.2f}{marker:>9}")
+
+    payload = json.dumps(current, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n", encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(payload + "\n", encoding="utf-8")
+        print(f"\n💾 Saved baseline to {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.tolerance:.0%}:")
+        for item in regressions:
+            print(f"   {item['case']} [{item['size']}]: {item['ratio']}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
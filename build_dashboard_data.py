@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Dashboard Data Builder
+Precomputes the AnalyticsDashboard aggregates from the CSV exports into a
+compact JSON file, binned per day and per country, plus a script copy of it
+that index.html loads directly (fetch() is blocked for file:// pages).
+
+Work is incremental: unchanged source files are not re-read, and inside a
+changed file only the days whose rows changed are re-aggregated. Days that
+several event exports cover with different rows are re-aggregated across
+those exports, counting each event once.
+"""
+
+import csv
+import hashlib
+import heapq
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import instrumentation
+from firebase_reports import is_firebase_report, parse_report
+
+OUTPUT_NAME = "dashboard-data.json"
+SCRIPT_NAME = "dashboard-data.js"
+CACHE_NAME = ".dashboard-cache.json"
+CACHE_VERSION = 3
+
+ALL_COUNTRIES = "*"
+MASK64 = (1 << 64) - 1
+# User hashes kept per day and event for distinct counts over a date range
+SKETCH_SIZE = 256
+
+# Funnel stages as (label, source, name). "screen" stages count Firebase
+# screen views; the Mixpanel exports cover other days, so event counts
+# (onboarding_start, purchase_success) are kept out of the funnel and shown
+# as the dashboard's metric cards instead.
+FUNNEL_STAGES = [
+    ("Quiz (Start)", "screen", "onboarding_multi_quiz_But before we start,"),
+    ("Results Preview", "screen", "onboarding_results_preview"),
+    ("Setup Intro", "screen", "onboarding_setup_intro"),
+    ("Pain Point", "screen", "onboarding_pain_point_question"),
+    ("Social Proof", "screen", "onboarding_social_proof"),
+    ("Setup Complete", "screen", "onboarding_setup_complete"),
+]
+
+SCREEN_COLUMNS = ("Page path and screen class", "Page title and screen class")
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _bottom_k(hashes: Iterable[int]) -> List[int]:
+    """The SKETCH_SIZE smallest distinct hashes, ascending"""
+    return heapq.nsmallest(SKETCH_SIZE, set(hashes))
+
+
+def _sketch_count(sketch: List[int]) -> int:
+    """Distinct values behind a bottom-k sketch; exact below SKETCH_SIZE"""
+    if len(sketch) < SKETCH_SIZE:
+        return len(sketch)
+    # The k-th smallest of n uniform hashes sits near k/n of the hash range
+    return round((SKETCH_SIZE - 1) * (MASK64 + 1) / (sketch[-1] + 1))
+
+
+def _file_fingerprint(path: Path) -> List[int]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _day_from_epoch(value: str) -> str:
+    return datetime.fromtimestamp(float(value), tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _day_from_firebase(value: str) -> str:
+    return f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+
+
+# ---------------------------------------------------------------------------
+# Mixpanel event exports
+# ---------------------------------------------------------------------------
+
+def is_event_export(path: str) -> bool:
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            header = f.readline()
+    except (OSError, UnicodeDecodeError):
+        return False
+    return header.startswith("Event Name,") and "Distinct ID" in header
+
+
+def _iter_event_rows(path: Path) -> Iterator[Tuple[str, List[str], Dict[str, int]]]:
+    """Yield (day, row, column index) for every event in an export"""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        index = {name: i for i, name in enumerate(header)}
+        time_idx = index["Time"]
+        for row in reader:
+            if row:
+                yield _day_from_epoch(row[time_idx]), row, index
+
+
+def _event_day_digests(path: Path) -> Dict[str, Tuple[str, int]]:
+    """Order-independent digest and row count of each day's rows"""
+    sums: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    for day, row, _ in _iter_event_rows(path):
+        sums[day] = (sums.get(day, 0) + _hash64(",".join(row))) & MASK64
+        counts[day] = counts.get(day, 0) + 1
+    return {day: (f"{sums[day]:016x}", counts[day]) for day in sums}
+
+
+def _event_key(row: List[str], index: Dict[str, int]) -> int:
+    """Identity of an event across exports: its insert ID, else event, time and user"""
+    if "$insert_id" in index and row[index["$insert_id"]]:
+        return _hash64(row[index["$insert_id"]])
+    return _hash64("\x1f".join((row[index["Event Name"]], row[index["Time"]], row[index["Distinct ID"]])))
+
+
+def _event_partials(paths: List[Path], days: Set[str]) -> Dict[str, dict]:
+    """Aggregate event counts and distinct users per country for the given days
+
+    With several exports, an event already seen in an earlier export is not
+    counted again. Besides the per-day user counts, a bottom-k sketch of user
+    hashes per event lets users active on several days be counted once over
+    the whole range without keeping their IDs.
+    """
+    counts: Dict[str, Dict[str, Dict[str, int]]] = {}
+    users: Dict[str, Dict[str, Dict[str, set]]] = {}
+    seen: Dict[str, Set[int]] = {}
+
+    for path in paths:
+        added: Dict[str, Set[int]] = {}
+        for day, row, index in _iter_event_rows(path):
+            if day not in days:
+                continue
+            if len(paths) > 1:
+                key = _event_key(row, index)
+                if key in seen.get(day, ()):
+                    continue
+                added.setdefault(day, set()).add(key)
+            event = row[index["Event Name"]]
+            country = row[index["Country"]] if "Country" in index else ALL_COUNTRIES
+            country = country or ALL_COUNTRIES
+
+            day_counts = counts.setdefault(day, {}).setdefault(country, {})
+            day_counts[event] = day_counts.get(event, 0) + 1
+            users.setdefault(day, {}).setdefault(country, {}).setdefault(event, set()).add(
+                _hash64(row[index["Distinct ID"]])
+            )
+        for day, keys in added.items():
+            seen.setdefault(day, set()).update(keys)
+
+    partials = {}
+    for day in days:
+        day_users = users.get(day, {})
+        by_event: Dict[str, Set[int]] = {}
+        for events in day_users.values():
+            for event, ids in events.items():
+                by_event.setdefault(event, set()).update(ids)
+        partials[day] = {
+            "events": counts.get(day, {}),
+            "users": {
+                country: {event: len(ids) for event, ids in events.items()}
+                for country, events in day_users.items()
+            },
+            "sketch": {event: _bottom_k(ids) for event, ids in sorted(by_event.items())},
+        }
+    return partials
+
+
+# ---------------------------------------------------------------------------
+# Firebase reports
+# ---------------------------------------------------------------------------
+
+def _firebase_day_rows(path: Path) -> Dict[str, dict]:
+    """Collect single-day screen views and Nth-day retention from a report"""
+    days: Dict[str, dict] = {}
+    report = parse_report(str(path))
+
+    for table in report.tables:
+        if not table.start_date or table.start_date != table.end_date:
+            continue
+        day = _day_from_firebase(table.start_date)
+
+        screen_column = next((c for c in SCREEN_COLUMNS if c in table.columns), None)
+        if screen_column and "Views" in table.columns:
+            screens = days.setdefault(day, {}).setdefault("screens", {})
+            for name, views in zip(table.data[screen_column], table.data["Views"]):
+                screens[name] = max(screens.get(name, 0), int(views))
+        elif table.columns[:1] == ["Nth day"] and "Active users" in table.columns:
+            retention = days.setdefault(day, {}).setdefault("retention", [])
+            for nth, active in zip(table.data["Nth day"], table.data["Active users"]):
+                nth = int(nth)
+                if nth >= len(retention):
+                    retention.extend([0] * (nth + 1 - len(retention)))
+                retention[nth] = int(active)
+    return days
+
+
+def _firebase_day_digests(rows: Dict[str, dict]) -> Dict[str, Tuple[str, int]]:
+    digests = {}
+    for day, data in rows.items():
+        blob = json.dumps(data, sort_keys=True)
+        size = len(data.get("screens", {})) + len(data.get("retention", []))
+        digests[day] = (hashlib.blake2b(blob.encode("utf-8"), digest_size=8).hexdigest(), size)
+    return digests
+
+
+# ---------------------------------------------------------------------------
+# Incremental build
+# ---------------------------------------------------------------------------
+
+def _load_cache(cache_path: Path) -> dict:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {"version": CACHE_VERSION, "files": {}}
+    if cache.get("version") != CACHE_VERSION:
+        return {"version": CACHE_VERSION, "files": {}}
+    return cache
+
+
+def find_sources(source_dir: Path) -> List[Tuple[str, Path]]:
+    """Return (kind, path) for every event export and Firebase report"""
+    sources = []
+    for path in sorted(source_dir.glob("*.csv")):
+        if is_event_export(str(path)):
+            sources.append(("events", path))
+        elif is_firebase_report(str(path)):
+            sources.append(("firebase", path))
+    return sources
+
+
+def _update_file(kind: str, path: Path, cached: Optional[dict]) -> Tuple[dict, int]:
+    """Refresh one source file's per-day partials, returning (entry, days recomputed)"""
+    fingerprint = _file_fingerprint(path)
+    if cached and cached.get("fingerprint") == fingerprint:
+        instrumentation.record_cache(True)
+        return cached, 0
+    instrumentation.record_cache(False)
+
+    cached_days = (cached or {}).get("days", {})
+
+    instrumentation.record_read(path)
+    if kind == "events":
+        digests = _event_day_digests(path)
+    else:
+        firebase_rows = _firebase_day_rows(path)
+        digests = _firebase_day_digests(firebase_rows)
+
+    changed = {
+        day for day, (digest, _) in digests.items()
+        if cached_days.get(day, {}).get("digest") != digest
+    }
+
+    if kind == "events":
+        fresh = _event_partials([path], changed) if changed else {}
+    else:
+        fresh = {day: firebase_rows[day] for day in changed}
+
+    days = {}
+    for day, (digest, rows) in digests.items():
+        partial = fresh[day] if day in changed else cached_days[day]["partial"]
+        days[day] = {"digest": digest, "rows": rows, "partial": partial}
+
+    return {"kind": kind, "fingerprint": fingerprint, "days": days}, len(changed)
+
+
+def _event_sources(files: Dict[str, dict]) -> Dict[str, List[List[str]]]:
+    """[path, digest] of every event export with rows on each day"""
+    sources: Dict[str, List[List[str]]] = {}
+    for path in sorted(files):
+        if files[path]["kind"] == "events":
+            for day, data in files[path]["days"].items():
+                sources.setdefault(day, []).append([path, data["digest"]])
+    return sources
+
+
+def _update_overlaps(files: Dict[str, dict], cached: Dict[str, dict]) -> Tuple[Dict[str, dict], int]:
+    """Partials for days that event exports cover with different rows
+
+    Such a day is re-aggregated from all of its exports together, so rows
+    found in more than one export count once and rows found in only one are
+    kept. The result is reused until one of those exports changes the day.
+    Returns (overlaps by day, days recomputed).
+    """
+    overlaps = {}
+    stale: Dict[str, List[List[str]]] = {}
+    for day, found in _event_sources(files).items():
+        if len({digest for _, digest in found}) < 2:
+            continue  # one export, or identical copies of the same rows
+        if cached.get(day, {}).get("sources") == found:
+            overlaps[day] = cached[day]
+        else:
+            stale[day] = found
+
+    if stale:
+        paths = sorted({path for found in stale.values() for path, _ in found})
+        for path in paths:
+            instrumentation.record_read(path)
+        fresh = _event_partials([Path(path) for path in paths], set(stale))
+        for day, found in stale.items():
+            overlaps[day] = {"sources": found, "partial": fresh[day]}
+    return overlaps, len(stale)
+
+
+def _merge_days(files: Dict[str, dict], overlaps: Dict[str, dict]) -> Dict[str, dict]:
+    """Combine per-file partials into one partial per day
+
+    Several exports often cover the same day. Event exports holding the same
+    rows for a day share one partial, and days they cover differently come
+    from ``overlaps``; Firebase reports are merged by taking the maximum per
+    screen and per Nth day. Either way repeated or overlapping exports are
+    not double counted.
+    """
+    merged: Dict[str, dict] = {}
+
+    for path in sorted(files):
+        entry = files[path]
+        for day, data in entry["days"].items():
+            partial = data["partial"]
+            if entry["kind"] == "events":
+                partial = overlaps[day]["partial"] if day in overlaps else partial
+                merged.setdefault(day, {}).update(partial)
+                continue
+
+            target = merged.setdefault(day, {})
+            screens = target.setdefault("screens", {})
+            for name, views in partial.get("screens", {}).items():
+                screens[name] = max(screens.get(name, 0), views)
+            retention = target.setdefault("retention", [])
+            for nth, active in enumerate(partial.get("retention", [])):
+                if nth >= len(retention):
+                    retention.append(active)
+                else:
+                    retention[nth] = max(retention[nth], active)
+    return merged
+
+
+def _compact(merged: Dict[str, dict]) -> dict:
+    """Turn merged partials into the dashboard's array-based layout"""
+    events: Set[str] = set()
+    countries: Set[str] = set()
+    screens: Set[str] = set()
+    for partial in merged.values():
+        for country, counts in partial.get("events", {}).items():
+            countries.add(country)
+            events.update(counts)
+        screens.update(partial.get("screens", {}))
+
+    event_names = sorted(events)
+    country_names = sorted(countries)
+    screen_names = sorted(screens)
+    event_index = {name: i for i, name in enumerate(event_names)}
+    screen_index = {name: i for i, name in enumerate(screen_names)}
+    sketches: Dict[str, List[List[int]]] = {name: [] for name in event_names}
+
+    def vector(counts: Dict[str, int]) -> List[int]:
+        values = [0] * len(event_names)
+        for name, count in counts.items():
+            values[event_index[name]] = count
+        return values
+
+    days = {}
+    for day in sorted(merged):
+        partial = merged[day]
+        entry = {}
+        if partial.get("events"):
+            entry["events"] = {c: vector(v) for c, v in sorted(partial["events"].items())}
+            entry["users"] = {}
+            for country, users in sorted(partial["users"].items()):
+                entry["users"][country] = vector(users)
+            for event, sketch in partial["sketch"].items():
+                sketches[event].append(sketch)
+        if partial.get("screens"):
+            entry["screens"] = sorted(
+                [screen_index[name], views] for name, views in partial["screens"].items()
+            )
+        if partial.get("retention"):
+            entry["retention"] = partial["retention"]
+        days[day] = entry
+
+    def day_range(key: str) -> List[str]:
+        covered = [day for day, entry in days.items() if key in entry]
+        return [min(covered), max(covered)] if covered else []
+
+    return {
+        "version": CACHE_VERSION,
+        "range": [min(days), max(days)] if days else [],
+        # Mixpanel events and Firebase screen views cover different days
+        "ranges": {"event": day_range("events"), "screen": day_range("screens")},
+        "events": event_names,
+        "countries": country_names,
+        "screens": screen_names,
+        # Distinct users per event over the whole range, all countries
+        "distinct_users": [_sketch_count(_bottom_k(chain.from_iterable(sketches[name])))
+                           for name in event_names],
+        "funnel": [
+            {"label": label, "source": source, "name": name}
+            for label, source, name in FUNNEL_STAGES
+        ],
+        "days": days,
+    }
+
+
+def build_dashboard_data(source_dir: str, output_path: str, cache_path: Optional[str] = None) -> dict:
+    """Rebuild the dashboard JSON, returning a summary of the work done"""
+    source = Path(source_dir)
+    output = Path(output_path)
+    cache_file = Path(cache_path) if cache_path else output.with_name(CACHE_NAME)
+
+    with instrumentation.stage("scan sources"):
+        cache = _load_cache(cache_file)
+        old_files = cache["files"]
+        files = {}
+        recomputed = 0
+        for kind, path in find_sources(source):
+            key = str(path.resolve())
+            files[key], changed = _update_file(kind, path, old_files.get(key))
+            recomputed += changed
+
+    with instrumentation.stage("merge overlaps"):
+        overlaps, changed = _update_overlaps(files, cache.get("overlaps", {}))
+        recomputed += changed
+
+    with instrumentation.stage("aggregate"):
+        data = _compact(_merge_days(files, overlaps))
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+        # "</" would end the <script> element early
+        script = "window.DASHBOARD_DATA = " + payload.replace("</", "<\\/") + ";\n"
+
+    with instrumentation.stage("write"):
+        output.parent.mkdir(parents=True, exist_ok=True)
+        for path, text in ((output, payload), (output.with_name(SCRIPT_NAME), script)):
+            if not path.exists() or path.read_text(encoding="utf-8") != text:
+                path.write_text(text, encoding="utf-8")
+                instrumentation.record_write(path)
+
+        if (files.keys() != old_files.keys() or any(files[k] is not old_files[k] for k in files)
+                or overlaps != cache.get("overlaps", {})):
+            cache["files"] = files
+            cache["overlaps"] = overlaps
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, separators=(",", ":"))
+            instrumentation.record_write(cache_file)
+
+    return {
+        "sources": len(files),
+        "days": len(data["days"]),
+        "recomputed_days": recomputed,
+        "bytes": len(payload.encode("utf-8")),
+    }
+
+
+def main():
+    root = Path(__file__).resolve().parent
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else str(root)
+    output_path = sys.argv[2] if len(sys.argv) > 2 else str(root / "AnalyticsDashboard" / OUTPUT_NAME)
+
+    print("📈 Building dashboard data...")
+    summary = build_dashboard_data(source_dir, output_path)
+    print(f"   Sources: {summary['sources']}")
+    print(f"   Days: {summary['days']} ({summary['recomputed_days']} recomputed)")
+    print(f"✅ Wrote {os.path.relpath(output_path)} ({summary['bytes']} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Xcode Build Settings Editor
+Queries and bulk-edits XCBuildConfiguration build settings and Swift package
+requirements in project.pbxproj.
+
+Settings are indexed by (target, configuration, key). Edits are collected as
+splices against the original text and written in one pass, so everything the
+edits do not touch (ordering, comments, whitespace) stays byte-identical.
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import instrumentation
+from pbxproj import XcodeProject, cached, dict_spans, parse_plist
+
+# Pseudo-target name for the project-level configurations
+PROJECT = "(project)"
+
+Value = Union[str, List[str]]
+SettingKey = Tuple[str, str, str]
+
+# Characters Xcode leaves unquoted in pbxproj values
+BARE_VALUE = re.compile(r'^[A-Za-z0-9_$/:.]+$')
+# Requirement kind -> (kind as Xcode writes it, key holding the version)
+REQUIREMENT_KINDS = {
+    "exact": ("exactVersion", "version"),
+    "upToNextMajorVersion": ("upToNextMajorVersion", "minimumVersion"),
+    "upToNextMinorVersion": ("upToNextMinorVersion", "minimumVersion"),
+    "versionRange": ("versionRange", None),
+    "branch": ("branch", "branch"),
+    "revision": ("revision", "revision"),
+}
+
+
+class BuildSettingsError(ValueError):
+    pass
+
+
+def quote(value: str) -> str:
+    if value and BARE_VALUE.match(value) and "//" not in value:
+        return value
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+    return f'"{escaped}"'
+
+
+def format_value(value: Value, indent: str) -> str:
+    """A value as Xcode writes it; ``indent`` is the indentation of its key"""
+    if isinstance(value, list):
+        items = "".join(f"{indent}\t{quote(item)},\n" for item in value)
+        return f"(\n{items}{indent})"
+    return quote(value)
+
+
+def parse_value(text: str) -> Value:
+    """Command-line value: "(a, b)" or "[a, b]" is a list, anything else a string"""
+    text = text.strip()
+    if len(text) >= 2 and text[0] + text[-1] in ("()", "[]"):
+        return [item.strip() for item in text[1:-1].split(",") if item.strip()]
+    return text
+
+
+def _object_spans(text: str) -> Dict[str, Tuple[int, int, int, int]]:
+    return dict_spans(text, dict_spans(text, text.index("{"))["objects"][1])
+
+
+class BuildSettings:
+    """Index over a project's build settings with splice-based editing"""
+
+    def __init__(self, path, text: str):
+        self.path = Path(path)
+        self._load(text)
+
+    def _load(self, text: str):
+        self.text = text
+        self.project = XcodeProject(self.path, cached(self.path, text, "plist", parse_plist))
+        # (object id, key) -> (start, end, replacement); a later edit of the same key replaces it
+        self._edits: Dict[Tuple[str, str], Tuple[int, int, str]] = {}
+        self._object_spans = cached(self.path, text, "object spans", _object_spans)
+
+        # (target, configuration) -> XCBuildConfiguration id
+        self.configurations: Dict[Tuple[str, str], str] = {}
+        self.index: Dict[SettingKey, Value] = {}
+        lists = [(PROJECT, self.project.root.get("buildConfigurationList"))]
+        for target_id in self.project.root.get("targets", ()):
+            target = self.project.objects.get(target_id, {})
+            lists.append((target.get("name", target_id), target.get("buildConfigurationList")))
+        for target_name, list_id in lists:
+            for config_id in self.project.objects.get(list_id, {}).get("buildConfigurations", ()):
+                config = self.project.objects[config_id]
+                self.configurations[(target_name, config["name"])] = config_id
+                for key, value in config.get("buildSettings", {}).items():
+                    self.index[(target_name, config["name"], key)] = value
+
+    @property
+    def targets(self) -> List[str]:
+        return sorted({target for target, _ in self.configurations})
+
+    def _matching(self, targets: Optional[Iterable[str]], configs: Optional[Iterable[str]]) -> List[Tuple[str, str]]:
+        targets = set(targets) if targets else None
+        configs = set(configs) if configs else None
+        matched = [
+            (t, c) for t, c in self.configurations
+            if (targets is None or t in targets) and (configs is None or c in configs)
+        ]
+        if not matched:
+            raise BuildSettingsError(f"no configurations match targets={sorted(targets or [])} "
+                                     f"configs={sorted(configs or [])}")
+        return sorted(matched)
+
+    # -- queries -----------------------------------------------------------
+
+    def get(self, target: str, config: str, key: str, resolve: bool = True) -> Optional[Value]:
+        """A setting's value; with resolve, a target falls back to the project level"""
+        value = self.index.get((target, config, key))
+        if value is None and resolve and target != PROJECT:
+            value = self.index.get((PROJECT, config, key))
+        return value
+
+    def query(self, keys: Optional[Iterable[str]] = None, targets: Optional[Iterable[str]] = None,
+              configs: Optional[Iterable[str]] = None) -> List[Tuple[str, str, str, Value]]:
+        keys = set(keys) if keys else None
+        rows = []
+        for target, config in self._matching(targets, configs):
+            if keys is None:
+                names = sorted(k for t, c, k in self.index if (t, c) == (target, config))
+            else:
+                names = sorted(keys)
+            for key in names:
+                value = self.index.get((target, config, key))
+                if value is not None:
+                    rows.append((target, config, key, value))
+        return rows
+
+    # -- edits -------------------------------------------------------------
+
+    def _splice(self, owner: str, key: str, start: int, end: int, replacement: Optional[str]):
+        if replacement is None:
+            self._edits.pop((owner, key), None)
+        else:
+            self._edits[(owner, key)] = (start, end, replacement)
+
+    def _settings_spans(self, config_id: str):
+        obj_start = self._object_spans[config_id][1]
+        settings_start = dict_spans(self.text, obj_start)["buildSettings"][1]
+        return settings_start, dict_spans(self.text, settings_start)
+
+    def _line_indent(self, offset: int) -> str:
+        line_start = self.text.rfind("\n", 0, offset) + 1
+        return self.text[line_start:offset]
+
+    def set(self, key: str, value: Value, targets: Optional[Iterable[str]] = None,
+            configs: Optional[Iterable[str]] = None) -> int:
+        """Set a build setting in every matching configuration; returns how many changed"""
+        changed = 0
+        for target, config in self._matching(targets, configs):
+            if self.index.get((target, config, key)) == value:
+                continue
+            config_id = self.configurations[(target, config)]
+            settings_start, spans = self._settings_spans(config_id)
+            if key in spans:
+                key_start, value_start, value_end, _ = spans[key]
+                self._splice(config_id, key, value_start, value_end,
+                             format_value(value, self._line_indent(key_start)))
+            else:
+                # Xcode keeps buildSettings sorted; insert before the next key
+                following = sorted(k for k in spans if k > key)
+                if following:
+                    anchor = spans[following[0]][0]
+                    indent = self._line_indent(anchor)
+                    line_start = anchor - len(indent)
+                else:
+                    close = self.text.index("}", max((s[3] for s in spans.values()), default=settings_start + 1))
+                    line_start = self.text.rfind("\n", 0, close) + 1
+                    indent = self._line_indent(close) + "\t"
+                self._splice(config_id, key, line_start, line_start,
+                             f"{indent}{quote(key)} = {format_value(value, indent)};\n")
+            self.index[(target, config, key)] = value
+            changed += 1
+        return changed
+
+    def unset(self, key: str, targets: Optional[Iterable[str]] = None,
+              configs: Optional[Iterable[str]] = None) -> int:
+        removed = 0
+        for target, config in self._matching(targets, configs):
+            if (target, config, key) not in self.index:
+                continue
+            config_id = self.configurations[(target, config)]
+            _, spans = self._settings_spans(config_id)
+            if key not in spans:
+                # Only added by a pending edit: dropping that edit is enough
+                self._splice(config_id, key, 0, 0, None)
+            else:
+                key_start, _, _, entry_end = spans[key]
+                line_start = key_start - len(self._line_indent(key_start))
+                line_end = entry_end + 1 if self.text[entry_end:entry_end + 1] == "\n" else entry_end
+                self._splice(config_id, key, line_start, line_end, "")
+            del self.index[(target, config, key)]
+            removed += 1
+        return removed
+
+    # -- Swift packages -----------------------------------------------------
+
+    def packages(self) -> Dict[str, dict]:
+        """Remote package references by repository name"""
+        packages = {}
+        for object_id, obj in self.project.objects_of("XCRemoteSwiftPackageReference"):
+            url = obj.get("repositoryURL", "")
+            name = url.rstrip("/").rsplit("/", 1)[-1].removesuffix(".git")
+            packages[name] = {"id": object_id, "url": url, "requirement": obj.get("requirement", {})}
+        return packages
+
+    def set_package_requirement(self, name: str, kind: str, version: str = "",
+                                maximum: str = "") -> bool:
+        """Pin a package, e.g. ("Superwall-iOS", "exact", "4.2.0"); returns whether it changed"""
+        if kind not in REQUIREMENT_KINDS:
+            raise BuildSettingsError(f"unknown requirement kind {kind!r}")
+        packages = {n.lower(): p for n, p in self.packages().items()}
+        package = packages.get(name.lower())
+        if package is None:
+            raise BuildSettingsError(f"no package named {name!r}; known: {', '.join(sorted(self.packages()))}")
+
+        xcode_kind, version_key = REQUIREMENT_KINDS[kind]
+        requirement = {"kind": xcode_kind}
+        if version_key is None:
+            requirement.update(minimumVersion=version, maximumVersion=maximum)
+        else:
+            requirement[version_key] = version
+        if package["requirement"] == requirement:
+            return False
+
+        spans = dict_spans(self.text, self._object_spans[package["id"]][1])
+        key_start, value_start, value_end, _ = spans["requirement"]
+        indent = self._line_indent(key_start)
+        # Xcode writes the keys sorted (branch before kind, maximumVersion before minimumVersion)
+        body = "".join(f"{indent}\t{k} = {quote(v)};\n" for k, v in sorted(requirement.items()))
+        self._splice(package["id"], "requirement", value_start, value_end, f"{{\n{body}{indent}}}")
+        self.project.objects[package["id"]]["requirement"] = requirement
+        return True
+
+    # -- output --------------------------------------------------------------
+
+    def render(self) -> str:
+        """The project text with every pending edit applied"""
+        pieces = []
+        position = 0
+        # Inserts at the same offset come out in key order, as Xcode sorts them
+        for start, end, _, replacement in sorted((start, end, key, text) for (_, key), (start, end, text)
+                                                 in self._edits.items()):
+            if start < position:
+                raise BuildSettingsError(f"overlapping edits at offset {start}")
+            pieces.append(self.text[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(self.text[position:])
+        return "".join(pieces)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._edits)
+
+    def save(self, path=None) -> bool:
+        """Write all pending edits at once; returns False when there was nothing to write"""
+        if not self._edits:
+            return False
+        with instrumentation.stage("serialize"):
+            text = self.render()
+            # Never write a project Xcode could not open; the parse is cached for the reload below
+            cached(self.path, text, "plist", parse_plist)
+            path = Path(path or self.path)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            instrumentation.record_write(path)
+        self._load(text)
+        return True
+
+
+def load_build_settings(path) -> BuildSettings:
+    path = Path(path)
+    if path.is_dir():
+        path = path / "project.pbxproj"
+    with instrumentation.stage("pbxproj parse"):
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        instrumentation.record_read(path)
+        return BuildSettings(path, text)
+
+
+def _parse_assignments(items: List[str]) -> List[Tuple[str, Value]]:
+    assignments = []
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            raise BuildSettingsError(f"expected KEY=VALUE, got {item!r}")
+        assignments.append((key.strip(), parse_value(value)))
+    return assignments
+
+
+def main(argv=None) -> int:
+    default_project = Path(__file__).resolve().parent / "NoteWall.xcodeproj" / "project.pbxproj"
+    parser = argparse.ArgumentParser(description="Query and edit Xcode build settings and package pins")
+    parser.add_argument("--project", type=Path, default=default_project)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def scoped(sub):
+        sub.add_argument("--target", action="append", help=f"target name, or {PROJECT} (default: all)")
+        sub.add_argument("--config", action="append", help="configuration name, e.g. Release (default: all)")
+        return sub
+
+    scoped(commands.add_parser("get", help="show build settings")).add_argument("keys", nargs="*")
+    setter = scoped(commands.add_parser("set", help="set KEY=VALUE in the matching configurations"))
+    setter.add_argument("assignments", nargs="+", metavar="KEY=VALUE")
+    setter.add_argument("--dry-run", action="store_true", help="print the changes without writing")
+    unsetter = scoped(commands.add_parser("unset", help="remove settings from the matching configurations"))
+    unsetter.add_argument("keys", nargs="+")
+    unsetter.add_argument("--dry-run", action="store_true", help="print the changes without writing")
+    commands.add_parser("packages", help="list Swift package requirements")
+    pin = commands.add_parser("pin-package", help="set a Swift package requirement")
+    pin.add_argument("name", help="repository name, e.g. Superwall-iOS")
+    pin.add_argument("version", help="version, branch or revision")
+    pin.add_argument("--kind", default="exact", choices=sorted(REQUIREMENT_KINDS))
+    pin.add_argument("--maximum", default="", help="maximumVersion for --kind versionRange")
+    pin.add_argument("--dry-run", action="store_true", help="print the change without writing")
+    args = parser.parse_args(argv)
+
+    try:
+        settings = load_build_settings(args.project)
+        if args.command == "get":
+            rows = settings.query(args.keys, args.target, args.config)
+            if args.json:
+                print(json.dumps([{"target": t, "config": c, "key": k, "value": v} for t, c, k, v in rows], indent=2))
+            for target, config, key, value in ([] if args.json else rows):
+                print(f"{target:<12} {config:<10} {key} = {value}")
+            return 0
+
+        if args.command == "packages":
+            packages = settings.packages()
+            if args.json:
+                print(json.dumps(packages, indent=2))
+            for name, package in ({} if args.json else packages).items():
+                requirement = ", ".join(f"{k}={v}" for k, v in package["requirement"].items())
+                print(f"📦 {name}: {requirement}")
+            return 0
+
+        if args.command == "set":
+            changed = sum(settings.set(key, value, args.target, args.config)
+                          for key, value in _parse_assignments(args.assignments))
+        elif args.command == "unset":
+            changed = sum(settings.unset(key, args.target, args.config) for key in args.keys)
+        else:
+            changed = int(settings.set_package_requirement(args.name, args.kind, args.version, args.maximum))
+    except BuildSettingsError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.dry_run:
+        import difflib
+        sys.stdout.writelines(difflib.unified_diff(
+            settings.text.splitlines(True), settings.render().splitlines(True),
+            str(args.project), str(args.project)))
+    elif settings.save():
+        print(f"✅ {changed} setting(s) changed in {args.project}")
+    else:
+        print("✅ Nothing to change")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
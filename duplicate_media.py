@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Duplicate Media Finder
+Finds byte-identical media files across the repo and shows which copy the
+Xcode project actually uses, so the other copies can be deleted.
+
+Files are grouped by size first; only same-size candidates are hashed, and
+only their first and last chunks until those match too. Hashing runs on a
+thread pool (hashlib releases the GIL for large buffers).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import instrumentation
+from pbxproj import load_project
+
+MEDIA_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".heic", ".webp", ".pdf", ".svg",
+    ".mp4", ".mov", ".m4v", ".m4a", ".mp3", ".wav", ".caf", ".aiff",
+}
+SKIPPED_DIRS = {".git", "__pycache__", "DerivedData", "build", "node_modules", ".build"}
+
+PARTIAL_CHUNK = 64 * 1024
+FULL_CHUNK = 1024 * 1024
+
+
+@dataclass
+class DuplicateGroup:
+    size: int
+    digest: str
+    files: List[str]
+    referenced: List[str] = field(default_factory=list)
+    keep: str = ""
+    deletable: List[str] = field(default_factory=list)
+
+    @property
+    def wasted(self) -> int:
+        return self.size * (len(self.files) - 1)
+
+
+def find_media_files(root: Path, extensions: Optional[Set[str]] = MEDIA_EXTENSIONS) -> List[Path]:
+    """Media files under root (every file when extensions is None), skipping build/VCS folders"""
+    files = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIPPED_DIRS]
+        for name in filenames:
+            if extensions is None or os.path.splitext(name)[1].lower() in extensions:
+                files.append(Path(directory) / name)
+    return sorted(files)
+
+
+def partial_hash(path: Path, size: int) -> str:
+    """Hash of the first and last chunk; the whole file when that is no bigger"""
+    with open(path, "rb") as f:
+        if size <= 2 * PARTIAL_CHUNK:
+            data = f.read()
+            instrumentation.record_read(path, len(data))
+            return hashlib.blake2b(data, digest_size=16).hexdigest()
+        digest = hashlib.blake2b(f.read(PARTIAL_CHUNK), digest_size=16)
+        f.seek(-PARTIAL_CHUNK, os.SEEK_END)
+        digest.update(f.read(PARTIAL_CHUNK))
+    instrumentation.record_read(path, 2 * PARTIAL_CHUNK)
+    return digest.hexdigest()
+
+
+def full_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(FULL_CHUNK), b""):
+            digest.update(chunk)
+    instrumentation.record_read(path)
+    return digest.hexdigest()
+
+
+def _regroup(groups: Iterable[List[Path]], key, pool: ThreadPoolExecutor) -> Dict[str, List[Path]]:
+    # Split every candidate group by key(path), keeping only sub-groups with 2+ files
+    candidates = [path for group in groups for path in group]
+    buckets: Dict[str, List[Path]] = defaultdict(list)
+    for path, k in zip(candidates, pool.map(key, candidates)):
+        buckets[k].append(path)
+    return {k: group for k, group in buckets.items() if len(group) > 1}
+
+
+def find_duplicates(paths: Iterable[Path], min_size: int = 1,
+                    max_workers: Optional[int] = None) -> List[Tuple[int, str, List[Path]]]:
+    """(size, digest, files) for every group of byte-identical files, largest first"""
+    sizes: Dict[int, List[Path]] = defaultdict(list)
+    size_of: Dict[Path, int] = {}
+    for path in paths:
+        size = size_of[path] = path.stat().st_size
+        if size >= min_size:
+            sizes[size].append(path)
+    groups = [group for group in sizes.values() if len(group) > 1]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        with instrumentation.stage("partial hash"):
+            # Sizes are equal within a group, so the size is part of the key
+            partial = _regroup(groups, lambda p: f"{size_of[p]}:{partial_hash(p, size_of[p])}", pool)
+        with instrumentation.stage("full hash"):
+            # Small files were hashed whole already; only re-read the big ones
+            found = {k.split(":", 1)[1]: g for k, g in partial.items() if size_of[g[0]] <= 2 * PARTIAL_CHUNK}
+            found.update(_regroup([g for g in partial.values() if size_of[g[0]] > 2 * PARTIAL_CHUNK],
+                                  full_hash, pool))
+
+    return sorted(((size_of[g[0]], digest, sorted(g)) for digest, g in found.items()),
+                  key=lambda item: (-item[0], str(item[2][0])))
+
+
+def project_references(project_path: Path) -> Set[Path]:
+    """Paths the Xcode project points at (files and folder references like .xcassets)"""
+    return set(load_project(project_path).file_paths().values())
+
+
+def _is_referenced(path: Path, references: Set[Path]) -> bool:
+    # A file inside a referenced folder (asset catalog, folder reference) is used too
+    return path in references or any(parent in references for parent in path.parents)
+
+
+def duplicate_report(root: Path, project_path: Optional[Path] = None, min_size: int = 1,
+                     extensions: Optional[Set[str]] = MEDIA_EXTENSIONS) -> dict:
+    root = root.resolve()
+    with instrumentation.stage("walk"):
+        files = find_media_files(root, extensions)
+    duplicates = find_duplicates(files, min_size)
+    references = project_references(project_path) if project_path and project_path.exists() else set()
+
+    groups = []
+    for size, digest, group in duplicates:
+        referenced = [p for p in group if _is_referenced(p, references)]
+        # Keep what the project uses; otherwise the copy with the shortest path
+        keep = referenced[0] if referenced else min(group, key=lambda p: (len(p.parts), str(p)))
+        groups.append(DuplicateGroup(
+            size=size,
+            digest=digest,
+            files=[str(p.relative_to(root)) for p in group],
+            referenced=[str(p.relative_to(root)) for p in referenced],
+            keep=str(keep.relative_to(root)),
+            deletable=[str(p.relative_to(root)) for p in group if p not in referenced and p != keep],
+        ))
+
+    return {
+        "files_scanned": len(files),
+        "groups": [dict(asdict(g), wasted=g.wasted) for g in groups],
+        "wasted_bytes": sum(g.wasted for g in groups),
+        "deletable_bytes": sum(g.size * len(g.deletable) for g in groups),
+    }
+
+
+def main(argv=None) -> int:
+    repo = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Find duplicate media files and the copies Xcode uses")
+    parser.add_argument("root", nargs="?", type=Path, default=repo)
+    parser.add_argument("--project", type=Path, default=repo / "NoteWall.xcodeproj" / "project.pbxproj")
+    parser.add_argument("--min-size", type=int, default=1, help="ignore files smaller than this many bytes")
+    parser.add_argument("--all-files", action="store_true", help="consider every file, not only media")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = duplicate_report(args.root, args.project, args.min_size, None if args.all_files else MEDIA_EXTENSIONS)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"🔍 Scanned {report['files_scanned']} files, {len(report['groups'])} duplicate groups")
+    for group in report["groups"]:
+        print(f"\n   {group['size']} bytes x {len(group['files'])}")
+        for name in group["files"]:
+            mark = "📦" if name in group["referenced"] else ("✅" if name == group["keep"] else "🗑 ")
+            print(f"   {mark} {name}")
+    print(f"\n💾 {report['deletable_bytes']} bytes can be deleted "
+          f"(📦 used by the Xcode project, ✅ kept, 🗑  safe to delete)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Event Volume Anomaly Detector
+Keeps rolling hourly counts per event and per (event, country) and flags
+hours that drop below (or spike above) the same hour on the previous days.
+
+Counts live in a fixed ring of hourly slots per series, so ingesting an event
+is O(1) and memory does not grow with history. The ring and the read offset
+of every export are persisted, and exports are treated as append-only: a rerun
+only reads rows added since the last one, never the history again.
+
+Each export is taken to hold every event of the time span it covers, and the
+span counted from every file is persisted too. Rows inside a span already
+counted from another file (overlapping snapshot exports), or from an earlier
+version of a rewritten file, are skipped rather than counted twice.
+"""
+
+import argparse
+import bisect
+import csv
+import hashlib
+import io
+import json
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import instrumentation
+from event_store import EVENT_COLUMN, TIME_COLUMN
+
+COUNTRY_COLUMN = "Country"
+ALL_COUNTRIES = "*"
+
+SECONDS_PER_HOUR = 3600
+HOURS_PER_DAY = 24
+BASELINE_DAYS = 7
+# One extra day so every hour of the current day still has a full baseline
+WINDOW_HOURS = HOURS_PER_DAY * (BASELINE_DAYS + 1)
+CHUNK_ROWS = 65536
+
+STATE_NAME = ".event-anomaly-state.npz"
+HEAD_BYTES = 4096
+
+
+@dataclass
+class Anomaly:
+    event: str
+    country: str
+    hour: str
+    count: int
+    baseline: float
+    z: float
+    kind: str
+
+
+class RollingCounts:
+    """Hourly counts for many series in one (series x WINDOW_HOURS) ring buffer"""
+
+    def __init__(self, window: int = WINDOW_HOURS):
+        self.window = window
+        self.counts = np.zeros((16, window), dtype=np.int32)
+        self.series: Dict[Tuple[str, str], int] = {}
+        self.head = -1          # newest hour (hours since epoch) in the ring
+        self.first_hour = -1    # oldest hour ever observed; earlier slots are "no data", not zero
+        self.late = 0           # events older than the window when they arrived
+        self.overlapping = 0    # events skipped as already counted from another export
+
+    def row(self, event: str, country: str) -> int:
+        key = (event, country)
+        row = self.series.get(key)
+        if row is None:
+            row = self.series[key] = len(self.series)
+            if row >= len(self.counts):
+                grown = np.zeros((len(self.counts) * 2, self.window), dtype=np.int32)
+                grown[:len(self.counts)] = self.counts
+                self.counts = grown
+        return row
+
+    def advance(self, hour: int):
+        """Move the head forward, clearing the slots of the hours it passes"""
+        if hour <= self.head:
+            return
+        if self.head < 0 or hour - self.head >= self.window:
+            self.counts[:] = 0
+        else:
+            slots = np.arange(self.head + 1, hour + 1) % self.window
+            self.counts[:, slots] = 0
+        self.head = hour
+
+    def add(self, rows: np.ndarray, hours: np.ndarray):
+        """Count one event per (row, hour) pair"""
+        if not len(hours):
+            return
+        self.advance(int(hours.max()))
+        live = hours > self.head - self.window
+        self.late += int((~live).sum())
+        rows, hours = rows[live], hours[live]
+        np.add.at(self.counts, (rows, hours % self.window), 1)
+        oldest = int(hours.min()) if len(hours) else self.head
+        self.first_hour = oldest if self.first_hour < 0 else min(self.first_hour, oldest)
+
+    def detect(self, hours: Iterable[int], threshold: float = 3.0,
+               min_baseline: float = 5.0) -> List[Anomaly]:
+        """Flag series whose count in each given hour deviates from that hour on previous days"""
+        names = sorted(self.series, key=self.series.get)
+        live = self.counts[:len(names)].astype(np.float64)
+        found = []
+        for hour in hours:
+            if hour > self.head or hour <= self.head - self.window:
+                continue
+            baseline_hours = [hour - HOURS_PER_DAY * d for d in range(1, BASELINE_DAYS + 1)]
+            baseline_hours = [h for h in baseline_hours if h >= self.first_hour and h > self.head - self.window]
+            if not baseline_hours:
+                continue
+            current = live[:, hour % self.window]
+            baseline = live[:, np.array(baseline_hours) % self.window]
+            mean = baseline.mean(axis=1)
+            # Counts are roughly Poisson, so never trust a spread below sqrt(mean)
+            spread = np.maximum(np.maximum(baseline.std(axis=1), np.sqrt(mean)), 1.0)
+            z = (current - mean) / spread
+            drops = (mean >= min_baseline) & (z <= -threshold)
+            spikes = (current >= min_baseline) & (z >= threshold)
+            stamp = datetime.fromtimestamp(hour * SECONDS_PER_HOUR, timezone.utc).strftime("%Y-%m-%d %H:00")
+            for row in np.flatnonzero(drops | spikes):
+                event, country = names[row]
+                found.append(Anomaly(event, country, stamp, int(current[row]), round(float(mean[row]), 2),
+                                     round(float(z[row]), 2), "drop" if drops[row] else "spike"))
+        return sorted(found, key=lambda a: -abs(a.z))
+
+    def save(self, path: Path, files: Dict[str, dict]):
+        meta = {"head": self.head, "first_hour": self.first_hour, "late": self.late,
+                "overlapping": self.overlapping, "window": self.window, "files": files}
+        keys = np.array(["\t".join(k) for k in sorted(self.series, key=self.series.get)], dtype=object)
+        with open(path, "wb") as f:
+            np.savez(f, counts=self.counts[:len(keys)], keys=keys, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["RollingCounts", Dict[str, dict]]:
+        with np.load(path, allow_pickle=True) as data:
+            meta = json.loads(str(data["meta"]))
+            rolling = cls(meta["window"])
+            counts = data["counts"]
+            rolling.counts = np.zeros((max(16, len(counts)), rolling.window), dtype=np.int32)
+            rolling.counts[:len(counts)] = counts
+            rolling.series = {tuple(k.split("\t", 1)): i for i, k in enumerate(data["keys"].tolist())}
+        rolling.head, rolling.first_hour, rolling.late = meta["head"], meta["first_hour"], meta["late"]
+        rolling.overlapping = meta.get("overlapping", 0)
+        return rolling, meta["files"]
+
+
+def _head_digest(path: Path, length: int) -> str:
+    # Appending never changes the first bytes; rewriting an export almost always does
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(min(length, HEAD_BYTES)), digest_size=8).hexdigest()
+
+
+def _merge_spans(spans: Iterable[Tuple[float, float]]) -> Tuple[List[float], List[float]]:
+    """Starts and ends of the union of closed time spans, sorted and non-overlapping"""
+    starts: List[float] = []
+    ends: List[float] = []
+    for first, last in sorted(spans):
+        if ends and first <= ends[-1]:
+            ends[-1] = max(ends[-1], last)
+        else:
+            starts.append(first)
+            ends.append(last)
+    return starts, ends
+
+
+def _complete_row(line: bytes, columns: int) -> bool:
+    try:
+        record = next(csv.reader([line.decode("utf-8")]), [])
+    except (UnicodeDecodeError, csv.Error):
+        return False
+    return len(record) == columns
+
+
+def ingest_export(rolling: RollingCounts, path: Path, offset: int = 0,
+                  counted: Iterable[Tuple[float, float]] = ()) -> Tuple[int, int, Optional[List[float]]]:
+    """Count the rows of an export from byte ``offset`` on, skipping rows inside the ``counted`` spans
+
+    Returns (rows counted, new offset, [first, last] time of the rows read).
+    """
+    with open(path, "rb") as raw:
+        header = next(csv.reader([raw.readline().decode("utf-8-sig")]))
+        if offset:
+            raw.seek(offset)
+        start = raw.tell()
+        # Only whole lines: a partially written last row is picked up next time. Exports
+        # often end without a newline, so a last line with every column counts as whole
+        data = raw.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data) and _complete_row(data[end:], len(header)):
+            end = len(data)
+        data = data[:end]
+    instrumentation.record_read(path, end)
+
+    time_idx = header.index(TIME_COLUMN)
+    event_idx = header.index(EVENT_COLUMN)
+    country_idx = header.index(COUNTRY_COLUMN) if COUNTRY_COLUMN in header else None
+    starts, ends = _merge_spans(counted)
+    span: Optional[List[float]] = None
+    row_of = {}
+    rows: List[int] = []
+    hours: List[int] = []
+    total = 0
+    for record in csv.reader(io.StringIO(data.decode("utf-8"))):
+        if not record:
+            continue
+        time = float(record[time_idx])
+        span = [time, time] if span is None else [min(span[0], time), max(span[1], time)]
+        i = bisect.bisect_right(starts, time) - 1
+        if i >= 0 and time <= ends[i]:
+            rolling.overlapping += 1
+            continue
+        event = record[event_idx]
+        country = record[country_idx] if country_idx is not None else ""
+        key = (event, country)
+        pair = row_of.get(key)
+        if pair is None:
+            pair = row_of[key] = (rolling.row(event, ALL_COUNTRIES), rolling.row(event, country))
+        hour = int(time // SECONDS_PER_HOUR)
+        rows.extend(pair)
+        hours.append(hour)
+        hours.append(hour)
+        total += 1
+        if len(hours) >= 2 * CHUNK_ROWS:
+            rolling.add(np.array(rows, dtype=np.int64), np.array(hours, dtype=np.int64))
+            rows.clear()
+            hours.clear()
+    rolling.add(np.array(rows, dtype=np.int64), np.array(hours, dtype=np.int64))
+    return total, start + end, span
+
+
+def update(paths: Iterable[Path], state_path: Path) -> Tuple[RollingCounts, Dict[str, int]]:
+    """Ingest whatever is new in the given exports; returns the state and rows read per file"""
+    if state_path.exists():
+        rolling, files = RollingCounts.load(state_path)
+    else:
+        rolling, files = RollingCounts(), {}
+
+    read = {}
+    with instrumentation.stage("ingest"):
+        for path in paths:
+            key = str(path.resolve())
+            size = path.stat().st_size
+            known = files.get(key)
+            if known and size >= known["offset"] and known["head"] == _head_digest(path, known["offset"]):
+                offset = known["offset"]
+                if size == offset:
+                    instrumentation.record_cache(True)
+                    read[str(path)] = 0
+                    continue
+            else:
+                # New file, or rewritten rather than appended to: read it from the start
+                offset = 0
+            instrumentation.record_cache(False)
+            # Appended rows are new even inside this file's own span; a rewritten file's are not
+            counted = [entry["span"] for name, entry in files.items()
+                       if entry.get("span") and (name != key or offset == 0)]
+            rows, offset, span = ingest_export(rolling, path, offset, counted)
+            old_span = (known or {}).get("span")
+            if old_span and span:
+                span = [min(old_span[0], span[0]), max(old_span[1], span[1])]
+            files[key] = {"offset": offset, "head": _head_digest(path, offset), "span": span or old_span}
+            read[str(path)] = rows
+
+    if any(read.values()) or not state_path.exists():
+        rolling.save(state_path, files)
+    return rolling, read
+
+
+def find_exports(directory: Path) -> List[Path]:
+    return sorted(directory.glob("events-export-*.csv"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Flag hourly event volumes that deviate from previous days")
+    parser.add_argument("exports", nargs="*", type=Path, help="event exports (default: events-export-*.csv)")
+    parser.add_argument("--state", type=Path, default=root / STATE_NAME, help="rolling state file")
+    parser.add_argument("--hours", type=int, default=HOURS_PER_DAY,
+                        help="check the last N complete hours (default: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=3.0, help="z-score that counts as anomalous")
+    parser.add_argument("--min-baseline", type=float, default=5.0,
+                        help="ignore series averaging fewer events per hour than this")
+    parser.add_argument("--event", action="append", help="only report these events")
+    parser.add_argument("--json", action="store_true", help="print anomalies as JSON")
+    args = parser.parse_args(argv)
+
+    exports = args.exports or find_exports(root)
+    rolling, read = update(exports, args.state)
+    # The newest hour is usually still filling up, so start with the one before it
+    anomalies = rolling.detect(range(rolling.head - args.hours, rolling.head), args.threshold, args.min_baseline)
+    if args.event:
+        anomalies = [a for a in anomalies if a.event in args.event]
+
+    if args.json:
+        print(json.dumps({"rows_read": read, "series": len(rolling.series), "late": rolling.late,
+                          "overlapping": rolling.overlapping, "anomalies": [asdict(a) for a in anomalies]}, indent=2))
+        return 0
+
+    print(f"📥 Read {sum(read.values())} new rows from {len(read)} export(s); tracking {len(rolling.series)} series")
+    if rolling.overlapping:
+        print(f"   {rolling.overlapping} rows skipped so far as already counted from an overlapping export")
+    if not anomalies:
+        print("✅ No anomalies")
+    for a in anomalies:
+        icon = "📉" if a.kind == "drop" else "📈"
+        where = "all countries" if a.country == ALL_COUNTRIES else a.country or "unknown country"
+        print(f"{icon} {a.hour} {a.event} ({where}): {a.count} vs ~{a.baseline:g} (z={a.z:+.1f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
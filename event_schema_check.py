@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Analytics Event Schema Check
+Extracts the event catalog from the Swift sources and cross-checks it against
+the event names that actually show up in the CSV exports.
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from firebase_reports import is_firebase_report, iter_tables
+from swift_scan import compile_scanner, find_swift_files, literal, read_swift_source, scan_literals
+
+# Events Firebase / Mixpanel collect on their own, never defined in our code
+AUTO_COLLECTED = {
+    "app_update", "first_open", "in_app_purchase", "os_update", "screen_view",
+    "session_start", "user_engagement", "app_remove", "app_clear_data",
+    "$identify", "$mp_web_page_view", "$ae_session", "$ae_first_open", "$ae_updated",
+}
+
+EVENT_SCANNER = compile_scanner({
+    "event": r'(?:AnalyticsEvent|\.custom)\(\s*name:\s*' + literal("event"),
+})
+
+PROPERTY_KEY = re.compile(r'static\s+let\s+(\w+)\s*=\s*"')
+PROPERTY_REF = re.compile(r'AnalyticsProperty\.(\w+)')
+FUNC_START = re.compile(r'^\s*(?:static\s+)?func\s', re.MULTILINE)
+
+
+@dataclass
+class EventDefinition:
+    name: str
+    file: str
+    line: int
+    parameters: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class EventCatalog:
+    events: Dict[str, EventDefinition] = field(default_factory=dict)
+    properties: Dict[str, str] = field(default_factory=dict)   # Swift name -> key
+
+
+def extract_catalog(swift_roots: Iterable, property_file: Optional[Path] = None) -> EventCatalog:
+    """Collect every event name (with its parameter keys) defined in the sources"""
+    catalog = EventCatalog()
+    if property_file and property_file.exists():
+        content = read_swift_source(property_file)
+        for match in PROPERTY_KEY.finditer(content):
+            end = content.index('"', match.end())
+            catalog.properties[match.group(1)] = content[match.end():end]
+
+    for path in find_swift_files(swift_roots):
+        content = read_swift_source(path)
+        if "name:" not in content:
+            continue
+
+        # Function boundaries let each event pick up the properties its builder uses
+        boundaries = [m.start() for m in FUNC_START.finditer(content)] + [len(content)]
+        line_offsets = _line_offsets(content)
+
+        for _, value, line, _ in scan_literals(content, EVENT_SCANNER):
+            if value in catalog.events:
+                continue
+            offset = line_offsets[line - 1]
+            start = max((b for b in boundaries if b <= offset), default=0)
+            end = min(b for b in boundaries if b > offset)
+            parameters = {
+                catalog.properties.get(ref, ref)
+                for ref in PROPERTY_REF.findall(content, start, end)
+            }
+            catalog.events[value] = EventDefinition(value, str(path), line, parameters)
+    return catalog
+
+
+def _line_offsets(content: str) -> List[int]:
+    offsets = [0]
+    index = content.find("\n")
+    while index != -1:
+        offsets.append(index + 1)
+        index = content.find("\n", index + 1)
+    return offsets
+
+
+def _count_event_export(path: Path, counts: Dict[str, int]):
+    """Add per-event row counts from a Mixpanel export"""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if "Event Name" not in header:
+            return False
+        column = header.index("Event Name")
+        get = counts.get
+        for row in reader:
+            if row:
+                name = row[column]
+                counts[name] = get(name, 0) + 1
+    return True
+
+
+def _count_firebase_report(path: Path, counts: Dict[str, int]):
+    """Add per-event counts from a Firebase 'Events: Event name' report"""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for table in iter_tables(f):
+            if "Event name" in table.columns and "Event count" in table.columns:
+                for name, count in zip(table.data["Event name"], table.data["Event count"]):
+                    counts[name] = counts.get(name, 0) + int(count)
+
+
+def count_exported_events(export_paths: Iterable[Path]) -> Dict[str, Dict[str, int]]:
+    """Per-source event-name counts, streamed from every CSV export"""
+    per_source: Dict[str, Dict[str, int]] = {}
+    for path in export_paths:
+        counts: Dict[str, int] = {}
+        if is_firebase_report(str(path)):
+            _count_firebase_report(path, counts)
+        elif not _count_event_export(path, counts):
+            continue
+        if counts:
+            per_source[str(path)] = counts
+    return per_source
+
+
+def cross_check(catalog: EventCatalog, per_source: Dict[str, Dict[str, int]]) -> dict:
+    """Compare defined events against observed volumes"""
+    volumes: Dict[str, int] = {}
+    for counts in per_source.values():
+        for name, count in counts.items():
+            volumes[name] = volumes.get(name, 0) + count
+
+    defined = catalog.events.keys()
+    seen = volumes.keys()
+    return {
+        "defined": len(defined),
+        "seen": len(seen),
+        "never_seen": sorted(defined - seen),
+        "undefined": sorted(name for name in seen - defined if name not in AUTO_COLLECTED),
+        "auto_collected": sorted(name for name in seen - defined if name in AUTO_COLLECTED),
+        "volumes": dict(sorted(volumes.items(), key=lambda item: (-item[1], item[0]))),
+        "sources": sorted(per_source),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Cross-check AnalyticsEvent definitions against exports")
+    parser.add_argument("exports", nargs="*", help="CSV exports (default: every *.csv in the repo root)")
+    parser.add_argument("--swift-root", action="append", help="Swift source directory (default: NoteWall)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    parser.add_argument("--strict", action="store_true", help="exit non-zero on undefined events")
+    args = parser.parse_args(argv)
+
+    swift_roots = [Path(p) for p in (args.swift_root or [root / "NoteWall"])]
+    property_file = root / "NoteWall" / "Analytics" / "AnalyticsProperty.swift"
+    exports = [Path(p) for p in args.exports] or sorted(root.glob("*.csv"))
+
+    catalog = extract_catalog(swift_roots, property_file)
+    report = cross_check(catalog, count_exported_events(exports))
+
+    if args.json:
+        report["parameters"] = {
+            name: sorted(event.parameters) for name, event in sorted(catalog.events.items())
+        }
+        print(json.dumps(report, indent=2))
+    else:
+        print("🔎 Analytics Event Schema Check")
+        print("=" * 50)
+        print(f"   {report['defined']} events defined, {report['seen']} seen in {len(report['sources'])} exports")
+
+        print(f"\n⚠️  Defined but never seen ({len(report['never_seen'])}):")
+        for name in report["never_seen"]:
+            event = catalog.events[name]
+            print(f"   {name}  ({Path(event.file).name}:{event.line})")
+
+        print(f"\n❌ Seen but not defined ({len(report['undefined'])}):")
+        for name in report["undefined"]:
+            print(f"   {name}: {report['volumes'][name]}")
+
+        print("\n📊 Volumes:")
+        for name, count in report["volumes"].items():
+            marker = "✓" if name in catalog.events else ("·" if name in AUTO_COLLECTED else "?")
+            print(f"   {marker} {name}: {count}")
+
+    return 1 if args.strict and report["undefined"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Columnar Event Store
+Loads Mixpanel event exports into NumPy arrays with dictionary-encoded
+string columns, so analyses can work on whole columns at once.
+"""
+
+import csv
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+EVENT_COLUMN = "Event Name"
+TIME_COLUMN = "Time"
+USER_COLUMN = "Distinct ID"
+
+SECONDS_PER_DAY = 86400
+
+
+@dataclass
+class EventStore:
+    """Events as parallel arrays: float64 times plus int32 codes per string column"""
+    times: np.ndarray
+    codes: Dict[str, np.ndarray]
+    dictionaries: Dict[str, List[str]]
+    columns: List[str] = field(default_factory=list)
+    # Numeric columns (e.g. units per row of an aggregated store)
+    values: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def users(self) -> np.ndarray:
+        return self.codes[USER_COLUMN]
+
+    @property
+    def events(self) -> np.ndarray:
+        return self.codes[EVENT_COLUMN]
+
+    def days(self) -> np.ndarray:
+        """UTC day number (days since epoch) of every event"""
+        return (self.times // SECONDS_PER_DAY).astype(np.int64)
+
+    def code_of(self, column: str, value: str) -> int:
+        """Code of a string value, or -1 when the value never occurs"""
+        try:
+            return self.dictionaries[column].index(value)
+        except ValueError:
+            return -1
+
+    def mask(self, filters: Optional[Dict[str, Union[str, Iterable[str]]]] = None) -> np.ndarray:
+        """Boolean row mask matching every ``column -> value(s)`` filter"""
+        selected = np.ones(len(self), dtype=bool)
+        for column, wanted in (filters or {}).items():
+            if column not in self.codes:
+                raise KeyError(f"Unknown column: {column}")
+            values = [wanted] if isinstance(wanted, str) else list(wanted)
+            wanted_codes = [self.code_of(column, v) for v in values]
+            selected &= np.isin(self.codes[column], [c for c in wanted_codes if c >= 0])
+        return selected
+
+    def take(self, rows: np.ndarray) -> "EventStore":
+        """New store holding only the given rows (index array or boolean mask)"""
+        return EventStore(
+            times=self.times[rows],
+            codes={name: codes[rows] for name, codes in self.codes.items()},
+            dictionaries=self.dictionaries,
+            columns=self.columns,
+            values={name: values[rows] for name, values in self.values.items()},
+        )
+
+    def save(self, path: str):
+        """Persist the store as a single .npz file"""
+        arrays = {"times": self.times}
+        for name, codes in self.codes.items():
+            arrays[f"codes/{name}"] = codes
+            arrays[f"dict/{name}"] = np.array(self.dictionaries[name], dtype=object)
+        for name, values in self.values.items():
+            arrays[f"values/{name}"] = values
+        arrays["columns"] = np.array(self.columns, dtype=object)
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "EventStore":
+        with np.load(path, allow_pickle=True) as data:
+            codes = {}
+            dictionaries = {}
+            values = {}
+            for key in data.files:
+                if key.startswith("codes/"):
+                    codes[key[6:]] = data[key]
+                elif key.startswith("dict/"):
+                    dictionaries[key[5:]] = data[key].tolist()
+                elif key.startswith("values/"):
+                    values[key[7:]] = data[key]
+            return cls(
+                times=data["times"],
+                codes=codes,
+                dictionaries=dictionaries,
+                columns=data["columns"].tolist(),
+                values=values,
+            )
+
+
+class _Encoder:
+    """Assigns dense integer codes to strings in first-seen order"""
+    __slots__ = ("lookup", "values")
+
+    def __init__(self):
+        self.lookup: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value: str) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.lookup[value] = code
+            self.values.append(value)
+        return code
+
+
+def load_event_export(path: str) -> EventStore:
+    """Read a Mixpanel CSV export into an EventStore in one streaming pass"""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        time_idx = header.index(TIME_COLUMN)
+        string_columns = [(i, name) for i, name in enumerate(header) if i != time_idx]
+
+        encoders = {name: _Encoder() for _, name in string_columns}
+        times: List[float] = []
+        raw_codes: Dict[str, List[int]] = {name: [] for _, name in string_columns}
+        # Bind per-column encode/append pairs once instead of looking them up per row
+        sinks = [(i, encoders[name].encode, raw_codes[name].append) for i, name in string_columns]
+
+        for row in reader:
+            if not row:
+                continue
+            times.append(float(row[time_idx]))
+            for i, encode, append in sinks:
+                append(encode(row[i]))
+
+    return EventStore(
+        times=np.array(times, dtype=np.float64),
+        codes={name: np.array(values, dtype=np.int32) for name, values in raw_codes.items()},
+        dictionaries={name: enc.values for name, enc in encoders.items()},
+        columns=header,
+    )
+
+
+def parse_filters(items: Iterable[str]) -> Dict[str, List[str]]:
+    """Turn ``Column=value`` command-line items into a filter dict"""
+    filters: Dict[str, List[str]] = {}
+    for item in items:
+        column, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Filter must look like Column=value: {item}")
+        filters.setdefault(column.strip(), []).append(value.strip())
+    return filters
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: event_store.py <events-export.csv> [output.npz]")
+        sys.exit(1)
+
+    store = load_event_export(sys.argv[1])
+    print(f"✅ Loaded {len(store)} events, {len(store.dictionaries[USER_COLUMN])} users")
+    for name in store.dictionaries:
+        print(f"   {name}: {len(store.dictionaries[name])} distinct values")
+
+    if len(sys.argv) > 2:
+        store.save(sys.argv[2])
+        print(f"💾 Saved columnar store to {sys.argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Onboarding & Paywall Experiments
+Conversion per experiment variant (and segment) with bootstrap confidence
+intervals and the difference to the control variant.
+
+Every user is assigned the variant of their first exposure (paywall
+impression or quiz answer). Exposures are joined to the first outcome event
+within the window with one searchsorted over (user, time) keys, and the
+bootstrap draws every resample of every group in one batched call.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from event_store import EVENT_COLUMN, SECONDS_PER_DAY, EventStore, load_event_export, parse_filters
+
+VARIANT_COLUMN = "variant_id"
+EXPOSURE_EVENTS = ("paywall_impression", "quiz_answer")
+# Outcome name -> events that count as it. The app logs restore_success, and
+# the Superwall delegate superwall_transaction_restore
+OUTCOMES = {
+    "plan_selected": ("plan_selected",),
+    "restored": ("restore_success", "superwall_transaction_restore"),
+}
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_RESAMPLES = 10_000
+CONFIDENCE = 0.95
+NO_SEGMENT = "(all)"
+
+
+@dataclass
+class Exposures:
+    """First exposure per user: event row, time and the group (variant, segment) it falls in"""
+    rows: np.ndarray
+    users: np.ndarray
+    times: np.ndarray
+    groups: np.ndarray
+    variants: List[str]
+    segments: List[str]
+    group_variant: np.ndarray
+    group_segment: np.ndarray
+
+
+def first_exposures(store: EventStore, events: Sequence[str] = EXPOSURE_EVENTS,
+                    variant_column: str = VARIANT_COLUMN, segment_column: Optional[str] = None,
+                    mask: Optional[np.ndarray] = None) -> Exposures:
+    for column in filter(None, (variant_column, segment_column)):
+        if column not in store.codes:
+            raise ValueError(f"export has no {column} column; include that property when exporting")
+    codes = [store.code_of(EVENT_COLUMN, name) for name in events]
+    selected = np.isin(store.events, [c for c in codes if c >= 0])
+    if mask is not None:
+        selected &= mask
+    rows = np.flatnonzero(selected)
+    order = rows[np.lexsort((store.times[rows], store.users[rows]))]
+    # unique() returns the first index of each user, i.e. their earliest exposure
+    users, first = np.unique(store.users[order], return_index=True)
+    rows = order[first]
+
+    variant_codes = store.codes[variant_column][rows].astype(np.int64)
+    if segment_column:
+        segment_codes = store.codes[segment_column][rows].astype(np.int64)
+        segment_names = store.dictionaries[segment_column]
+    else:
+        segment_codes = np.zeros(len(rows), dtype=np.int64)
+        segment_names = [NO_SEGMENT]
+    stride = max(len(segment_names), 1)
+    group_keys, groups = np.unique(variant_codes * stride + segment_codes, return_inverse=True)
+    return Exposures(rows=rows, users=users, times=store.times[rows], groups=groups,
+                     variants=store.dictionaries[variant_column], segments=segment_names,
+                     group_variant=group_keys // stride, group_segment=group_keys % stride)
+
+
+def join_first_after(users: np.ndarray, times: np.ndarray, event_users: np.ndarray, event_times: np.ndarray,
+                     window: float) -> Tuple[np.ndarray, np.ndarray]:
+    """For each (user, time), whether that user has an event within ``window`` seconds after it, and the delay
+
+    Both sides become int64 keys ``user * span + milliseconds``, so one
+    searchsorted finds each user's first event at or after the time.
+    """
+    converted = np.zeros(len(users), dtype=bool)
+    delays = np.full(len(users), np.nan)
+    if not len(users) or not len(event_users):
+        return converted, delays
+    start = min(times.min(), event_times.min())
+    span = int(np.ceil((max(times.max(), event_times.max()) - start) * 1000)) + 1
+    if (int(max(users.max(), event_users.max())) + 1) * span >= 2 ** 63:
+        raise ValueError("time range too long for (user, time) keys")
+
+    def keys(u: np.ndarray, t: np.ndarray) -> np.ndarray:
+        return u.astype(np.int64) * span + np.floor((t - start) * 1000).astype(np.int64)
+
+    event_keys = np.sort(keys(event_users, event_times))
+    index = np.searchsorted(event_keys, keys(users, times), side="left")
+    found = index < len(event_keys)
+    next_keys = event_keys[np.minimum(index, len(event_keys) - 1)]
+    same_user = found & (next_keys // span == users)
+    delay = (next_keys % span) / 1000 - (times - start)
+    converted = same_user & (delay <= window)
+    delays[converted] = np.maximum(delay[converted], 0)
+    return converted, delays
+
+
+def bootstrap_rates(successes: np.ndarray, trials: np.ndarray, resamples: int = DEFAULT_RESAMPLES,
+                    seed: Optional[int] = 0) -> np.ndarray:
+    """(resamples, groups) conversion rates of bootstrap resamples of every group at once
+
+    Resampling n users with replacement from a group where k converted gives
+    Binomial(n, k / n) conversions, so one binomial draw per (resample, group)
+    replaces materializing resampled user arrays.
+    """
+    rng = np.random.default_rng(seed)
+    trials = np.asarray(trials, dtype=np.int64)
+    rates = np.divide(successes, trials, out=np.zeros(len(trials)), where=trials > 0)
+    draws = rng.binomial(trials, rates, size=(resamples, len(trials)))
+    return draws / np.maximum(trials, 1)
+
+
+def analyze_experiment(store: EventStore, exposures: Exposures, control: Optional[str] = None,
+                       outcomes: Dict[str, Sequence[str]] = OUTCOMES,
+                       window_days: float = DEFAULT_WINDOW_DAYS, resamples: int = DEFAULT_RESAMPLES,
+                       seed: Optional[int] = 0, mask: Optional[np.ndarray] = None) -> dict:
+    group_count = len(exposures.group_variant)
+    trials = np.bincount(exposures.groups, minlength=group_count)
+    variant_names = [exposures.variants[v] for v in exposures.group_variant]
+    if control is None:
+        present = sorted(set(variant_names))
+        control = "control" if "control" in present else (present[0] if present else "")
+    # Each group is compared with the control group of the same segment
+    control_of = {s: g for g, (v, s) in enumerate(zip(variant_names, exposures.group_segment)) if v == control}
+    control_index = np.array([control_of.get(s, -1) for s in exposures.group_segment], dtype=np.int64)
+    tail = (1 - CONFIDENCE) / 2 * 100
+
+    results = {}
+    for name, events in outcomes.items():
+        codes = [store.code_of(EVENT_COLUMN, event) for event in events]
+        selected = np.isin(store.events, [c for c in codes if c >= 0])
+        if mask is not None:
+            selected &= mask
+        converted, delays = join_first_after(exposures.users, exposures.times, store.users[selected],
+                                             store.times[selected], window_days * SECONDS_PER_DAY)
+        successes = np.bincount(exposures.groups, weights=converted, minlength=group_count)
+        rate = successes / np.maximum(trials, 1)
+        resampled = bootstrap_rates(successes, trials, resamples, seed)
+        # Variant and control are independent samples: each resample's difference is one bootstrap draw of it
+        diffs = resampled - resampled[:, np.maximum(control_index, 0)]
+        delay_sums = np.bincount(exposures.groups[converted], weights=delays[converted], minlength=group_count)
+        results[name] = {
+            "successes": successes.astype(np.int64),
+            "rate": rate,
+            "ci": np.percentile(resampled, [tail, 100 - tail], axis=0),
+            "diff": rate - rate[np.maximum(control_index, 0)],
+            "diff_ci": np.percentile(diffs, [tail, 100 - tail], axis=0),
+            "p_better": (diffs > 0).mean(axis=0),
+            "mean_delay": np.divide(delay_sums, successes, out=np.full(group_count, np.nan), where=successes > 0),
+        }
+
+    rows = []
+    for g in range(group_count):
+        row = {"variant": variant_names[g], "segment": exposures.segments[exposures.group_segment[g]],
+               "users": int(trials[g]), "outcomes": {}}
+        for name, result in results.items():
+            row["outcomes"][name] = {
+                "conversions": int(result["successes"][g]),
+                "rate": float(result["rate"][g]),
+                "ci": [float(result["ci"][0][g]), float(result["ci"][1][g])],
+                "mean_hours_to_convert": _finite(result["mean_delay"][g] / 3600),
+            }
+            if variant_names[g] != control and control_index[g] >= 0:
+                row["outcomes"][name].update({
+                    "diff": float(result["diff"][g]),
+                    "diff_ci": [float(result["diff_ci"][0][g]), float(result["diff_ci"][1][g])],
+                    "p_better": float(result["p_better"][g]),
+                })
+        rows.append(row)
+    rows.sort(key=lambda row: (row["segment"], row["variant"] != control, row["variant"]))
+    return {"control": control, "exposed": len(exposures.users), "window_days": window_days,
+            "resamples": resamples, "confidence": CONFIDENCE, "groups": rows}
+
+
+def _finite(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _percent(value: float) -> str:
+    return f"{value * 100:5.1f}%"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Conversion per experiment variant with bootstrap confidence intervals")
+    parser.add_argument("export", help="Mixpanel events CSV export with the variant_id property")
+    parser.add_argument("--variant-column", default=VARIANT_COLUMN,
+                        help="property holding the variant (e.g. paywall_id for Superwall paywall tests)")
+    parser.add_argument("--segment", metavar="COLUMN", help="also split each variant by this column, e.g. Country")
+    parser.add_argument("--control", help="control variant (default: 'control', else the first variant)")
+    parser.add_argument("--exposure", action="append", metavar="EVENT",
+                        help=f"exposure event (repeatable, default: {', '.join(EXPOSURE_EVENTS)})")
+    parser.add_argument("--outcome", action="append", metavar="NAME=EVENT[,EVENT]",
+                        help="outcome and the events counting as it (repeatable, default: plan_selected, restored)")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW_DAYS,
+                        help="days after the first exposure an outcome still counts")
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES, help="bootstrap resamples")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the bootstrap")
+    parser.add_argument("--filter", action="append", default=[], metavar="COLUMN=VALUE",
+                        help="only keep events where COLUMN equals VALUE (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args(argv)
+
+    outcomes = OUTCOMES
+    if args.outcome:
+        outcomes = {}
+        for item in args.outcome:
+            name, _, events = item.partition("=")
+            outcomes[name] = tuple(events.split(",")) if events else (name,)
+
+    store = load_event_export(args.export)
+    try:
+        mask = store.mask(parse_filters(args.filter))
+        exposures = first_exposures(store, args.exposure or EXPOSURE_EVENTS, args.variant_column, args.segment, mask)
+        report = analyze_experiment(store, exposures, args.control, outcomes, args.window, args.resamples,
+                                    args.seed, mask)
+    except (KeyError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(report))
+        return 0
+
+    print(f"🧪 {report['exposed']} exposed users, control '{report['control']}', "
+          f"{args.window:g}-day window, {report['resamples']} resamples")
+    for name in outcomes:
+        print(f"\n{name}:")
+        for row in report["groups"]:
+            result = row["outcomes"][name]
+            label = row["variant"] if row["segment"] == NO_SEGMENT else f"{row['segment']} / {row['variant']}"
+            line = (f"   {label:<32} {row['users']:>7} users  {_percent(result['rate'])} "
+                    f"[{_percent(result['ci'][0])} – {_percent(result['ci'][1])}]")
+            if "diff" in result:
+                line += (f"  Δ {result['diff'] * 100:+.1f} pts [{result['diff_ci'][0] * 100:+.1f}, "
+                         f"{result['diff_ci'][1] * 100:+.1f}]  P(better) {result['p_better']:.2f}")
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
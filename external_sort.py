@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+External Event Sort
+Sorts event exports that do not fit in memory by (distinct ID, time): rows
+are encoded to fixed-size records, sorted in bounded runs that are spilled
+to temp files, and k-way merged back with heapq.
+
+The merged stream is cut into batches that never split a user, so session
+and retention aggregators can work on whole users with array operations.
+Only one run buffer plus one read block per run is held in memory.
+"""
+
+import csv
+import heapq
+import resource
+import sys
+import tempfile
+from array import array
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import instrumentation
+from event_store import EVENT_COLUMN, TIME_COLUMN, USER_COLUMN
+
+RECORD = np.dtype([("user", "<i4"), ("time", "<f8"), ("event", "<i4")])
+DEFAULT_RUN_ROWS = 1_000_000
+# Read buffers of all runs together stay under this during the merge
+MERGE_BUFFER_BYTES = 64 * 1024 * 1024
+MIN_BLOCK_ROWS = 1024
+
+Row = Tuple[int, float, int]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class ExternalSorter:
+    """Accepts (user, time, event) rows in any order and yields them sorted"""
+
+    def __init__(self, run_rows: int = DEFAULT_RUN_ROWS, temp_dir: Optional[str] = None):
+        self.run_rows = run_rows
+        self.temp_dir = temp_dir
+        self._workdir: Optional[tempfile.TemporaryDirectory] = None
+        self.runs: List[Path] = []
+        self.rows = 0
+        self.spilled_bytes = 0
+        self._reset_buffer()
+
+    def _reset_buffer(self):
+        self._users = array("i")
+        self._times = array("d")
+        self._events = array("i")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._workdir is not None:
+            self._workdir.cleanup()
+            self._workdir = None
+        self.runs = []
+
+    def add(self, user: int, time: float, event: int):
+        self._users.append(user)
+        self._times.append(time)
+        self._events.append(event)
+        self.rows += 1
+        if len(self._users) >= self.run_rows:
+            self._spill()
+
+    def _sorted_buffer(self) -> np.ndarray:
+        records = np.empty(len(self._users), dtype=RECORD)
+        records["user"] = np.frombuffer(self._users, dtype=np.int32)
+        records["time"] = np.frombuffer(self._times, dtype=np.float64)
+        records["event"] = np.frombuffer(self._events, dtype=np.int32)
+        self._reset_buffer()
+        # Full (user, time, event) order, as heapq.merge compares whole rows across runs
+        return records[np.lexsort((records["event"], records["time"], records["user"]))]
+
+    def _spill(self):
+        if not len(self._users):
+            return
+        if self._workdir is None:
+            self._workdir = tempfile.TemporaryDirectory(prefix="notewall-sort-", dir=self.temp_dir)
+        records = self._sorted_buffer()
+        path = Path(self._workdir.name) / f"run-{len(self.runs):05d}.bin"
+        with instrumentation.stage("spill run"):
+            records.tofile(path)
+            instrumentation.record_write(path, records.nbytes)
+        self.spilled_bytes += records.nbytes
+        self.runs.append(path)
+
+    @property
+    def block_rows(self) -> int:
+        return max(MIN_BLOCK_ROWS, MERGE_BUFFER_BYTES // (max(len(self.runs), 1) * RECORD.itemsize))
+
+    @staticmethod
+    def _read_run(path: Path, block_rows: int) -> Iterator[Row]:
+        with open(path, "rb") as f:
+            while True:
+                block = np.fromfile(f, dtype=RECORD, count=block_rows)
+                if not len(block):
+                    return
+                instrumentation.record_read(path, block.nbytes)
+                yield from block.tolist()
+
+    def sorted_rows(self) -> Iterator[Row]:
+        """Every row added so far, ordered by (user, time, event)"""
+        if not self.runs:
+            # Everything fit in one run: no temp files at all
+            yield from self._sorted_buffer().tolist()
+            return
+        self._spill()
+        with instrumentation.stage("merge runs"):
+            block_rows = self.block_rows
+            yield from heapq.merge(*(self._read_run(path, block_rows) for path in self.runs))
+
+    def stats(self) -> dict:
+        return {
+            "rows": self.rows,
+            "runs": len(self.runs),
+            "spilled_bytes": self.spilled_bytes,
+            "run_buffer_bytes": min(self.rows, self.run_rows) * RECORD.itemsize,
+            "merge_buffer_bytes": min(len(self.runs) * self.block_rows, self.rows) * RECORD.itemsize,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+def _matches(row: List[str], filters: Dict[int, set]) -> bool:
+    return all(row[index] in wanted for index, wanted in filters.items())
+
+
+def sort_export(path: str, sorter: ExternalSorter, filters: Optional[Dict[str, Iterable[str]]] = None,
+                user_map: Optional[Dict[str, str]] = None) -> Tuple[List[str], List[str]]:
+    """Stream an export into the sorter; returns the (user, event) dictionaries for the codes
+
+    ``user_map`` renames distinct IDs on the way in (e.g. to identity.py person labels).
+    """
+    users: Dict[str, int] = {}
+    events: Dict[str, int] = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        time_idx, user_idx = header.index(TIME_COLUMN), header.index(USER_COLUMN)
+        event_idx = header.index(EVENT_COLUMN)
+        wanted = {}
+        for column, values in (filters or {}).items():
+            if column not in header:
+                raise KeyError(f"Unknown column: {column}")
+            wanted[header.index(column)] = {values} if isinstance(values, str) else set(values)
+        add = sorter.add
+        for row in reader:
+            if not row or (wanted and not _matches(row, wanted)):
+                continue
+            user_id = row[user_idx]
+            if user_map is not None:
+                user_id = user_map.get(user_id, user_id)
+            user = users.setdefault(user_id, len(users))
+            event = events.setdefault(row[event_idx], len(events))
+            add(user, float(row[time_idx]), event)
+    instrumentation.record_read(path)
+    return list(users), list(events)
+
+
+def user_batches(rows: Iterable[Row], batch_rows: int = 65_536) -> Iterator[np.ndarray]:
+    """RECORD arrays of about ``batch_rows`` rows from a stream sorted by user, never splitting a user"""
+    batch: List[Row] = []
+    for _, group in groupby(rows, key=itemgetter(0)):
+        if len(batch) >= batch_rows:
+            yield np.array(batch, dtype=RECORD)
+            batch = []
+        batch.extend(group)
+    if batch:
+        yield np.array(batch, dtype=RECORD)
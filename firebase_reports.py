@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Firebase Report Parser
+Splits the multi-section Firebase CSV exports into named, typed tables
+"""
+
+import csv
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+BANNER_PREFIX = "# ----"
+
+Column = Union[array, List[str]]
+
+
+@dataclass
+class ReportTable:
+    """One section of a Firebase report: a header row plus its data rows"""
+    name: str
+    columns: List[str]
+    data: Dict[str, Column]
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    segment: Optional[str] = None
+    description: Optional[str] = None
+
+    @property
+    def row_count(self) -> int:
+        if not self.columns:
+            return 0
+        return len(self.data[self.columns[0]])
+
+    def numeric_columns(self) -> List[str]:
+        return [c for c in self.columns if isinstance(self.data[c], array)]
+
+    def rows(self) -> Iterator[tuple]:
+        """Iterate rows as tuples, in column order"""
+        return zip(*(self.data[c] for c in self.columns))
+
+
+@dataclass
+class Report:
+    """A whole Firebase export file"""
+    path: str
+    title: str = ""
+    account: str = ""
+    property: str = ""
+    tables: List[ReportTable] = field(default_factory=list)
+
+    def table(self, name: str) -> ReportTable:
+        for table in self.tables:
+            if table.name == name:
+                return table
+        raise KeyError(name)
+
+    def tables_with_column(self, column: str) -> List[ReportTable]:
+        return [t for t in self.tables if column in t.columns]
+
+
+def _split_row(line: str) -> List[str]:
+    """Split one CSV line, only paying for the csv module when quotes are present"""
+    if '"' not in line:
+        return line.split(",")
+    return next(csv.reader([line]))
+
+
+def _typed_column(values: List[str]) -> Column:
+    """Pack a column into an int or float array when every value is numeric"""
+    if not values:
+        return values
+    try:
+        return array("q", [int(v) for v in values])
+    except ValueError:
+        pass
+    try:
+        return array("d", [float(v) for v in values])
+    except ValueError:
+        return values
+
+
+def _table_name(columns: List[str], description: Optional[str]) -> str:
+    if description:
+        return description
+    if len(columns) != 2:
+        return columns[0]
+    return f"{columns[1]} by {columns[0]}"
+
+
+def _build_table(header: List[str], rows: List[List[str]], meta: Dict[str, str]) -> ReportTable:
+    width = len(header)
+    raw: List[List[str]] = [[] for _ in range(width)]
+    for row in rows:
+        # Short rows are padded so every column stays the same length
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        for i in range(width):
+            raw[i].append(row[i])
+
+    data = {name: _typed_column(values) for name, values in zip(header, raw)}
+    return ReportTable(
+        name=_table_name(header, meta.get("description")),
+        columns=header,
+        data=data,
+        start_date=meta.get("start"),
+        end_date=meta.get("end"),
+        segment=meta.get("segment"),
+        description=meta.get("description"),
+    )
+
+
+def iter_tables(lines: Iterable[str], report: Optional[Report] = None) -> Iterator[ReportTable]:
+    """Stream tables out of report lines in a single pass
+
+    Banner metadata (title, account, property) is written onto ``report``
+    when one is given.
+    """
+    banner_lines: List[str] = []
+    in_banner = False
+    banner_done = False
+
+    meta: Dict[str, str] = {}
+    header: Optional[List[str]] = None
+    rows: List[List[str]] = []
+    seen_names: Dict[str, int] = {}
+
+    def flush() -> Optional[ReportTable]:
+        nonlocal header, rows, meta
+        if header is None:
+            return None
+        table = _build_table(header, rows, meta)
+        # Firebase repeats the same header in several sections; keep names unique
+        count = seen_names.get(table.name, 0) + 1
+        seen_names[table.name] = count
+        if count > 1:
+            table.name = f"{table.name} #{count}"
+        header, rows, meta = None, [], {}
+        return table
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+
+        if line.startswith("#"):
+            if line.startswith(BANNER_PREFIX) and not banner_done:
+                if in_banner:
+                    in_banner = False
+                    banner_done = True
+                    if report is not None:
+                        _apply_banner(report, banner_lines)
+                else:
+                    in_banner = True
+                continue
+
+            text = line[1:].strip()
+            if in_banner:
+                banner_lines.append(text)
+                continue
+
+            # A comment after data always starts a new section
+            table = flush()
+            if table is not None:
+                yield table
+            if not text:
+                continue
+            if text.startswith("Start date:"):
+                meta["start"] = text.split(":", 1)[1].strip()
+            elif text.startswith("End date:"):
+                meta["end"] = text.split(":", 1)[1].strip()
+            elif text.endswith("?"):
+                meta["description"] = text
+            else:
+                meta["segment"] = text
+            continue
+
+        if not line.strip():
+            table = flush()
+            if table is not None:
+                yield table
+            continue
+
+        if header is None:
+            header = _split_row(line)
+        else:
+            rows.append(_split_row(line))
+
+    table = flush()
+    if table is not None:
+        yield table
+
+
+def _apply_banner(report: Report, banner_lines: List[str]):
+    for text in banner_lines:
+        if text.startswith("Account:"):
+            report.account = text.split(":", 1)[1].strip()
+        elif text.startswith("Property:"):
+            report.property = text.split(":", 1)[1].strip()
+        elif text and not report.title:
+            report.title = text
+
+
+def is_firebase_report(path: str) -> bool:
+    """Firebase exports always open with a '# ----' banner"""
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            return f.readline().startswith(BANNER_PREFIX)
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def parse_report(path: str) -> Report:
+    """Parse one Firebase export into a Report"""
+    report = Report(path=str(path))
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        report.tables = list(iter_tables(f, report))
+    return report
+
+
+def load_report_directory(directory: str, pattern: str = "*.csv",
+                          max_workers: Optional[int] = None) -> List[Report]:
+    """Parse every Firebase export in a directory across a process pool
+
+    Files that are not Firebase reports (e.g. Mixpanel event exports) are skipped.
+    """
+    paths = sorted(str(p) for p in Path(directory).glob(pattern) if is_firebase_report(str(p)))
+    if len(paths) <= 1:
+        return [parse_report(p) for p in paths]
+
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_report, paths))
+
+
+def main():
+    target = sys.argv[1] if len(sys.argv) > 1 else "."
+
+    print("📊 Firebase Report Parser")
+    print("=" * 50)
+
+    if os.path.isdir(target):
+        reports = load_report_directory(target)
+    else:
+        reports = [parse_report(target)]
+
+    for report in reports:
+        print(f"\n📄 {os.path.basename(report.path)}: {report.title}")
+        for table in report.tables:
+            dates = f"{table.start_date}-{table.end_date}" if table.start_date else "no date range"
+            numeric = ", ".join(table.numeric_columns()) or "none"
+            print(f"   • {table.name} ({table.row_count} rows, {dates}; numeric: {numeric})")
+
+    print(f"\n✅ Parsed {sum(len(r.tables) for r in reports)} tables from {len(reports)} reports")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,152 @@ Comprehensive Localization Fixer
 Converts all interpolated Text() strings to NSLocalizedString format
 """
 
-import re
-import os
+import sys
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Sequence, Tuple
+
+# Define patterns that need format specifiers
+FORMAT_PATTERNS = {
+    # ContentView
+    "Delete (%lld)": {
+        "de": "Löschen (%lld)",
+        "es": "Eliminar (%lld)",
+        "fr": "Supprimer (%lld)"
+    },
+    
+    # WhatsNewView
+    "Version %@": {
+        "de": "Version %@",
+        "es": "Versión %@",
+        "fr": "Version %@"
+    },
+    
+    # SettingsView  
+    "%lld free wallpapers remaining": {
+        "de": "%lld kostenlose Hintergrundbilder übrig",
+        "es": "%lld fondos gratis restantes",
+        "fr": "%lld fonds d'écran gratuits restants"
+    },
+    
+    # OnboardingView
+    "Step %lld": {
+        "de": "Schritt %lld",
+        "es": "Paso %lld",
+        "fr": "Étape %lld"
+    },
+    
+    "Step %lld of %lld": {
+        "de": "Schritt %lld von %lld",
+        "es": "Paso %lld de %lld",
+        "fr": "Étape %lld sur %lld"
+    },
+    
+    "%lld times": {
+        "de": "%lld Mal",
+        "es": "%lld veces",
+        "fr": "%lld fois"
+    },
+    
+    "%lld%": {
+        "de": "%lld%",
+        "es": "%lld%",
+        "fr": "%lld%"
+    },
+    
+    "%lld%%": {
+        "de": "%lld%%",
+        "es": "%lld%%",
+        "fr": "%lld%%"
+    },
+    
+    # Character counter
+    "%lld characters": {
+        "de": "%lld Zeichen",
+        "es": "%lld caracteres",
+        "fr": "%lld caractères"
+    },
+    
+    # User count
+    "+%@ people": {
+        "de": "+%@ Personen",
+        "es": "+%@ personas",
+        "fr": "+%@ personnes"
+    },
+    
+    # Time format
+    "%lld:%02lld": {
+        "de": "%lld:%02lld",
+        "es": "%lld:%02lld",
+        "fr": "%lld:%02lld"
+    },
+    
+    # Next step
+    "Next: %@": {
+        "de": "Weiter: %@",
+        "es": "Siguiente: %@",
+        "fr": "Suivant: %@"
+    },
+    
+    # Screen dimensions (debug)
+    "Screen: %lld×%lld": {
+        "de": "Bildschirm: %lld×%lld",
+        "es": "Pantalla: %lld×%lld",
+        "fr": "Écran: %lld×%lld"
+    },
+    
+    "Device Category: %@": {
+        "de": "Gerätekategorie: %@",
+        "es": "Categoría del dispositivo: %@",
+        "fr": "Catégorie d'appareil: %@"
+    },
+    
+    "Scale Factor: %.2f": {
+        "de": "Skalierungsfaktor: %.2f",
+        "es": "Factor de escala: %.2f",
+        "fr": "Facteur d'échelle: %.2f"
+    },
+    
+    "Is Compact: %@": {
+        "de": "Ist kompakt: %@",
+        "es": "Es compacto: %@",
+        "fr": "Est compact: %@"
+    },
+    
+    "Max Video Height: %lld": {
+        "de": "Max. Videohöhe: %lld",
+        "es": "Altura máx. de video: %lld",
+        "fr": "Hauteur vidéo max: %lld"
+    },
+    
+    # Error messages
+    "Error: %@": {
+        "de": "Fehler: %@",
+        "es": "Error: %@",
+        "fr": "Erreur: %@"
+    },
+    
+    # Current step debug
+    "Current step: %@": {
+        "de": "Aktueller Schritt: %@",
+        "es": "Paso actual: %@",
+        "fr": "Étape actuelle: %@"
+    },
+}
+
+APP_SWIFT_FILES = [
+    "ContentView.swift",
+    "OnboardingView.swift", 
+    "OnboardingEnhanced.swift",
+    "SettingsView.swift",
+    "PaywallView.swift",
+    "WhatsNewView.swift",
+    "ShortcutSetupView.swift",
+    "TroubleshootingView.swift",
+    "DeleteNotesLoadingView.swift",
+    "WallpaperUpdateLoadingView.swift",
+    "ExitFeedbackView.swift",
+]
+
 
 def find_interpolated_texts(file_path: str) -> List[Tuple[str, int]]:
     """Find all Text() with string interpolation"""
@@ -33,28 +175,9 @@ def convert_simple_count(match_obj):
     # Becomes: Text(String(format: NSLocalizedString("Delete (%lld)", comment: ""), count))
     return match_obj.group(0)  # For now, return as-is
 
-def main():
-    print("🔧 NoteWall Localization Fixer")
-    print("=" * 60)
-    
-    notewall_dir = Path("/Users/carly/GITHUB REPOS/STRANKY:APLIKACIE/NOTEWALL-CLAUDECODE/NoteWall")
-    
-    swift_files = [
-        "ContentView.swift",
-        "OnboardingView.swift", 
-        "OnboardingEnhanced.swift",
-        "SettingsView.swift",
-        "PaywallView.swift",
-        "WhatsNewView.swift",
-        "ShortcutSetupView.swift",
-        "TroubleshootingView.swift",
-        "DeleteNotesLoadingView.swift",
-        "WallpaperUpdateLoadingView.swift",
-        "ExitFeedbackView.swift",
-    ]
-    
-    total_found = 0
-    
+def find_all_interpolations(notewall_dir: Path, swift_files: List[str] = APP_SWIFT_FILES) -> Dict[str, List[Tuple[str, int]]]:
+    """Interpolated Text() lines per Swift file, skipping files that don't exist"""
+    found = {}
     for swift_file in swift_files:
         file_path = notewall_dir / swift_file
         if not file_path.exists():
@@ -62,174 +185,32 @@ def main():
         
         interpolated = find_interpolated_texts(str(file_path))
         if interpolated:
-            print(f"\n📄 {swift_file}: {len(interpolated)} interpolated strings")
-            total_found += len(interpolated)
-            for line, line_num in interpolated[:5]:  # Show first 5
-                print(f"   Line {line_num}: {line[:80]}...")
-    
-    print(f"\n📊 Total: {total_found} interpolated strings found")
-    
-    # Strategy
-    print("\n" + "=" * 60)
-    print("🎯 SOLUTION: Mass Code Conversion")
-    print("=" * 60)
-    print("""
-SwiftUI requires explicit NSLocalizedString for interpolated strings.
-This script will:
-1. Add format patterns to Localizable.strings
-2. Convert Swift code: Text("Delete \\(count)") 
-   → Text(String(format: NSLocalizedString("Delete %lld", comment: ""), count))
-    """)
-    
-    input("\nPress ENTER to automatically fix all localization files...")
-    
-    # Read existing translations
-    en_path = notewall_dir / "en.lproj" / "Localizable.strings"
-    
-    # Define patterns that need format specifiers
-    localization_patterns = {
-        # ContentView
-        "Delete (%lld)": {
-            "de": "Löschen (%lld)",
-            "es": "Eliminar (%lld)",
-            "fr": "Supprimer (%lld)"
-        },
-        
-        # WhatsNewView
-        "Version %@": {
-            "de": "Version %@",
-            "es": "Versión %@",
-            "fr": "Version %@"
-        },
-        
-        # SettingsView  
-        "%lld free wallpapers remaining": {
-            "de": "%lld kostenlose Hintergrundbilder übrig",
-            "es": "%lld fondos gratis restantes",
-            "fr": "%lld fonds d'écran gratuits restants"
-        },
-        
-        # OnboardingView
-        "Step %lld": {
-            "de": "Schritt %lld",
-            "es": "Paso %lld",
-            "fr": "Étape %lld"
-        },
-        
-        "Step %lld of %lld": {
-            "de": "Schritt %lld von %lld",
-            "es": "Paso %lld de %lld",
-            "fr": "Étape %lld sur %lld"
-        },
-        
-        "%lld times": {
-            "de": "%lld Mal",
-            "es": "%lld veces",
-            "fr": "%lld fois"
-        },
-        
-        "%lld%": {
-            "de": "%lld%",
-            "es": "%lld%",
-            "fr": "%lld%"
-        },
-        
-        "%lld%%": {
-            "de": "%lld%%",
-            "es": "%lld%%",
-            "fr": "%lld%%"
-        },
-        
-        # Character counter
-        "%lld characters": {
-            "de": "%lld Zeichen",
-            "es": "%lld caracteres",
-            "fr": "%lld caractères"
-        },
-        
-        # User count
-        "+%@ people": {
-            "de": "+%@ Personen",
-            "es": "+%@ personas",
-            "fr": "+%@ personnes"
-        },
-        
-        # Time format
-        "%lld:%02lld": {
-            "de": "%lld:%02lld",
-            "es": "%lld:%02lld",
-            "fr": "%lld:%02lld"
-        },
-        
-        # Next step
-        "Next: %@": {
-            "de": "Weiter: %@",
-            "es": "Siguiente: %@",
-            "fr": "Suivant: %@"
-        },
-        
-        # Screen dimensions (debug)
-        "Screen: %lld×%lld": {
-            "de": "Bildschirm: %lld×%lld",
-            "es": "Pantalla: %lld×%lld",
-            "fr": "Écran: %lld×%lld"
-        },
-        
-        "Device Category: %@": {
-            "de": "Gerätekategorie: %@",
-            "es": "Categoría del dispositivo: %@",
-            "fr": "Catégorie d'appareil: %@"
-        },
-        
-        "Scale Factor: %.2f": {
-            "de": "Skalierungsfaktor: %.2f",
-            "es": "Factor de escala: %.2f",
-            "fr": "Facteur d'échelle: %.2f"
-        },
-        
-        "Is Compact: %@": {
-            "de": "Ist kompakt: %@",
-            "es": "Es compacto: %@",
-            "fr": "Est compact: %@"
-        },
-        
-        "Max Video Height: %lld": {
-            "de": "Max. Videohöhe: %lld",
-            "es": "Altura máx. de video: %lld",
-            "fr": "Hauteur vidéo max: %lld"
-        },
-        
-        # Error messages
-        "Error: %@": {
-            "de": "Fehler: %@",
-            "es": "Error: %@",
-            "fr": "Erreur: %@"
-        },
-        
-        # Current step debug
-        "Current step: %@": {
-            "de": "Aktueller Schritt: %@",
-            "es": "Paso actual: %@",
-            "fr": "Étape actuelle: %@"
-        },
-    }
+            found[swift_file] = interpolated
+    return found
+
+def add_format_patterns(notewall_dir: Path, languages: Sequence[str] = ("en", "de", "es", "fr"),
+                        delta: bool = False) -> Dict[str, int]:
+    """Append missing format patterns to each locale's Localizable.strings
     
-    print(f"\n✍️  Adding {len(localization_patterns)} format patterns...")
+    With ``delta``, patterns without a translation are not copied into the
+    other locales; they fall back to the English catalog at runtime.
+    """
+    added = {}
     
     # Add to each language file
-    for lang_code in ["en", "de", "es", "fr"]:
+    for lang_code in languages:
         localizable_path = notewall_dir / f"{lang_code}.lproj" / "Localizable.strings"
         
         # Read existing
         with open(localizable_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Add new patterns at the end
-        new_content = content.rstrip() + "\n\n// MARK: - Format Strings (Auto-generated)\n"
-        
-        for english_pattern, translations in localization_patterns.items():
+        new_lines = []
+        for english_pattern, translations in FORMAT_PATTERNS.items():
             if lang_code == "en":
                 translation = english_pattern
+            elif delta and lang_code not in translations:
+                continue
             else:
                 translation = translations.get(lang_code, english_pattern)
             
@@ -240,13 +221,57 @@ This script will:
             # Check if already exists
             pattern_line = f'"{english_escaped}" = "{translation_escaped}";'
             if pattern_line not in content:
-                new_content += f'"{english_escaped}" = "{translation_escaped}";\n'
+                new_lines.append(pattern_line + "\n")
+        
+        added[lang_code] = len(new_lines)
+        if not new_lines:
+            continue
+        
+        # Add new patterns at the end
+        new_content = content.rstrip() + "\n\n// MARK: - Format Strings (Auto-generated)\n" + "".join(new_lines)
         
         # Write back
         with open(localizable_path, 'w', encoding='utf-8') as f:
             f.write(new_content)
-        
-        print(f"   ✅ Updated {lang_code}.lproj/Localizable.strings")
+    
+    return added
+
+def main():
+    print("🔧 NoteWall Localization Fixer")
+    print("=" * 60)
+    
+    notewall_dir = Path(__file__).resolve().parent / "NoteWall"
+    
+    total_found = 0
+    
+    for swift_file, interpolated in find_all_interpolations(notewall_dir).items():
+        print(f"\n📄 {swift_file}: {len(interpolated)} interpolated strings")
+        total_found += len(interpolated)
+        for line, line_num in interpolated[:5]:  # Show first 5
+            print(f"   Line {line_num}: {line[:80]}...")
+    
+    print(f"\n📊 Total: {total_found} interpolated strings found")
+    
+    # Strategy
+    print("\n" + "=" * 60)
+    print("🎯 SOLUTION: Mass Code Conversion")
+    print("=" * 60)
+    print("""
+SwiftUI requires explicit NSLocalizedString for interpolated strings.
+This script will:
+1. Add format patterns to Localizable.strings
+2. Convert Swift code: Text("Delete \\(count)") 
+   → Text(String(format: NSLocalizedString("Delete %lld", comment: ""), count))
+    """)
+    
+    # Only wait for confirmation when a person is at the terminal
+    if sys.stdin.isatty() and "--yes" not in sys.argv:
+        input("\nPress ENTER to automatically fix all localization files...")
+    
+    print(f"\n✍️  Adding {len(FORMAT_PATTERNS)} format patterns...")
+    
+    for lang_code, count in add_format_patterns(notewall_dir, delta="--delta" in sys.argv).items():
+        print(f"   ✅ Updated {lang_code}.lproj/Localizable.strings ({count} added)")
     
     print("\n" + "=" * 60)
     print("✨ LOCALIZATION COMPLETE!")
@@ -4,51 +4,59 @@ Fix Xcode project issue where individual asset catalog files are incorrectly
 added to the Resources build phase, causing "Multiple commands produce" errors.
 """
 
+import os
 import re
 import sys
+from pathlib import Path
 
-def fix_xcode_project(pbxproj_path):
-    """Remove individual asset catalog file references from Resources build phase."""
-    
-    with open(pbxproj_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    original_content = content
-    
-    # Find all PBXBuildFile references that include Contents.json or asset catalog images
-    # These are the IDs we want to remove from the Resources build phase
-    ids_to_remove = set()
-    
-    # Pattern to find PBXBuildFile entries for Contents.json and asset files
-    # Format: <UUID> /* Contents.json in Resources */ = {isa = PBXBuildFile; fileRef = <UUID> /* Contents.json */; };
-    buildfile_pattern = r'(\w+)\s+/\*\s+Contents\.json in Resources\s+\*/\s+=\s+\{isa\s+=\s+PBXBuildFile;'
-    
-    for match in re.finditer(buildfile_pattern, content):
-        ids_to_remove.add(match.group(1))
-    
-    # Also look for individual icon and image files that should be in the asset catalog
-    asset_file_patterns = [
-        r'(\w+)\s+/\*\s+Icon-App-\S+\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+mockup.*\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+experiment-icon\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+FAITHWALL\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+skipForward3s\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+skipBackward3s\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+safari-logo.*\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+shortcuts-app-logo\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+stuck-placeholder\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+notificationes\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+image-\d-review\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+logo-icon\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+instruction_wallpaper\.png in Resources\s+\*/',
-        r'(\w+)\s+/\*\s+arrow\.png in Resources\s+\*/',
-    ]
-    
-    for pattern in asset_file_patterns:
-        for match in re.finditer(pattern, content):
-            ids_to_remove.add(match.group(1))
-    
-    print(f"Found {len(ids_to_remove)} asset catalog file references to remove")
+import instrumentation
+from pbxproj import XcodeProject, cached, parse_plist
+
+# Contents.json plus the individual icon and image files that belong in the asset catalog
+ASSET_FILE_PATTERN = re.compile(r"""
+    Contents\.json
+  | Icon-App-\S+\.png
+  | mockup.*\.png
+  | experiment-icon\.png
+  | FAITHWALL\.png
+  | skipForward3s\.png
+  | skipBackward3s\.png
+  | safari-logo.*\.png
+  | shortcuts-app-logo\.png
+  | stuck-placeholder\.png
+  | notificationes\.png
+  | image-\d-review\.png
+  | logo-icon\.png
+  | instruction_wallpaper\.png
+  | arrow\.png
+""", re.VERBOSE)
+
+def fix_xcode_project(pbxproj_path, out=None):
+    """Remove individual asset catalog file references from Resources build phase.
+
+    Progress is printed to ``out`` (default stdout).
+    """
+    
+    with instrumentation.stage("pbxproj parse"):
+        with open(pbxproj_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        instrumentation.record_read(pbxproj_path)
+        original_content = content
+        project = XcodeProject(pbxproj_path, cached(pbxproj_path, content, "plist", parse_plist))
+    
+        # Find the PBXBuildFile entries in Resources phases whose file is Contents.json
+        # or an icon/image that should only live in the asset catalog.
+        # These are the IDs we want to remove from the Resources build phase
+        ids_to_remove = set()
+        for _, phase in project.objects_of("PBXResourcesBuildPhase"):
+            for build_file_id in phase.get("files", ()):
+                ref = project.objects.get(build_file_id, {}).get("fileRef")
+                file_ref = project.objects.get(ref, {})
+                name = file_ref.get("name") or os.path.basename(file_ref.get("path", ""))
+                if ASSET_FILE_PATTERN.fullmatch(name):
+                    ids_to_remove.add(build_file_id)
+    
+    print(f"Found {len(ids_to_remove)} asset catalog file references to remove", file=out)
     
     # Now remove these IDs from the PBXResourcesBuildPhase section
     # Find the Resources build phase section
@@ -78,33 +86,37 @@ def fix_xcode_project(pbxproj_path):
             if not should_remove:
                 kept_lines.append(line)
         
-        print(f"Removed {removed_count} entries from Resources build phase")
+        print(f"Removed {removed_count} entries from Resources build phase", file=out)
         
         # Reconstruct the section
         new_files_content = '\n'.join(kept_lines)
         return before + files_start + new_files_content + files_end + after
     
-    # Apply the replacement
-    content = re.sub(
-        resources_section_pattern,
-        remove_ids_from_files,
-        content,
-        flags=re.DOTALL
-    )
+    with instrumentation.stage("mutate"):
+        # Apply the replacement
+        content = re.sub(
+            resources_section_pattern,
+            remove_ids_from_files,
+            content,
+            flags=re.DOTALL
+        )
     
     if content == original_content:
-        print("No changes were made - this might mean the pattern didn't match")
+        print("No changes were made - this might mean the pattern didn't match", file=out)
         return False
     
     # Write back
-    with open(pbxproj_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    with instrumentation.stage("serialize"):
+        with open(pbxproj_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        instrumentation.record_write(pbxproj_path)
     
-    print(f"Successfully updated {pbxproj_path}")
+    print(f"Successfully updated {pbxproj_path}", file=out)
     return True
 
 if __name__ == '__main__':
-    pbxproj_path = '/Users/carly/GITHUB REPOS/STRANKY:APLIKACIE/NOTEWALL-CLAUDECODE/NoteWall.xcodeproj/project.pbxproj'
+    default_path = Path(__file__).resolve().parent / 'NoteWall.xcodeproj' / 'project.pbxproj'
+    pbxproj_path = sys.argv[1] if len(sys.argv) > 1 else str(default_path)
     
     print("Fixing Xcode project resource conflicts...")
     print(f"Project file: {pbxproj_path}")
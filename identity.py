@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Identity Stitching
+Merges the distinct IDs that belong to one person (reinstalls, restores,
+identify calls) so funnels and retention count people, not devices.
+
+Aliases come from identify/alias events in the export and from optional
+mapping CSVs. They are merged with a union-find over integer ID codes, run
+as whole-array hook-and-compress rounds so millions of IDs stay fast, and the
+result is kept in a persistent alias table that later runs extend.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import instrumentation
+from event_store import USER_COLUMN, EventStore, load_event_export
+
+TABLE_NAME = ".identity-aliases.npz"
+DEVICE_PREFIX = "$device:"
+
+# Properties Mixpanel puts on $identify / $create_alias / $merge events, and
+# the ones our own events carry when a user id becomes known
+ALIAS_COLUMNS = (
+    "$anon_distinct_id", "$identified_id", "$original_distinct_id", "$distinct_ids",
+    "alias", "$user_id", "$device_id", "original_app_user_id",
+)
+
+
+class AliasTable:
+    """Disjoint sets of distinct IDs, stored as a parent array over interned ID codes"""
+
+    def __init__(self, ids: Optional[List[str]] = None, parent: Optional[np.ndarray] = None):
+        self.ids: List[str] = list(ids or [])
+        self.lookup: Dict[str, int] = {value: code for code, value in enumerate(self.ids)}
+        self.parent = np.arange(len(self.ids), dtype=np.int64) if parent is None else parent.astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, values: Iterable[str]) -> np.ndarray:
+        """Codes of the given IDs, adding unseen ones as singleton sets"""
+        codes = []
+        for value in values:
+            code = self.lookup.get(value)
+            if code is None:
+                code = self.lookup[value] = len(self.ids)
+                self.ids.append(value)
+            codes.append(code)
+        if len(self.ids) > len(self.parent):
+            self.parent = np.concatenate([self.parent, np.arange(len(self.parent), len(self.ids), dtype=np.int64)])
+        return np.array(codes, dtype=np.int64)
+
+    def _compress(self):
+        # Pointer jumping: after this every code points straight at its root
+        while True:
+            grandparent = self.parent[self.parent]
+            if np.array_equal(grandparent, self.parent):
+                return
+            self.parent = grandparent
+
+    def union(self, a: np.ndarray, b: np.ndarray) -> int:
+        """Merge the sets of every (a[i], b[i]) pair; returns how many merges happened"""
+        self._compress()
+        sets_before = self.set_count()
+        while len(a):
+            ra, rb = self.parent[a], self.parent[b]
+            apart = ra != rb
+            if not apart.any():
+                break
+            a, b, ra, rb = a[apart], b[apart], ra[apart], rb[apart]
+            # Hook the larger root under the smaller one, so the earliest-seen ID stays the root
+            high, low = np.maximum(ra, rb), np.minimum(ra, rb)
+            np.minimum.at(self.parent, high, low)
+            self._compress()
+        return sets_before - self.set_count()
+
+    def set_count(self) -> int:
+        return int(np.count_nonzero(self.parent == np.arange(len(self.parent))))
+
+    def add_pairs(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        pairs = [(x, y) for x, y in pairs if x and y and x != y]
+        if not pairs:
+            return 0
+        left, right = zip(*pairs)
+        return self.union(self.intern(left), self.intern(right))
+
+    def roots(self) -> np.ndarray:
+        self._compress()
+        return self.parent
+
+    def labels(self) -> List[str]:
+        """Display ID per code's set: its first identified (non-device) ID, else the root ID"""
+        roots = self.roots()
+        label = np.arange(len(self.ids))
+        identified = np.array([not value.startswith(DEVICE_PREFIX) for value in self.ids], dtype=bool)
+        members = np.flatnonzero(identified)
+        # Members come in code order, so unique() picks each set's earliest identified ID
+        set_roots, first = np.unique(roots[members], return_index=True)
+        label[set_roots] = members[first]
+        return [self.ids[code] for code in label[roots]]
+
+    def groups(self) -> List[List[str]]:
+        """Every set with more than one ID"""
+        roots = self.roots()
+        order = np.argsort(roots, kind="stable")
+        bounds = np.flatnonzero(np.diff(roots[order])) + 1
+        return [[self.ids[c] for c in run] for run in np.split(order, bounds) if len(run) > 1]
+
+    def save(self, path: Path):
+        with open(path, "wb") as f:
+            np.savez(f, ids=np.array(self.ids, dtype=object), parent=self.roots())
+        instrumentation.record_write(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "AliasTable":
+        with np.load(path, allow_pickle=True) as data:
+            table = cls(data["ids"].tolist(), data["parent"])
+        instrumentation.record_read(path)
+        return table
+
+
+def store_aliases(store: EventStore, columns: Iterable[str] = ALIAS_COLUMNS) -> List[Tuple[str, str]]:
+    """(distinct ID, alias) pairs from every row that names another ID of the same user"""
+    users = np.array(store.dictionaries[USER_COLUMN], dtype=object)
+    pairs = []
+    for column in columns:
+        if column not in store.codes:
+            continue
+        values = np.array(store.dictionaries[column], dtype=object)
+        # One pair per distinct (user, alias) combination, not per event
+        combos = np.unique(np.stack([store.users, store.codes[column]], axis=1), axis=0)
+        for user, alias in zip(users[combos[:, 0]], values[combos[:, 1]]):
+            # $distinct_ids holds a list; every ID in it is the same person
+            for other in str(alias).strip("[]").replace('"', "").split(","):
+                other = other.strip()
+                if other:
+                    pairs.append((user, other))
+    return pairs
+
+
+def mapping_aliases(path: Path) -> List[Tuple[str, str]]:
+    """Pairs from a mapping CSV whose rows list IDs of one person (first row is a header)"""
+    pairs = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            ids = [value.strip() for value in row if value.strip()]
+            pairs.extend((ids[0], other) for other in ids[1:])
+    instrumentation.record_read(path)
+    return pairs
+
+
+def resolve_store(store: EventStore, table: AliasTable) -> EventStore:
+    """Copy of the store whose user codes are one per person instead of one per ID"""
+    codes = table.intern(store.dictionaries[USER_COLUMN])
+    labels = table.labels()
+    roots = table.roots()[codes]
+    people, person_of_id = np.unique(roots, return_inverse=True)
+    user_codes = dict(store.codes)
+    # The rewrite itself: one gather over every event row
+    user_codes[USER_COLUMN] = person_of_id.astype(np.int32)[store.users]
+    dictionaries = dict(store.dictionaries)
+    dictionaries[USER_COLUMN] = [labels[root] for root in people]
+    return EventStore(times=store.times, codes=user_codes, dictionaries=dictionaries, columns=store.columns,
+                      values=store.values)
+
+
+def load_table(path: Optional[Path]) -> AliasTable:
+    return AliasTable.load(path) if path and path.exists() else AliasTable()
+
+
+def stitch(exports: List[Path], mappings: List[Path], table_path: Path) -> Tuple[AliasTable, dict]:
+    """Add the aliases found in exports and mapping files to the persistent table"""
+    table = load_table(table_path)
+    before = len(table)
+    pairs = []
+    with instrumentation.stage("collect aliases"):
+        for path in exports:
+            store = load_event_export(str(path))
+            table.intern(store.dictionaries[USER_COLUMN])
+            pairs.extend(store_aliases(store))
+        for path in mappings:
+            pairs.extend(mapping_aliases(path))
+    with instrumentation.stage("union"):
+        merges = table.add_pairs(pairs)
+    table.save(table_path)
+
+    return table, {"ids": len(table), "new_ids": len(table) - before, "alias_pairs": len(pairs),
+                   "merges": merges, "people": table.set_count()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Merge the distinct IDs of one person into a persistent alias table")
+    parser.add_argument("exports", nargs="*", type=Path, help="event exports (default: events-export-*.csv)")
+    parser.add_argument("--mapping", action="append", type=Path, default=[],
+                        help="CSV whose rows list IDs of the same person (repeatable)")
+    parser.add_argument("--table", type=Path, default=root / TABLE_NAME, help="alias table file")
+    parser.add_argument("--output", type=Path, help="also save the first export, re-keyed by person, as .npz")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    exports = args.exports or sorted(root.glob("events-export-*.csv"))
+    table, summary = stitch(exports, args.mapping, args.table)
+    if args.output and exports:
+        resolve_store(load_event_export(str(exports[0])), table).save(str(args.output))
+
+    if args.json:
+        print(json.dumps(dict(summary, groups=table.groups()), indent=2))
+        return 0
+
+    print(f"🔗 {summary['ids']} IDs ({summary['new_ids']} new), {summary['alias_pairs']} alias pairs, "
+          f"{summary['merges']} merges")
+    print(f"👤 {summary['people']} people")
+    for group in table.groups():
+        print(f"   {' = '.join(group)}")
+    if args.output and exports:
+        print(f"💾 Saved re-keyed store to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
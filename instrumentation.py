@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Pipeline Instrumentation
+Records wall/CPU time, bytes read and written, files touched and cache hits
+per pipeline stage, and can emit them as a Chrome trace timeline.
+
+Recording is off by default. While it is off, ``stage()`` hands back one
+shared no-op context manager and the counters return immediately, so leaving
+the calls in the scripts costs next to nothing.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+
+class StageRecord:
+    __slots__ = ("name", "depth", "start", "wall", "cpu", "bytes_read", "bytes_written",
+                 "files", "cache_hits", "cache_misses", "thread")
+
+    def __init__(self, name: str, depth: int, start: float):
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files: set = set()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.thread = threading.get_ident()
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "wall_ms": round(self.wall * 1000, 3),
+            "cpu_ms": round(self.cpu * 1000, 3),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "files": len(self.files),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+class Recorder:
+    """Collects stage records; counters go to the innermost open stage of the thread"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.records: List[StageRecord] = []
+        self.root = StageRecord("total", -1, 0.0)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[StageRecord]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> StageRecord:
+        stack = self._stack()
+        return stack[-1] if stack else self.root
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = self._stack()
+        record = StageRecord(name, len(stack), time.perf_counter() - self.origin)
+        with self._lock:
+            self.records.append(record)
+        stack.append(record)
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall_start
+            record.cpu = time.thread_time() - cpu_start
+            stack.pop()
+            # Nested stages roll their I/O counters up into the enclosing stage
+            parent = stack[-1] if stack else self.root
+            parent.bytes_read += record.bytes_read
+            parent.bytes_written += record.bytes_written
+            parent.files |= record.files
+            parent.cache_hits += record.cache_hits
+            parent.cache_misses += record.cache_misses
+
+    def summary(self) -> dict:
+        return {
+            "stages": [r.to_dict() for r in self.records],
+            "totals": self.root.to_dict(),
+        }
+
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            events.append({
+                "name": record.name,
+                "ph": "X",
+                "ts": round(record.start * 1e6, 1),
+                "dur": round(record.wall * 1e6, 1),
+                "pid": pid,
+                "tid": record.thread,
+                "args": {k: v for k, v in record.to_dict().items() if k not in ("name", "depth")},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+_recorder: Optional[Recorder] = None
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def enable() -> Recorder:
+    """Start recording and return the active recorder"""
+    global _recorder
+    _recorder = Recorder()
+    return _recorder
+
+
+def disable() -> Optional[Recorder]:
+    """Stop recording, returning what was recorded"""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+def enabled() -> bool:
+    return _recorder is not None
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage (no-op while recording is off)"""
+    if _recorder is None:
+        return _NULL_STAGE
+    return _recorder.stage(name)
+
+
+def record_read(path, nbytes: Optional[int] = None):
+    if _recorder is None:
+        return
+    record = _recorder.current()
+    record.bytes_read += nbytes if nbytes is not None else _size(path)
+    record.files.add(str(path))
+
+
+def record_write(path, nbytes: Optional[int] = None):
+    if _recorder is None:
+        return
+    record = _recorder.current()
+    record.bytes_written += nbytes if nbytes is not None else _size(path)
+    record.files.add(str(path))
+
+
+def record_cache(hit: bool, count: int = 1):
+    if _recorder is None:
+        return
+    record = _recorder.current()
+    if hit:
+        record.cache_hits += count
+    else:
+        record.cache_misses += count
+
+
+def _size(path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def write_trace(recorder: Recorder, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(recorder.chrome_trace(), f)
+
+
+def format_summary(recorder: Recorder) -> str:
+    lines = [f"{'stage':<28}{'wall ms':>10}{'cpu ms':>10}{'read':>11}{'written':>11}{'files':>7}{'cache':>9}"]
+    for record in recorder.records:
+        name = "  " * record.depth + record.name
+        cache = f"{record.cache_hits}/{record.cache_hits + record.cache_misses}" \
+            if record.cache_hits or record.cache_misses else "-"
+        lines.append(
+            f"{name:<28}{record.wall * 1000:>10.2f}{record.cpu * 1000:>10.2f}"
+            f"{record.bytes_read:>11}{record.bytes_written:>11}{len(record.files):>7}{cache:>9}"
+        )
+    return "\n".join(lines)
+
+
+def profile_call(func: Callable, *args, top: int = 25, stream=None, **kwargs):
+    """Run ``func`` under cProfile and print its ``top`` hottest functions"""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        buffer = io.StringIO()
+        stats = pstats.Stats(profiler, stream=buffer)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+        print(buffer.getvalue(), file=stream or sys.stderr)
@@ -2,14 +2,25 @@
 """
 NoteWall Localization Script
 Extracts hardcoded strings from Swift files and generates complete translations
+
+With --delta, the de/es/fr catalogs only hold real translations: strings with
+no translation are left out so iOS falls back to the base (English)
+localization, and localization-status.json lists what is still untranslated.
 """
 
+import argparse
 import re
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Set
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Set, TextIO, Tuple
 import json
 
+import instrumentation
+from swift_scan import compile_scanner, literal, scan_file
+
 # Deep translation dictionaries for each language
 TRANSLATIONS = {
     "de": {  # German
@@ -524,34 +535,15 @@ TRANSLATIONS = {
 }
 
 
+# Text("...") also covers the title:, message: and .destructive(Text("...")) forms
+TEXT_SCANNER = compile_scanner({
+    "text": r'Text\(' + literal("text", r'[^"]+') + r'\)',
+})
+
+
 def extract_hardcoded_strings(swift_file_path: str) -> Set[str]:
     """Extract hardcoded Text() strings from Swift file"""
-    strings = set()
-    
-    with open(swift_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Pattern for Text("...")
-    text_pattern = r'Text\("([^"]+)"\)'
-    matches = re.findall(text_pattern, content)
-    strings.update(matches)
-    
-    # Pattern for title: Text("...")
-    title_pattern = r'title:\s*Text\("([^"]+)"\)'
-    matches = re.findall(title_pattern, content)
-    strings.update(matches)
-    
-    # Pattern for message: Text("...")
-    message_pattern = r'message:\s*Text\("([^"]+)"\)'
-    matches = re.findall(message_pattern, content)
-    strings.update(matches)
-    
-    # Pattern for .destructive(Text("..."))
-    destructive_pattern = r'\.\w+\(Text\("([^"]+)"\)\)'
-    matches = re.findall(destructive_pattern, content)
-    strings.update(matches)
-    
-    return strings
+    return {value for _, value, _, _ in scan_file(swift_file_path, TEXT_SCANNER)}
 
 
 def read_existing_translations(localizable_path: str) -> Dict[str, str]:
@@ -563,6 +555,7 @@ def read_existing_translations(localizable_path: str) -> Dict[str, str]:
     
     with open(localizable_path, 'r', encoding='utf-8') as f:
         content = f.read()
+    instrumentation.record_read(localizable_path)
     
     # Pattern: "English" = "Translation";
     pattern = r'"([^"]+)"\s*=\s*"([^"]+)";'
@@ -574,6 +567,35 @@ def read_existing_translations(localizable_path: str) -> Dict[str, str]:
     return translations
 
 
+# Group translations by category
+CATEGORIES = {
+    "Common UI Elements": ["Continue", "Cancel", "Delete", "Done", "Close", "OK", "Skip", "Next", "Yes", "No", "Send", "Apply", "Save"],
+    "Loading States": ["Loading...", "Sending...", "Updating…", "Generating...", "Saving…"],
+    "Home Screen": ["No notes yet", "Add a note below to get started", "Wallpaper Not Showing?"],
+    "Settings": ["Settings", "Wallpaper Settings", "Text Style", "Help & Support"],
+    "Onboarding": ["Welcome to NoteWall", "Grant Permissions First", "Start Using NoteWall"],
+    "Paywall": ["Unlock Full Access", "Get Premium", "Restore Purchase"],
+    "Other": []  # Everything else
+}
+
+
+def categorize_strings(texts: Iterable[str]) -> Dict[str, List[str]]:
+    """Assign each English string to its MARK category, sorted within each"""
+    categorized = {cat: [] for cat in CATEGORIES}
+    
+    for english_text in sorted(texts):
+        assigned = False
+        for category, keywords in CATEGORIES.items():
+            if english_text in keywords:
+                categorized[category].append(english_text)
+                assigned = True
+                break
+        if not assigned:
+            categorized["Other"].append(english_text)
+    
+    return categorized
+
+
 def write_localizable_file(output_path: str, translations: Dict[str, str], language_code: str):
     """Write translations to Localizable.strings file"""
     
@@ -593,131 +615,231 @@ def write_localizable_file(output_path: str, translations: Dict[str, str], langu
 
 """
     
-    # Group translations by category
-    categories = {
-        "Common UI Elements": ["Continue", "Cancel", "Delete", "Done", "Close", "OK", "Skip", "Next", "Yes", "No", "Send", "Apply", "Save"],
-        "Loading States": ["Loading...", "Sending...", "Updating…", "Generating...", "Saving…"],
-        "Home Screen": ["No notes yet", "Add a note below to get started", "Wallpaper Not Showing?"],
-        "Settings": ["Settings", "Wallpaper Settings", "Text Style", "Help & Support"],
-        "Onboarding": ["Welcome to NoteWall", "Grant Permissions First", "Start Using NoteWall"],
-        "Paywall": ["Unlock Full Access", "Get Premium", "Restore Purchase"],
-        "Other": []  # Everything else
-    }
+    categorized = categorize_strings(translations.keys())
     
-    categorized = {cat: [] for cat in categories}
-    
-    for english_text in sorted(translations.keys()):
-        assigned = False
-        for category, keywords in categories.items():
-            if english_text in keywords:
-                categorized[category].append(english_text)
-                assigned = True
-                break
-        if not assigned:
-            categorized["Other"].append(english_text)
-    
-    content = header
+    parts = [header]
     
     for category, texts in categorized.items():
         if texts:
-            content += f"// MARK: - {category}\n"
+            parts.append(f"// MARK: - {category}\n")
             for english_text in texts:
                 translated = translations[english_text]
                 # Escape quotes in the strings
                 english_escaped = english_text.replace('"', '\\"')
                 translated_escaped = translated.replace('"', '\\"')
-                content += f'"{english_escaped}" = "{translated_escaped}";\n'
-            content += "\n"
+                parts.append(f'"{english_escaped}" = "{translated_escaped}";\n')
+            parts.append("\n")
     
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+        f.write("".join(parts))
+    instrumentation.record_write(output_path)
 
 
-def main():
-    print("🌍 NoteWall Localization Script")
-    print("=" * 50)
-    
-    # Paths
-    notewall_dir = Path("/Users/carly/GITHUB REPOS/STRANKY:APLIKACIE/NOTEWALL-CLAUDECODE/NoteWall")
+LANGUAGES = ["en", "de", "es", "fr"]
+SKIPPED_SWIFT_FILES = ["Config.swift"]
+STATUS_NAME = "localization-status.json"
+# Below this many catalog bytes, worker process start-up costs more than merging inline
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+
+def default_notewall_dir() -> Path:
+    return Path(__file__).resolve().parent / "NoteWall"
+
+
+def extract_all_strings(notewall_dir: Path, verbose: bool = True, extra_dirs: Iterable[Path] = (),
+                        out: Optional[TextIO] = None) -> Set[str]:
+    """Extract the meaningful Text() strings from every Swift file in the app folder
     
-    # Step 1: Extract all hardcoded strings from Swift files
-    print("\n📝 Step 1: Extracting hardcoded strings from Swift files...")
+    ``extra_dirs`` are other targets sharing the catalogs (e.g. idol/ with its
+    copies of NoteWall sources), scanned the same way.
+    """
     all_strings = set()
-    swift_files = list(notewall_dir.glob("*.swift"))
-    
+    swift_files = sorted(notewall_dir.glob("*.swift"))
+    for directory in extra_dirs:
+        swift_files.extend(sorted(Path(directory).glob("*.swift")))
+
     for swift_file in swift_files:
-        if swift_file.name not in ["Config.swift"]:  # Skip config
+        if swift_file.name not in SKIPPED_SWIFT_FILES:
             strings = extract_hardcoded_strings(str(swift_file))
             all_strings.update(strings)
-            if strings:
-                print(f"   Found {len(strings)} strings in {swift_file.name}")
-    
+            if strings and verbose:
+                print(f"   Found {len(strings)} strings in {swift_file.parent.name}/{swift_file.name}", file=out)
+
     # Filter out empty strings, numbers, single characters, etc.
-    meaningful_strings = {s for s in all_strings if len(s) > 1 and not s.isdigit() and s not in ["", " ", "?", "  "]}
+    return {s for s in all_strings if len(s) > 1 and not s.isdigit() and s not in ["", " ", "?", "  "]}
+
+
+def merge_locale(lang_code: str, english: Mapping[str, str], existing: Mapping[str, str],
+                 translation_memory: Mapping[str, Mapping[str, str]] = TRANSLATIONS,
+                 delta: bool = False) -> Tuple[Dict[str, str], List[str]]:
+    """Translations for every English key, plus the keys that fell back to English
+    
+    In delta mode untranslated keys are left out instead of copied as English;
+    so are old "X" = "X" fallbacks, unless the memory says the text is the same.
+    """
+    if lang_code == "en":
+        return dict(english), []
+    
+    memory = translation_memory.get(lang_code, {})
+    translations = {}
+    missing = []
+    for english_text in english:
+        if english_text in existing:
+            # Use existing translation
+            translation = existing[english_text]
+        elif english_text in memory:
+            # Use our dictionary
+            translation = memory[english_text]
+        else:
+            # Keep English as fallback
+            translation = None
+        
+        if translation is None or (delta and translation == english[english_text]
+                                   and memory.get(english_text) != translation):
+            missing.append(english_text)
+            if not delta:
+                translations[english_text] = english_text
+        elif not delta or translation != english[english_text]:
+            translations[english_text] = translation
+    return translations, missing
+
+
+def sync_locale(notewall_dir: Path, lang_code: str, english: Mapping[str, str], delta: bool = False) -> Dict:
+    """Read, merge and rewrite one locale's catalog"""
+    with instrumentation.stage(f"locale {lang_code}"):
+        output_path = notewall_dir / f"{lang_code}.lproj" / "Localizable.strings"
+        existing = read_existing_translations(str(output_path)) if lang_code != "en" else {}
+        translations, missing = merge_locale(lang_code, english, existing, delta=delta)
+        write_localizable_file(str(output_path), translations, lang_code)
+    return {"locale": lang_code, "written": len(translations), "missing": missing}
+
+
+# The English catalog each locale worker process merges against, set once per worker
+_worker_english: Mapping[str, str] = {}
+
+
+def _init_locale_worker(english: Dict[str, str]):
+    global _worker_english
+    _worker_english = english
+
+
+def _sync_locale_worker(notewall_dir: Path, lang_code: str, delta: bool) -> Dict:
+    return sync_locale(notewall_dir, lang_code, _worker_english, delta)
+
+
+def write_status(status_path: Path, english: Mapping[str, str], results: List[Dict]):
+    """Side-car report of translation progress and the untranslated keys per locale"""
+    locales = {}
+    for result in results:
+        if result["locale"] == "en":
+            continue
+        untranslated = sorted(result["missing"])
+        translated = len(english) - len(untranslated)
+        locales[result["locale"]] = {
+            "translated": translated,
+            "untranslated": len(untranslated),
+            "progress": round(100 * translated / len(english), 1) if english else 100.0,
+            "catalog_entries": result["written"],
+            "keys": untranslated,
+        }
+    with open(status_path, "w", encoding="utf-8") as f:
+        json.dump({"strings": len(english), "locales": locales}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    instrumentation.record_write(status_path)
+
+
+def sync_strings(notewall_dir: Path, languages: List[str] = LANGUAGES, max_workers: Optional[int] = None,
+                 delta: bool = False, status_path: Optional[Path] = None, extra_dirs: Iterable[Path] = (),
+                 out: Optional[TextIO] = None) -> Dict:
+    """Extract strings, merge them with the existing catalogs and rewrite every locale
+    
+    The English key set is built once. Locales are merged inline, each in its
+    own instrumentation stage; only catalogs of PARALLEL_MIN_BYTES or more go
+    to worker processes (English sent once per worker), where the merge runs
+    outside the GIL. ``max_workers=1`` always merges inline.
+    Translation progress goes to ``status_path`` (default: localization-status.json
+    next to the app folder, so it is never bundled). Progress goes to ``out``
+    (default stdout).
+    """
+    # Step 1: Extract all hardcoded strings from Swift files
+    print("\n📝 Step 1: Extracting hardcoded strings from Swift files...", file=out)
+    with instrumentation.stage("extract"):
+        meaningful_strings = extract_all_strings(notewall_dir, extra_dirs=extra_dirs, out=out)
     
-    print(f"\n✅ Extracted {len(meaningful_strings)} unique strings")
+    print(f"\n✅ Extracted {len(meaningful_strings)} unique strings", file=out)
     
-    # Step 2: Check existing translations
-    print("\n📚 Step 2: Checking existing translations...")
+    # Step 2: Build the English catalog every locale is merged against
+    print("\n📚 Step 2: Checking existing English translations...", file=out)
     en_path = notewall_dir / "en.lproj" / "Localizable.strings"
-    existing_en = read_existing_translations(str(en_path))
-    print(f"   Found {len(existing_en)} existing English translations")
+    with instrumentation.stage("read catalogs"):
+        existing_en = read_existing_translations(str(en_path))
+    print(f"   Found {len(existing_en)} existing English translations", file=out)
     
-    # Find missing strings
     missing_strings = meaningful_strings - set(existing_en.keys())
-    print(f"   Missing {len(missing_strings)} strings from localization")
-    
-    # Step 3: Build complete translation dictionaries
-    print("\n🔤 Step 3: Building translation dictionaries...")
-    
-    complete_translations = {
-        "en": {},
-        "de": {},
-        "es": {},
-        "fr": {}
+    print(f"   Missing {len(missing_strings)} strings from localization", file=out)
+    
+    english = dict(existing_en)
+    for string in sorted(missing_strings):
+        english[string] = string  # English is the same
+    english = MappingProxyType(english)
+    
+    # Step 3: Merge and write each locale in parallel
+    print(f"\n💾 Step 3: Merging and writing {len(languages)} locales...", file=out)
+    with instrumentation.stage("merge and write"):
+        catalogs = {lang: notewall_dir / f"{lang}.lproj" / "Localizable.strings" for lang in languages}
+        # Sizes before the workers rewrite the catalogs
+        sizes = {lang: path.stat().st_size if path.exists() else 0 for lang, path in catalogs.items()}
+        workers = min(len(languages), max_workers or os.cpu_count() or 1)
+        if workers > 1 and sum(sizes.values()) >= PARALLEL_MIN_BYTES:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_locale_worker,
+                                     initargs=(dict(english),)) as pool:
+                results = list(pool.map(_sync_locale_worker, repeat(notewall_dir), languages, repeat(delta)))
+            # The workers' own records stay in their processes
+            for lang, path in catalogs.items():
+                if lang != "en" and sizes[lang]:
+                    instrumentation.record_read(path, sizes[lang])
+                instrumentation.record_write(path)
+        else:
+            results = [sync_locale(notewall_dir, lang, english, delta) for lang in languages]
+        write_status(status_path or notewall_dir.parent / STATUS_NAME, english, results)
+    
+    for result in results:
+        note = f" ({len(result['missing'])} untranslated)" if result["missing"] else ""
+        if delta and result["missing"]:
+            note = f" ({len(result['missing'])} left to the English fallback)"
+        print(f"   ✅ Wrote {result['written']} translations to {result['locale']}.lproj{note}", file=out)
+
+    return {
+        "strings": len(meaningful_strings),
+        "delta": delta,
+        "missing_from_en": len(missing_strings),
+        "written": {r["locale"]: r["written"] for r in results},
+        "untranslated": {r["locale"]: len(r["missing"]) for r in results if r["locale"] != "en"},
+        "missing": {r["locale"]: r["missing"] for r in results if r["missing"]},
     }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sync Localizable.strings with the Text() strings in the app")
+    parser.add_argument("--delta", action="store_true",
+                        help="only write real translations; untranslated strings fall back to English at runtime")
+    parser.add_argument("--extra-dir", action="append", type=Path, default=[], metavar="DIR",
+                        help="also extract strings from another target's Swift files, e.g. idol (repeatable)")
+    args = parser.parse_args(argv)
+
+    print("🌍 NoteWall Localization Script")
+    print("=" * 50)
     
-    # Add existing translations
-    for string in existing_en:
-        complete_translations["en"][string] = existing_en[string]
-    
-    # Add new strings
-    for string in meaningful_strings:
-        if string not in complete_translations["en"]:
-            complete_translations["en"][string] = string  # English is the same
-    
-    # Translate to other languages
-    for lang_code in ["de", "es", "fr"]:
-        lang_existing = read_existing_translations(str(notewall_dir / f"{lang_code}.lproj" / "Localizable.strings"))
-        
-        for english_text in complete_translations["en"]:
-            if english_text in lang_existing:
-                # Use existing translation
-                complete_translations[lang_code][english_text] = lang_existing[english_text]
-            elif english_text in TRANSLATIONS[lang_code]:
-                # Use our dictionary
-                complete_translations[lang_code][english_text] = TRANSLATIONS[lang_code][english_text]
-            else:
-                # Keep English as fallback
-                complete_translations[lang_code][english_text] = english_text
-                print(f"   ⚠️  No translation for '{english_text}' in {lang_code}")
-    
-    # Step 4: Write updated localization files
-    print("\n💾 Step 4: Writing updated localization files...")
-    
-    for lang_code in ["en", "de", "es", "fr"]:
-        output_path = notewall_dir / f"{lang_code}.lproj" / "Localizable.strings"
-        write_localizable_file(
-            str(output_path),
-            complete_translations[lang_code],
-            lang_code
-        )
-        print(f"   ✅ Wrote {len(complete_translations[lang_code])} translations to {lang_code}.lproj")
+    summary = sync_strings(default_notewall_dir(), delta=args.delta, extra_dirs=args.extra_dir)
     
     print("\n" + "=" * 50)
     print("✨ Localization complete!")
-    print(f"📊 Total strings: {len(meaningful_strings)}")
+    print(f"📊 Total strings: {summary['strings']}")
     print(f"🌍 Languages: English, German, Spanish, French")
+    for lang_code, count in summary["untranslated"].items():
+        if count:
+            print(f"   ⚠️  {lang_code}: {count} strings fell back to English")
+    print(f"📋 Untranslated keys: {STATUS_NAME}")
     print("\n💡 Tip: Build and test the app in each language to verify translations")
 
 
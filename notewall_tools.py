@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+NoteWall Tools
+One entry point for the localization, Xcode project and analytics scripts.
+
+Each subcommand imports its modules only when it runs, so `--help` and cheap
+commands start without loading translation tables, NumPy or the exports.
+Paths come from notewall-tools.json next to this file (all repo-relative).
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+CONFIG_NAME = "notewall-tools.json"
+
+DEFAULT_CONFIG = {
+    "notewall_dir": "NoteWall",
+    "project": "NoteWall.xcodeproj/project.pbxproj",
+    "languages": ["en", "de", "es", "fr"],
+    "exports_dir": ".",
+    "dashboard_output": "AnalyticsDashboard/dashboard-data.json",
+    "resources": ["PrivacyInfo.xcprivacy"],
+    # Only write real translations; untranslated strings fall back to English
+    "delta_catalogs": False,
+    # Other targets whose Swift strings go into the same catalogs. Opt-in only:
+    # idol/ is a different app and is not part of NoteWall.xcodeproj
+    "extra_source_dirs": [],
+}
+
+PATH_KEYS = ("notewall_dir", "project", "exports_dir", "dashboard_output")
+
+
+def load_config(root: Path = ROOT) -> dict:
+    """Defaults overlaid with notewall-tools.json, with paths resolved against the repo root"""
+    config = dict(DEFAULT_CONFIG)
+    config_path = root / CONFIG_NAME
+    if config_path.exists():
+        with open(config_path, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    for key in PATH_KEYS:
+        config[key] = (root / config[key]).resolve()
+    config["extra_source_dirs"] = [(root / path).resolve() for path in config["extra_source_dirs"]]
+    config["root"] = root
+    return config
+
+
+# ---------------------------------------------------------------------------
+# Subcommands: each takes (args, config) and returns (result, ok)
+# ---------------------------------------------------------------------------
+
+def cmd_extract(args, config):
+    from localize_app import extract_all_strings
+
+    strings = extract_all_strings(config["notewall_dir"], verbose=False, extra_dirs=config["extra_source_dirs"])
+    return {"count": len(strings), "strings": sorted(strings)}, True
+
+
+def cmd_sync_strings(args, config):
+    from localize_app import sync_strings
+
+    delta = args.delta or config["delta_catalogs"]
+    return sync_strings(config["notewall_dir"], config["languages"], delta=delta,
+                        extra_dirs=config["extra_source_dirs"]), True
+
+
+def cmd_fix_interpolations(args, config):
+    from fix_localization import add_format_patterns, find_all_interpolations
+
+    found = find_all_interpolations(config["notewall_dir"])
+    result = {
+        "interpolations": {
+            name: [{"line": line_num, "text": line} for line, line_num in lines]
+            for name, lines in found.items()
+        },
+    }
+    if not args.dry_run:
+        result["added"] = add_format_patterns(config["notewall_dir"], config["languages"],
+                                              delta=config["delta_catalogs"])
+    return result, True
+
+
+def cmd_add_resource(args, config):
+    from add_resource_to_xcode import add_resource_to_xcode_project
+
+    ok = add_resource_to_xcode_project(str(config["project"]), args.name, args.file_type)
+    return {"resource": args.name, "added": ok}, ok
+
+
+def cmd_fix_resources(args, config):
+    from fix_xcode_resources import fix_xcode_project
+
+    changed = fix_xcode_project(str(config["project"]))
+    return {"project": str(config["project"]), "changed": changed}, True
+
+
+def cmd_lint(args, config):
+    from strings_lint import lint_strings
+
+    issues = lint_strings(config["notewall_dir"], config["languages"], delta=config["delta_catalogs"])
+    return {"issues": issues, "count": len(issues)}, not issues
+
+
+def cmd_assets(args, config):
+    from asset_audit import audit_catalog
+
+    report = audit_catalog(config["notewall_dir"] / "Assets.xcassets", [config["notewall_dir"]])
+    if not args.json:
+        for finding in report["findings"]:
+            print(f"{finding['imageset']}: {finding['kind']}: {finding['message']}")
+    del report["renditions"]
+    return report, True
+
+
+def cmd_duplicates(args, config):
+    from duplicate_media import duplicate_report
+
+    report = duplicate_report(args.root.resolve(), config["project"], args.min_size)
+    if not args.json:
+        for group in report["groups"]:
+            print(f"{group['size']} bytes: keep {group['keep']}, delete {', '.join(group['deletable']) or '-'}")
+    return report, True
+
+
+def cmd_drift(args, config):
+    from swift_drift import DEFAULT_TARGETS, drift_report
+
+    root = config["root"]
+    base = config["notewall_dir"].relative_to(root)
+    results = []
+    # Drift is only reported; copies in other targets never feed NoteWall's catalogs unless configured
+    targets = args.targets or [path.relative_to(root) for path in config["extra_source_dirs"]] or DEFAULT_TARGETS[1:]
+    for target in targets:
+        report = drift_report(root, str(base), str(target))
+        if not args.json:
+            for entry in report["files"]:
+                similar = f"{entry['similarity']:.0%} similar" if "counterpart" in entry else "no counterpart"
+                print(f"{entry['file']}: {similar}, {len(entry.get('diverged', []))} diverged regions")
+        results.append(report)
+    return {"targets": results}, True
+
+
+def cmd_strings(args, config):
+    from string_occurrences import STORE_NAME, catalog_report, index_sources
+
+    sources = [config["notewall_dir"], *config["extra_source_dirs"]]
+    store, summary = index_sources(config["root"], sources, config["root"] / STORE_NAME)
+    if args.where is not None:
+        return {"string": args.where, "occurrences": [
+            {"file": f, "line": line, "column": column, "kind": kind}
+            for f, line, column, kind in store.where(args.where)]}, True
+    catalog = config["notewall_dir"] / "en.lproj" / "Localizable.strings"
+    return dict(summary, **catalog_report(store, catalog)), True
+
+
+def cmd_privacy(args, config):
+    from privacy_manifest import MANIFEST_NAME, check_manifest
+
+    manifest = config["notewall_dir"] / MANIFEST_NAME
+    report = check_manifest(manifest, [config["notewall_dir"], *config["extra_source_dirs"]], config["root"])
+    if not args.json:
+        for category, sites in report["undeclared"].items():
+            print(f"{category}: used but not declared, e.g. {sites[0]['file']}:{sites[0]['line']}")
+        for category in report["over_declared"]:
+            print(f"{category}: declared but never called")
+    return report, not report["undeclared"] and not report["missing_reasons"]
+
+
+def cmd_videos(args, config):
+    from video_budget import BUDGETS_NAME, check_videos, load_budgets
+
+    results = check_videos([config["notewall_dir"]], load_budgets(args.root.resolve() / BUDGETS_NAME))
+    failed = [r for r in results if r["violations"]]
+    if not args.json:
+        for r in failed:
+            print(f"{Path(r['path']).name}: {'; '.join(r['violations'])}")
+    return {"videos": results, "over_budget": len(failed)}, not failed
+
+
+def cmd_run(args, config):
+    from pipeline import run_pipeline
+
+    results = run_pipeline(config, args.stages, force=args.force, dry_run=args.dry_run, jobs=args.jobs)
+    if not args.json:
+        for r in results:
+            print(f"{r['stage']}: {r['status']} ({r['seconds']:.3f}s)")
+    return {"stages": results}, not any(r["status"] in ("failed", "blocked") for r in results)
+
+
+def cmd_settings(args, config):
+    from build_settings import main as run
+
+    forwarded = ["--project", str(config["project"])] + (["--json"] if args.json else []) + list(args.rest)
+    return None, not run(forwarded)
+
+
+def cmd_analytics(args, config):
+    if args.analytics_command == "reports":
+        from firebase_reports import load_report_directory
+
+        reports = load_report_directory(str(args.directory or config["exports_dir"]))
+        return {
+            "reports": [
+                {
+                    "path": report.path,
+                    "title": report.title,
+                    "tables": [
+                        {"name": t.name, "rows": t.row_count, "start": t.start_date, "end": t.end_date}
+                        for t in report.tables
+                    ],
+                }
+                for report in reports
+            ]
+        }, True
+
+    if args.analytics_command == "dashboard":
+        from build_dashboard_data import build_dashboard_data
+
+        return build_dashboard_data(str(config["exports_dir"]), str(config["dashboard_output"])), True
+
+    # The remaining analytics commands have their own option parsers; forward the remaining arguments
+    run = importlib.import_module(FORWARDED_ANALYTICS[args.analytics_command]).main
+    forwarded = list(args.rest)
+    if args.json and "--json" not in forwarded:
+        forwarded.append("--json")
+    code = run(forwarded)
+    return None, not code
+
+
+# Analytics command -> module whose main(argv) it forwards to
+FORWARDED_ANALYTICS = {
+    "retention": "retention",
+    "schema": "event_schema_check",
+    "anomalies": "event_anomaly",
+    "identities": "identity",
+    "sales": "sales_backfill",
+    "paths": "screen_paths",
+    "experiments": "experiment",
+}
+
+COMMANDS = {
+    "extract": cmd_extract,
+    "sync-strings": cmd_sync_strings,
+    "fix-interpolations": cmd_fix_interpolations,
+    "add-resource": cmd_add_resource,
+    "fix-resources": cmd_fix_resources,
+    "lint": cmd_lint,
+    "assets": cmd_assets,
+    "duplicates": cmd_duplicates,
+    "drift": cmd_drift,
+    "strings": cmd_strings,
+    "privacy": cmd_privacy,
+    "videos": cmd_videos,
+    "run": cmd_run,
+    "settings": cmd_settings,
+    "analytics": cmd_analytics,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="notewall-tools", description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON on stdout")
+    parser.add_argument("--root", type=Path, default=ROOT, help="repository root (default: this file's folder)")
+    parser.add_argument("--trace", type=Path, metavar="PATH",
+                        help="time each stage, print a summary to stderr and write a Chrome trace (chrome://tracing)")
+    parser.add_argument("--profile", action="store_true", help="run the command under cProfile, stats to stderr")
+    commands = parser.add_subparsers(dest="command", metavar="<command>", required=True)
+
+    commands.add_parser("extract", help="list Text() strings found in the Swift sources")
+    sync = commands.add_parser("sync-strings", help="regenerate every Localizable.strings from the sources")
+    sync.add_argument("--delta", action="store_true",
+                      help="only write real translations and leave the rest to the English fallback")
+
+    fix = commands.add_parser("fix-interpolations", help="add format patterns for interpolated Text() strings")
+    fix.add_argument("--dry-run", action="store_true", help="only report interpolated strings")
+
+    add = commands.add_parser("add-resource", help="register a resource file in the Xcode project")
+    add.add_argument("name", help="file name inside the NoteWall group, e.g. PrivacyInfo.xcprivacy")
+    add.add_argument("--file-type", default="text.xml", help="lastKnownFileType (default: text.xml)")
+
+    commands.add_parser("fix-resources", help="drop asset catalog files from the Resources build phase")
+    commands.add_parser("lint", help="check locale catalogs for missing keys and format mismatches")
+    commands.add_parser("assets", help="report unused and oversized images in Assets.xcassets")
+    duplicates = commands.add_parser("duplicates", help="find byte-identical media files and the copy Xcode uses")
+    duplicates.add_argument("--min-size", type=int, default=1, help="ignore files smaller than this many bytes")
+    drift = commands.add_parser("drift", help="report where other targets' copies of Swift files drifted")
+    drift.add_argument("targets", nargs="*", type=Path, help="target folders (default: extra_source_dirs, else idol)")
+    strings = commands.add_parser("strings", help="index where localizable strings occur in the Swift sources")
+    strings.add_argument("--where", metavar="STRING", help="list every occurrence of this string")
+    commands.add_parser("privacy", help="check PrivacyInfo.xcprivacy against required-reason API calls")
+    commands.add_parser("videos", help="check bundled videos against video-budgets.json")
+
+    run = commands.add_parser("run", help="run the out-of-date pipeline stages in dependency order")
+    run.add_argument("stages", nargs="*", help="stages to run, with their dependencies (default: all)")
+    run.add_argument("--force", action="store_true", help="run stages even when up to date")
+    run.add_argument("--dry-run", action="store_true", help="only report which stages are stale")
+    run.add_argument("--jobs", type=int, help="stages to run at once")
+
+    settings = commands.add_parser("settings", help="query or edit build settings and package pins", add_help=False)
+    settings.add_argument("rest", nargs=argparse.REMAINDER)
+
+    analytics = commands.add_parser("analytics", help="analytics exports and dashboard")
+    analytics_commands = analytics.add_subparsers(dest="analytics_command", metavar="<analytics-command>", required=True)
+    reports = analytics_commands.add_parser("reports", help="summarize Firebase report CSVs")
+    reports.add_argument("directory", nargs="?", type=Path, help="folder of exports (default: exports_dir)")
+    analytics_commands.add_parser("dashboard", help="rebuild AnalyticsDashboard/dashboard-data.json")
+    for name, help_text in zip(FORWARDED_ANALYTICS, ("sessions and retention cohorts", "event schema cross-check",
+                                                  "hourly event volume drops and spikes",
+                                                  "merge distinct IDs of the same person",
+                                                  "backfill App Store sales reports into daily totals",
+                                                  "screen transitions, paths, loops and exits",
+                                                  "paywall and quiz experiment conversion per variant")):
+        sub = analytics_commands.add_parser(name, help=help_text, add_help=False)
+        sub.add_argument("rest", nargs=argparse.REMAINDER)
+
+    return parser
+
+
+def _print_human(result):
+    for key, value in result.items():
+        if isinstance(value, (list, dict)):
+            print(f"{key}: {len(value)} item(s)")
+        else:
+            print(f"{key}: {value}")
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args, unknown = parser.parse_known_args(argv)
+    # Forwarded analytics commands print their own JSON, so they keep stdout.
+    forwarded = args.command == "settings" or getattr(args, "analytics_command", None) in FORWARDED_ANALYTICS
+    if unknown and not forwarded:
+        parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+    if forwarded:
+        # REMAINDER does not pick up options that directly follow the subcommand
+        args.rest = unknown + list(args.rest)
+    config = load_config(args.root.resolve())
+
+    # Keep stdout clean for JSON; the scripts' progress output goes to stderr.
+    chatter = sys.stderr if args.json and not forwarded else sys.stdout
+    command = COMMANDS[args.command]
+    tracing = contextlib.nullcontext()
+    if args.trace:
+        import instrumentation
+        instrumentation.enable()
+        tracing = instrumentation.stage(args.command)
+    with contextlib.redirect_stdout(chatter), tracing:
+        if args.profile:
+            from instrumentation import profile_call
+            result, ok = profile_call(command, args, config)
+        else:
+            result, ok = command(args, config)
+    if args.trace:
+        recorder = instrumentation.disable()
+        instrumentation.write_trace(recorder, str(args.trace))
+        print(instrumentation.format_summary(recorder), file=sys.stderr)
+
+    if result is not None:
+        if args.json:
+            print(json.dumps(result, indent=2, default=str, ensure_ascii=False))
+        else:
+            _print_human(result)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Xcode Project Reader
+Parses project.pbxproj (an old-style ASCII property list) into plain dicts,
+lists and strings, and resolves file references to paths on disk.
+
+Parse results are cached next to the project in .pbxproj-cache, a marshal
+file keyed by the content hash of project.pbxproj. A rewrite by Xcode changes
+the hash, so stale entries are never used; hits and misses show up in the
+cache column of `notewall-tools --trace`.
+"""
+
+import hashlib
+import marshal
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+import instrumentation
+
+# Whitespace and comments are skipped; everything else is a quoted string,
+# a bare word, <hex data> or a punctuation character
+TOKEN = re.compile(r'''
+    (?:\s+|/\*.*?\*/|//[^\n]*)+
+  | "((?:[^"\\]|\\.)*)"
+  | ((?:[^\s"{}()=;,<>/]|/(?![*/]))+)
+  | <([0-9a-fA-F\s]*)>
+  | ([{}()=;,])
+''', re.VERBOSE | re.DOTALL)
+
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\", "'": "'", "a": "\a", "b": "\b",
+           "f": "\f", "v": "\v"}
+ESCAPE = re.compile(r'\\(U[0-9a-fA-F]{4}|[0-7]{1,3}|.)', re.DOTALL)
+
+CACHE_NAME = ".pbxproj-cache"
+CACHE_VERSION = 1
+# A few recent versions, so switching branches back and forth stays cached
+CACHE_ENTRIES = 4
+
+
+class PBXParseError(ValueError):
+    pass
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+
+    def replace(match):
+        code = match.group(1)
+        if code[0] == "U" and len(code) == 5:
+            return chr(int(code[1:], 16))
+        if code[0].isdigit():
+            return chr(int(code, 8))
+        return ESCAPES.get(code, code)
+
+    return ESCAPE.sub(replace, text)
+
+
+def _tokens(text: str, pos: int = 0) -> Iterator[tuple]:
+    # Yields (kind, value, start, end): kind "s" for strings/words/data, else the punctuation
+    end = len(text)
+    while pos < end:
+        match = TOKEN.match(text, pos)
+        if not match:
+            raise PBXParseError(f"unexpected character {text[pos]!r} at offset {pos}")
+        pos = match.end()
+        quoted, word, data, punct = match.groups()
+        if quoted is not None:
+            yield "s", _unescape(quoted), match.start(), pos
+        elif word is not None:
+            yield "s", word, match.start(), pos
+        elif data is not None:
+            yield "s", "<" + data + ">", match.start(), pos
+        elif punct is not None:
+            yield punct, None, match.start(), pos
+
+
+def parse_plist(text: str):
+    """Parse an old-style (OpenStep) property list into dicts, lists and strings"""
+    tokens = _tokens(text)
+
+    def value(token):
+        kind, content = token[:2]
+        if kind == "s":
+            return content
+        if kind == "{":
+            result = {}
+            for key in tokens:
+                if key[0] == "}":
+                    return result
+                if key[0] != "s" or next(tokens)[0] != "=":
+                    raise PBXParseError(f"expected 'key =' in dictionary, got {key[0]!r}")
+                result[key[1]] = value(next(tokens))
+                if next(tokens)[0] != ";":
+                    raise PBXParseError(f"expected ';' after value of {key[1]!r}")
+            raise PBXParseError("unterminated dictionary")
+        if kind == "(":
+            result = []
+            for item in tokens:
+                if item[0] == ")":
+                    return result
+                result.append(value(item))
+                separator = next(tokens)
+                if separator[0] == ")":
+                    return result
+                if separator[0] != ",":
+                    raise PBXParseError("expected ',' in array")
+            raise PBXParseError("unterminated array")
+        raise PBXParseError(f"unexpected {kind!r}")
+
+    try:
+        return value(next(tokens))
+    except StopIteration:
+        raise PBXParseError("unexpected end of file") from None
+
+
+def dict_spans(text: str, start: int) -> Dict[str, Tuple[int, int, int, int]]:
+    """Offsets of each entry of the dictionary whose "{" is at ``start``
+
+    Maps key -> (key start, value start, value end, end after ";") so callers
+    can splice new values into the original text without re-serializing it.
+    """
+    tokens = _tokens(text, start)
+    if next(tokens)[0] != "{":
+        raise PBXParseError(f"no dictionary at offset {start}")
+    spans = {}
+    depth = 0
+    key = key_start = value_start = None
+    for kind, content, token_start, token_end in tokens:
+        if depth == 0:
+            if kind == "}":
+                return spans
+            if kind == "s" and key is None:
+                key, key_start = content, token_start
+                continue
+            if kind == "=":
+                continue
+            if kind == ";":
+                spans[key] = (key_start, value_start, value_end, token_end)
+                key = value_start = None
+                continue
+        if value_start is None:
+            value_start = token_start
+        if kind in "{(":
+            depth += 1
+        elif kind in "})":
+            depth -= 1
+        value_end = token_end
+    raise PBXParseError("unterminated dictionary")
+
+
+def _read_cache(cache_path: Path) -> dict:
+    try:
+        with open(cache_path, "rb") as f:
+            blob = f.read()
+        cache = marshal.loads(blob)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    instrumentation.record_read(cache_path, len(blob))
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache["entries"]
+
+
+def _write_cache(cache_path: Path, entries: dict):
+    temp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(marshal.dumps({"version": CACHE_VERSION, "entries": entries}))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # A read-only checkout just runs uncached
+        return
+    instrumentation.record_write(cache_path)
+
+
+def cached(path, text: str, kind: str, compute: Callable[[str], object]):
+    """compute(text), memoized in the project's cache under the hash of ``text``
+
+    ``kind`` names the derived value (parsed plist, object offsets, ...); the
+    value must be built from dicts, lists, tuples, strings and numbers.
+    """
+    cache_path = Path(path).with_name(CACHE_NAME)
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    entries = _read_cache(cache_path)
+    entry = entries.pop(digest, {})
+    if kind in entry:
+        instrumentation.record_cache(True)
+        return entry[kind]
+    instrumentation.record_cache(False)
+    value = entry[kind] = compute(text)
+    # Re-inserted last, so the oldest version is the first one dropped
+    entries[digest] = entry
+    while len(entries) > CACHE_ENTRIES:
+        entries.pop(next(iter(entries)))
+    _write_cache(cache_path, entries)
+    return value
+
+
+class XcodeProject:
+    """A parsed project.pbxproj with helpers for walking its object graph"""
+
+    def __init__(self, path, data: dict):
+        self.path = Path(path)
+        self.data = data
+        self.objects: Dict[str, dict] = data.get("objects", {})
+        self.root_id: str = data.get("rootObject", "")
+        self._parents: Optional[Dict[str, str]] = None
+
+    @property
+    def root(self) -> dict:
+        return self.objects.get(self.root_id, {})
+
+    @property
+    def source_root(self) -> Path:
+        """Folder that "<group>" and SOURCE_ROOT paths are relative to"""
+        project_dir = self.root.get("projectDirPath", "")
+        return (self.path.parent.parent / project_dir).resolve()
+
+    def objects_of(self, isa: str) -> Iterator[tuple]:
+        for object_id, obj in self.objects.items():
+            if obj.get("isa") == isa:
+                yield object_id, obj
+
+    def parent_of(self, object_id: str) -> Optional[str]:
+        if self._parents is None:
+            self._parents = {}
+            for group_id, obj in self.objects.items():
+                for child in obj.get("children", ()):
+                    self._parents[child] = group_id
+        return self._parents.get(object_id)
+
+    def resolve_path(self, object_id: str) -> Optional[Path]:
+        """Absolute path of a file reference or group, or None if it is not on disk"""
+        obj = self.objects.get(object_id)
+        if obj is None:
+            return None
+        path = obj.get("path", "")
+        tree = obj.get("sourceTree", "<group>")
+        if tree == "<absolute>":
+            return Path(path)
+        if tree == "SOURCE_ROOT":
+            return (self.source_root / path).resolve()
+        if tree != "<group>":
+            # BUILT_PRODUCTS_DIR, SDKROOT, DEVELOPER_DIR: outside the repo
+            return None
+        parent = self.parent_of(object_id)
+        if parent is None:
+            return (self.source_root / path).resolve()
+        base = self.resolve_path(parent)
+        return (base / path).resolve() if base is not None else None
+
+    def file_paths(self) -> Dict[str, Path]:
+        """Every file reference that lives on disk, resolved to an absolute path"""
+        paths = {}
+        for object_id, obj in self.objects.items():
+            if obj.get("isa") in ("PBXFileReference", "XCVersionGroup",
+                                  "PBXFileSystemSynchronizedRootGroup"):
+                path = self.resolve_path(object_id)
+                if path is not None:
+                    paths[object_id] = path
+        return paths
+
+    def build_phase_files(self, isa: str = "PBXResourcesBuildPhase") -> Set[str]:
+        """File reference IDs that are members of build phases of the given kind"""
+        refs = set()
+        for _, phase in self.objects_of(isa):
+            for build_file_id in phase.get("files", ()):
+                ref = self.objects.get(build_file_id, {}).get("fileRef")
+                if ref is None:
+                    continue
+                target = self.objects.get(ref, {})
+                # Localized resources point at a variant group; its children are the files
+                if target.get("isa") == "PBXVariantGroup":
+                    refs.update(target.get("children", ()))
+                else:
+                    refs.add(ref)
+        return refs
+
+
+def load_project(path, cache: bool = True) -> XcodeProject:
+    """Parse a project.pbxproj file (or the .xcodeproj folder containing it)"""
+    path = Path(path)
+    if path.is_dir():
+        path = path / "project.pbxproj"
+    with instrumentation.stage("pbxproj parse"):
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        instrumentation.record_read(path)
+        data = cached(path, text, "plist", parse_plist) if cache else parse_plist(text)
+        return XcodeProject(path, data)
+
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+NoteWall Pipeline Runner
+Runs the localization, Xcode project and analytics scripts in dependency
+order, skipping every stage whose inputs and outputs are unchanged.
+
+Each stage's input and output files are stamped with (size, mtime, content
+hash) in .notewall-pipeline.json. Files are only re-hashed when their size or
+mtime moved, so a run where nothing changed only stats the files. Stages that
+do not depend on each other (localization vs analytics) run concurrently on
+threads; each writes its progress to its own stream rather than sys.stdout,
+and scripts that would start a process pool run inline under the pipeline.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+import instrumentation
+
+STAMPS_NAME = ".notewall-pipeline.json"
+STAMPS_VERSION = 1
+ROOT = Path(__file__).resolve().parent
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[dict, TextIO], object]
+    inputs: Callable[[dict], List[Path]]
+    outputs: Callable[[dict], List[Path]] = lambda config: []
+    deps: List[str] = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+def _scripts(*names: str) -> List[Path]:
+    # A stage is out of date when the script implementing it changes
+    return [ROOT / name for name in names]
+
+
+def _settings(config: dict) -> List[Path]:
+    # Options like delta_catalogs change what a stage writes
+    return [Path(config.get("root", ROOT)) / "notewall-tools.json"]
+
+
+def _catalogs(config: dict) -> List[Path]:
+    return [config["notewall_dir"] / f"{lang}.lproj" / "Localizable.strings" for lang in config["languages"]]
+
+
+def _swift_sources(config: dict) -> List[Path]:
+    from swift_scan import find_swift_files
+
+    return find_swift_files([config["notewall_dir"], *config.get("extra_source_dirs", [])])
+
+
+# Stages run on pipeline threads, so the scripts that can fan out to a process
+# pool are held to max_workers=1: forking from a threaded process is unsafe.
+
+def _run_sync_strings(config: dict, out: TextIO):
+    from localize_app import sync_strings
+
+    return sync_strings(config["notewall_dir"], config["languages"], max_workers=1,
+                        delta=config.get("delta_catalogs", False),
+                        extra_dirs=config.get("extra_source_dirs", []), out=out)
+
+
+def _run_fix_interpolations(config: dict, out: TextIO):
+    from fix_localization import add_format_patterns
+
+    return add_format_patterns(config["notewall_dir"], config["languages"],
+                               delta=config.get("delta_catalogs", False))
+
+
+def _run_register_resources(config: dict, out: TextIO):
+    from add_resource_to_xcode import add_resource_to_xcode_project
+
+    for name in config.get("resources", []):
+        if not add_resource_to_xcode_project(str(config["project"]), name, out=out):
+            raise RuntimeError(f"could not register {name} in {config['project']}")
+
+
+def _run_prune_resources(config: dict, out: TextIO):
+    from fix_xcode_resources import fix_xcode_project
+
+    return fix_xcode_project(str(config["project"]), out=out)
+
+
+def _run_privacy(config: dict, out: TextIO):
+    from privacy_manifest import MANIFEST_NAME, check_manifest
+
+    report = check_manifest(config["notewall_dir"] / MANIFEST_NAME,
+                            [config["notewall_dir"], *config.get("extra_source_dirs", [])], max_workers=1)
+    if report["undeclared"] or report["missing_reasons"]:
+        raise RuntimeError(f"{MANIFEST_NAME} is missing required-reason API categories: "
+                           f"{', '.join(sorted(report['undeclared']) + report['missing_reasons'])}")
+    return report
+
+
+def _run_dashboard(config: dict, out: TextIO):
+    from build_dashboard_data import build_dashboard_data
+
+    return build_dashboard_data(str(config["exports_dir"]), str(config["dashboard_output"]))
+
+
+STAGES = [
+    Stage("sync-strings", _run_sync_strings,
+          inputs=lambda c: _swift_sources(c) + _scripts("localize_app.py", "swift_scan.py") + _settings(c),
+          outputs=lambda c: _catalogs(c) + [c["notewall_dir"].parent / "localization-status.json"]),
+    Stage("fix-interpolations", _run_fix_interpolations,
+          inputs=lambda c: _scripts("fix_localization.py") + _settings(c),
+          outputs=_catalogs, deps=["sync-strings"]),
+    Stage("register-resources", _run_register_resources,
+          inputs=lambda c: _scripts("add_resource_to_xcode.py")
+          + [c["notewall_dir"] / name for name in c.get("resources", [])],
+          outputs=lambda c: [c["project"]]),
+    Stage("prune-resources", _run_prune_resources,
+          inputs=lambda c: _scripts("fix_xcode_resources.py"),
+          outputs=lambda c: [c["project"]], deps=["register-resources"]),
+    Stage("privacy", _run_privacy,
+          inputs=lambda c: _swift_sources(c) + [c["notewall_dir"] / "PrivacyInfo.xcprivacy"]
+          + _scripts("privacy_manifest.py")),
+    Stage("dashboard", _run_dashboard,
+          inputs=lambda c: sorted(c["exports_dir"].glob("*.csv"))
+          + _scripts("build_dashboard_data.py", "firebase_reports.py"),
+          outputs=lambda c: [c["dashboard_output"], c["dashboard_output"].with_name("dashboard-data.js")]),
+]
+
+
+# ---------------------------------------------------------------------------
+# Stamps
+# ---------------------------------------------------------------------------
+
+class FileStamps:
+    """Content hashes of files, re-hashed only when size or mtime changed"""
+
+    def __init__(self, previous: Dict[str, list]):
+        self.previous = previous
+        self.current: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def stamp(self, path: Path) -> Optional[str]:
+        key = str(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        old = self.previous.get(key)
+        if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+            instrumentation.record_cache(True)
+            digest = old[2]
+        else:
+            instrumentation.record_cache(False)
+            digest = _hash_file(path)
+        with self._lock:
+            self.current[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def signature(self, paths: List[Path]) -> Dict[str, Optional[str]]:
+        return {str(p): self.stamp(p) for p in paths}
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    instrumentation.record_read(path)
+    return digest.hexdigest()
+
+
+def _load_stamps(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stamps = json.load(f)
+        if stamps.get("version") == STAMPS_VERSION:
+            return stamps
+    except (OSError, ValueError):
+        pass
+    return {"version": STAMPS_VERSION, "files": {}, "stages": {}}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def select_stages(names: Optional[List[str]], stages: List[Stage] = STAGES) -> List[Stage]:
+    """The named stages plus everything they depend on, in declaration order"""
+    by_name = {stage.name: stage for stage in stages}
+    if not names:
+        return list(stages)
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"unknown stage(s): {', '.join(unknown)}")
+    wanted = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].deps)
+    return [stage for stage in stages if stage.name in wanted]
+
+
+def run_pipeline(config: dict, names: Optional[List[str]] = None, force: bool = False,
+                 dry_run: bool = False, jobs: Optional[int] = None, verbose: bool = False,
+                 stamps_path: Optional[Path] = None) -> List[dict]:
+    """Run out-of-date stages; returns one {stage, status, seconds, log} per stage"""
+    stages = select_stages(names)
+    selected = {stage.name for stage in stages}
+    stamps_path = stamps_path or Path(config.get("root", ROOT)) / STAMPS_NAME
+    stamps = _load_stamps(stamps_path)
+    files = FileStamps(stamps["files"])
+    status: Dict[str, str] = {}
+    results: Dict[str, dict] = {}
+
+    def up_to_date(stage: Stage) -> Tuple[bool, dict]:
+        # Nothing upstream ran, and inputs and outputs hash as they did after the last run
+        signature = {"inputs": files.signature(stage.inputs(config)),
+                     "outputs": files.signature(stage.outputs(config))}
+        if force or any(status.get(dep) not in ("skipped", None) for dep in stage.deps if dep in selected):
+            return False, signature
+        return stamps["stages"].get(stage.name) == signature, signature
+
+    def execute(stage: Stage) -> dict:
+        buffer = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with instrumentation.stage(stage.name):
+                stage.run(config, sys.stdout if verbose else buffer)
+            state = "ran"
+        except Exception as e:  # a failed stage must not take the others down
+            print(f"❌ {stage.name}: {e}", file=buffer)
+            state = "failed"
+        return {"stage": stage.name, "status": state,
+                "seconds": round(time.perf_counter() - start, 4), "log": buffer.getvalue()}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        remaining = list(stages)
+        while remaining or running:
+            for stage in list(remaining):
+                dep_states = [status.get(dep) for dep in stage.deps if dep in selected]
+                if None in dep_states:
+                    continue
+                remaining.remove(stage)
+                if any(s in ("failed", "blocked") for s in dep_states):
+                    status[stage.name] = "blocked"
+                    results[stage.name] = {"stage": stage.name, "status": "blocked", "seconds": 0.0, "log": ""}
+                    continue
+                current, _ = up_to_date(stage)
+                if current or dry_run:
+                    status[stage.name] = "skipped" if current else "stale"
+                    results[stage.name] = {"stage": stage.name, "status": status[stage.name],
+                                           "seconds": 0.0, "log": ""}
+                    continue
+                running[pool.submit(execute, stage)] = stage
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                results[stage.name] = future.result()
+                status[stage.name] = results[stage.name]["status"]
+
+    if not dry_run:
+        # Re-stamp from the final state: a later stage may rewrite an earlier stage's outputs
+        for stage in stages:
+            if status[stage.name] in ("ran", "skipped"):
+                _, signature = up_to_date(stage)
+                stamps["stages"][stage.name] = signature
+            else:
+                stamps["stages"].pop(stage.name, None)
+        changed = any(stamps["files"].get(k) != v for k, v in files.current.items())
+        if changed or any(status[s.name] != "skipped" for s in stages):
+            stamps["files"].update(files.current)
+            with open(stamps_path, "w", encoding="utf-8") as f:
+                json.dump(stamps, f, separators=(",", ":"))
+
+    return [results[stage.name] for stage in stages]
+
+
+def main(argv=None) -> int:
+    from notewall_tools import load_config
+
+    parser = argparse.ArgumentParser(description="Run the NoteWall tooling stages that are out of date")
+    parser.add_argument("stages", nargs="*", help=f"stages to run with their dependencies "
+                                                  f"(default: all of {', '.join(s.name for s in STAGES)})")
+    parser.add_argument("--force", action="store_true", help="run stages even when up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only show which stages are stale")
+    parser.add_argument("--jobs", type=int, help="stages to run at once")
+    parser.add_argument("--verbose", action="store_true", help="stream stage output instead of buffering it")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_pipeline(load_config(), args.stages, args.force, args.dry_run, args.jobs, args.verbose)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        icons = {"ran": "✅", "skipped": "⏭ ", "stale": "🔸", "failed": "❌", "blocked": "⛔"}
+        for result in results:
+            print(f"{icons[result['status']]} {result['stage']:<20} {result['status']:<8} {result['seconds']:.3f}s")
+            if result["status"] == "failed":
+                print(result["log"])
+        print(f"\n⏱  {elapsed * 1000:.1f} ms")
+    return 1 if any(r["status"] in ("failed", "blocked") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Privacy Manifest Checker
+Scans the Swift sources for required-reason APIs (UserDefaults, file
+timestamps, system boot time, disk space, active keyboards) and compares the
+categories found with the ones declared in PrivacyInfo.xcprivacy.
+
+Every API symbol goes into one trie, compiled into a single regex that also
+consumes comments and string literals, so each file is matched in one pass
+whatever the number of symbols. Interpolations inside a skipped literal are
+scanned again, as code. Large source sets are split across processes.
+"""
+
+import argparse
+import json
+import os
+import plistlib
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple
+
+import instrumentation
+from swift_scan import INTERPOLATED_BODY, INTERPOLATION_EXPR, find_swift_files, read_swift_source
+
+MANIFEST_NAME = "PrivacyInfo.xcprivacy"
+CATEGORY_PREFIX = "NSPrivacyAccessedAPICategory"
+# Below this many source bytes, process start-up costs more than the scan
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+# C functions only count when called ("stat(" but not "let stat"), and
+# property names only as members (".creationDate" but not "let creationDate")
+CALL = "("
+MEMBER = "."
+
+# Apple's required-reason API list, by category
+REQUIRED_REASON_APIS = {
+    "FileTimestamp": [
+        ".creationDate", ".modificationDate", ".fileModificationDate", ".contentModificationDateKey",
+        ".creationDateKey", "NSFileCreationDate", "NSFileModificationDate", "NSURLCreationDateKey",
+        "NSURLContentModificationDateKey", "getattrlist(", "getattrlistbulk(", "fgetattrlist(",
+        "getattrlistat(", "stat(", "fstat(", "fstatat(", "lstat(",
+    ],
+    "SystemBootTime": [".systemUptime", "mach_absolute_time("],
+    "DiskSpace": [
+        ".volumeAvailableCapacityKey", ".volumeAvailableCapacityForImportantUsageKey",
+        ".volumeAvailableCapacityForOpportunisticUsageKey", ".volumeTotalCapacityKey", ".systemFreeSize",
+        ".systemSize", "NSFileSystemFreeSize", "NSFileSystemSize", "NSURLVolumeAvailableCapacityKey",
+        "statfs(", "statvfs(", "fstatfs(", "fstatvfs(",
+    ],
+    "ActiveKeyboards": [".activeInputModes"],
+    "UserDefaults": ["UserDefaults", "NSUserDefaults", "AppStorage"],
+}
+
+Site = Tuple[str, int, str]
+
+# The code inside a literal's interpolations; other escapes are consumed so "\\(" is not one
+INTERPOLATION = re.compile(r'\\\((?P<expr>' + INTERPOLATION_EXPR + r')\)|\\.')
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a trie node: one branch per next character, shared prefixes matched once"""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != ""]
+    if "" in node:
+        # End of a symbol: it must not run on into a longer identifier
+        branches.append(r"(?!\w)" + (r"(?=\s*\()" if node[""] == CALL else ""))
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def compile_api_matcher(apis: Dict[str, List[str]] = REQUIRED_REASON_APIS) -> Tuple[Pattern, Dict[str, str], set]:
+    """One pattern matching every symbol (group ``api``) and skipping comments and strings (group ``skip``)
+
+    Also returns each symbol's category and the symbols that only count as members.
+    """
+    trie: dict = {}
+    category_of = {}
+    members = set()
+    for category, symbols in apis.items():
+        for symbol in symbols:
+            name = symbol.strip(CALL + MEMBER)
+            category_of[name] = category
+            if symbol.startswith(MEMBER):
+                members.add(name)
+            node = trie
+            for char in name:
+                node = node.setdefault(char, {})
+            node[""] = CALL if symbol.endswith(CALL) else ""
+    pattern = (r'(?P<skip>//[^\n]*|/\*.*?\*/|"""(?:.|\n)*?"""|"' + INTERPOLATED_BODY + '")'
+               r'|(?<![\w$])(?P<api>' + _trie_pattern(trie) + ")")
+    return re.compile(pattern, re.DOTALL), category_of, members
+
+
+MATCHER, CATEGORY_OF, MEMBERS = compile_api_matcher()
+
+
+def find_uses(content: str, first_line: int = 1) -> List[Tuple[str, int, str]]:
+    """(category, line, symbol) for every required-reason API use in Swift code"""
+    uses = []
+    line, last = first_line, 0
+    for match in MATCHER.finditer(content):
+        skipped, symbol = match.group("skip"), match.group("api")
+        if skipped is not None:
+            if not skipped.startswith('"') or "\\(" not in skipped:
+                continue
+            # "\(UserDefaults.standard.string(forKey: "k"))" still calls the API
+            line += content.count("\n", last, match.start())
+            last = match.start()
+            for piece in INTERPOLATION.finditer(skipped):
+                if piece.group("expr"):
+                    uses += find_uses(piece.group("expr"), line + skipped.count("\n", 0, piece.start("expr")))
+            continue
+        if symbol in MEMBERS and (match.start() == 0 or content[match.start() - 1] != "."):
+            continue
+        line += content.count("\n", last, match.start())
+        last = match.start()
+        uses.append((CATEGORY_OF[symbol], line, symbol))
+    return uses
+
+
+def scan_source(path: str) -> Tuple[str, List[Tuple[str, int, str]]]:
+    """(category, line, symbol) for every required-reason API use in one file"""
+    return path, find_uses(read_swift_source(path))
+
+
+def scan_sources(paths: List[Path], max_workers: Optional[int] = None) -> Dict[str, List[Site]]:
+    """Call sites per category across all files; ``max_workers=1`` always scans inline"""
+    names = [str(path) for path in paths]
+    with instrumentation.stage("scan"):
+        workers = min(len(names), max_workers or os.cpu_count() or 1)
+        if workers > 1 and sum(os.path.getsize(name) for name in names) >= PARALLEL_MIN_BYTES:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(scan_source, names, chunksize=max(1, len(names) // (workers * 4))))
+            for name in names:
+                instrumentation.record_read(name)
+        else:
+            results = [scan_source(name) for name in names]
+    sites: Dict[str, List[Site]] = {}
+    for path, uses in results:
+        for category, line, symbol in uses:
+            sites.setdefault(category, []).append((path, line, symbol))
+    return sites
+
+
+def declared_categories(manifest: Path) -> Dict[str, List[str]]:
+    """Declared API category -> reason codes, from an .xcprivacy plist"""
+    with open(manifest, "rb") as f:
+        data = plistlib.load(f)
+    instrumentation.record_read(manifest)
+    declared = {}
+    for entry in data.get("NSPrivacyAccessedAPITypes", []):
+        category = entry.get("NSPrivacyAccessedAPIType", "")
+        declared[category.removeprefix(CATEGORY_PREFIX)] = list(entry.get("NSPrivacyAccessedAPITypeReasons", []))
+    return declared
+
+
+def check_manifest(manifest: Path, source_dirs: List[Path], root: Optional[Path] = None,
+                   max_workers: Optional[int] = None) -> dict:
+    """Undeclared and over-declared required-reason API categories, with call sites"""
+    declared = declared_categories(manifest)
+    sites = scan_sources(find_swift_files(source_dirs), max_workers)
+
+    def where(path: str) -> str:
+        resolved = Path(path).resolve()
+        return str(resolved.relative_to(root)) if root and resolved.is_relative_to(root) else path
+
+    used = {category: [{"file": where(path), "line": line, "symbol": symbol} for path, line, symbol in found]
+            for category, found in sorted(sites.items())}
+    return {
+        "manifest": where(str(manifest)),
+        "declared": declared,
+        "used": {category: len(found) for category, found in used.items()},
+        "undeclared": {category: found for category, found in used.items() if category not in declared},
+        "over_declared": sorted(category for category in declared if category not in used),
+        "missing_reasons": sorted(category for category, reasons in declared.items() if not reasons),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Check PrivacyInfo.xcprivacy against required-reason API use")
+    parser.add_argument("sources", nargs="*", type=Path, help="Swift source folders (default: NoteWall and idol)")
+    parser.add_argument("--manifest", type=Path, default=root / "NoteWall" / MANIFEST_NAME,
+                        help="privacy manifest to check")
+    parser.add_argument("--jobs", type=int, help="worker processes for large source sets")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    sources = args.sources or [d for d in (root / "NoteWall", root / "idol") if d.exists()]
+    report = check_manifest(args.manifest, sources, root, args.jobs)
+    ok = not report["undeclared"] and not report["missing_reasons"]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0 if ok else 1
+
+    print(f"🔏 {report['manifest']}: {len(report['declared'])} declared API categories")
+    for category, count in report["used"].items():
+        mark = "✅" if category in report["declared"] else "❌"
+        print(f"   {mark} {category}: {count} call sites")
+    for category, found in report["undeclared"].items():
+        print(f"\n❌ {category} is used but not declared:")
+        for site in found[:10]:
+            print(f"   {site['file']}:{site['line']}  {site['symbol']}")
+        if len(found) > 10:
+            print(f"   ... {len(found) - 10} more")
+    for category in report["over_declared"]:
+        print(f"⚠️  {category} is declared but never called")
+    for category in report["missing_reasons"]:
+        print(f"❌ {category} is declared without a reason code")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
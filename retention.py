@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Sessions & Retention Cohorts
+Splits raw Mixpanel events into per-user sessions and builds a day-N
+retention matrix by first-seen date, using whole-array NumPy operations.
+"""
+
+import argparse
+import json
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from event_store import SECONDS_PER_DAY, EventStore, load_event_export, parse_filters
+
+DEFAULT_SESSION_GAP = 30 * 60
+
+
+@dataclass
+class Sessions:
+    """Session assignment for a set of events"""
+    session_ids: np.ndarray      # session number per event, in the store's row order
+    session_users: np.ndarray    # user code per session
+    starts: np.ndarray           # first event time per session
+    ends: np.ndarray             # last event time per session
+    event_counts: np.ndarray     # events per session
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.ends - self.starts
+
+
+@dataclass
+class RetentionMatrix:
+    """Users active N days after their first-seen day, per first-seen cohort"""
+    cohort_days: np.ndarray   # UTC day number of each cohort
+    cohort_sizes: np.ndarray  # users first seen on that day
+    active: np.ndarray        # [cohort, day offset] -> active users
+
+    def rates(self) -> np.ndarray:
+        sizes = np.maximum(self.cohort_sizes, 1)[:, None]
+        return self.active / sizes
+
+    def to_dict(self) -> dict:
+        return {
+            "cohorts": [_format_day(d) for d in self.cohort_days],
+            "sizes": self.cohort_sizes.tolist(),
+            "active": self.active.tolist(),
+        }
+
+
+def _format_day(day: int) -> str:
+    return datetime.fromtimestamp(int(day) * SECONDS_PER_DAY, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def sessionize(store: EventStore, gap_seconds: float = DEFAULT_SESSION_GAP,
+               mask: Optional[np.ndarray] = None) -> Sessions:
+    """Start a new session whenever a user's events are more than ``gap_seconds`` apart"""
+    rows = np.flatnonzero(mask) if mask is not None else np.arange(len(store))
+    users = store.users[rows]
+    times = store.times[rows]
+
+    order = np.lexsort((times, users))
+    sorted_users = users[order]
+    sorted_times = times[order]
+
+    new_session = np.ones(len(order), dtype=bool)
+    if len(order) > 1:
+        new_session[1:] = (sorted_users[1:] != sorted_users[:-1]) | (
+            np.diff(sorted_times) > gap_seconds
+        )
+    sorted_ids = np.cumsum(new_session) - 1
+
+    session_ids = np.full(len(store), -1, dtype=np.int64)
+    session_ids[rows[order]] = sorted_ids
+
+    starts_at = np.flatnonzero(new_session)
+    ends_at = np.append(starts_at[1:], len(order)) - 1
+    return Sessions(
+        session_ids=session_ids,
+        session_users=sorted_users[starts_at],
+        starts=sorted_times[starts_at],
+        ends=sorted_times[ends_at],
+        event_counts=ends_at - starts_at + 1,
+    )
+
+
+def retention_matrix(store: EventStore, max_day: int = 30,
+                     mask: Optional[np.ndarray] = None) -> RetentionMatrix:
+    """Count users active on day N after their first-seen day, per cohort"""
+    users, days = store.users, store.days()
+    if mask is not None:
+        users, days = users[mask], days[mask]
+    if len(users) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return RetentionMatrix(empty, empty, np.zeros((0, max_day + 1), dtype=np.int64))
+    return _retention_counts(users, days, max_day)
+
+
+def _retention_counts(users: np.ndarray, days: np.ndarray, max_day: int) -> RetentionMatrix:
+    # Distinct (user, day) pairs, sorted by user and then day
+    base_day = int(days.min())
+    pairs = np.unique((users.astype(np.int64) << 32) | (days - base_day))
+    pair_users = pairs >> 32
+    pair_days = (pairs & 0xFFFFFFFF) + base_day
+
+    # The first pair of each user run is that user's first-seen day
+    run_start = np.ones(len(pairs), dtype=bool)
+    run_start[1:] = pair_users[1:] != pair_users[:-1]
+    first_index = np.maximum.accumulate(np.where(run_start, np.arange(len(pairs)), 0))
+    first_day = pair_days[first_index]
+
+    offsets = pair_days - first_day
+    in_window = offsets <= max_day
+    offsets, first_day = offsets[in_window], first_day[in_window]
+
+    cohort_days, cohort_index = np.unique(first_day, return_inverse=True)
+    width = max_day + 1
+    active = np.bincount(cohort_index * width + offsets, minlength=len(cohort_days) * width)
+    active = active.reshape(len(cohort_days), width)
+
+    return RetentionMatrix(cohort_days=cohort_days, cohort_sizes=active[:, 0], active=active)
+
+
+def summarize_sessions(sessions: Sessions) -> Dict[str, float]:
+    if len(sessions) == 0:
+        return {"sessions": 0, "users": 0}
+    return {
+        "sessions": len(sessions),
+        "users": int(len(np.unique(sessions.session_users))),
+        "median_duration_s": float(np.median(sessions.durations)),
+        "mean_events": float(sessions.event_counts.mean()),
+    }
+
+
+class StreamingAggregator:
+    """Session summary and retention matrix built from batches of whole users
+
+    Feed it events sorted by (user, time) where no user spans two batches
+    (e.g. external_sort.user_batches), so memory depends on the number of
+    sessions and cohorts, not events.
+    """
+
+    def __init__(self, gap_seconds: float = DEFAULT_SESSION_GAP, max_day: int = 30):
+        self.gap_seconds = gap_seconds
+        self.max_day = max_day
+        self.users = 0
+        self.events = 0
+        self.durations = array("d")
+        self.cohorts: Dict[int, np.ndarray] = {}
+
+    def add_users(self, users: np.ndarray, times: np.ndarray):
+        if not len(users):
+            return
+        new_user = np.ones(len(users), dtype=bool)
+        new_user[1:] = users[1:] != users[:-1]
+        new_session = new_user.copy()
+        new_session[1:] |= np.diff(times) > self.gap_seconds
+        starts = np.flatnonzero(new_session)
+        ends = np.append(starts[1:], len(users)) - 1
+        self.durations.extend((times[ends] - times[starts]).tolist())
+        self.users += int(new_user.sum())
+        self.events += len(users)
+
+        matrix = _retention_counts(users, (times // SECONDS_PER_DAY).astype(np.int64), self.max_day)
+        for day, active in zip(matrix.cohort_days.tolist(), matrix.active):
+            if day in self.cohorts:
+                self.cohorts[day] += active
+            else:
+                self.cohorts[day] = active.copy()
+
+    def summary(self) -> Dict[str, float]:
+        if not self.durations:
+            return {"sessions": 0, "users": 0}
+        return {
+            "sessions": len(self.durations),
+            "users": self.users,
+            "median_duration_s": float(np.median(np.frombuffer(self.durations, dtype=np.float64))),
+            "mean_events": self.events / len(self.durations),
+        }
+
+    def matrix(self) -> RetentionMatrix:
+        cohort_days = np.array(sorted(self.cohorts), dtype=np.int64)
+        active = np.array([self.cohorts[day] for day in cohort_days], dtype=np.int64).reshape(-1, self.max_day + 1)
+        return RetentionMatrix(cohort_days=cohort_days, cohort_sizes=active[:, 0], active=active)
+
+
+def _out_of_core(args) -> Tuple[Dict[str, float], RetentionMatrix, dict]:
+    from external_sort import ExternalSorter, sort_export, user_batches
+
+    user_map = None
+    if args.aliases:
+        from identity import AliasTable
+
+        table = AliasTable.load(args.aliases)
+        user_map = dict(zip(table.ids, table.labels()))
+    aggregator = StreamingAggregator(args.gap * 60, args.days)
+    with ExternalSorter(args.run_rows) as sorter:
+        sort_export(args.export, sorter, parse_filters(args.filter), user_map)
+        for batch in user_batches(sorter.sorted_rows()):
+            aggregator.add_users(batch["user"], batch["time"])
+        stats = sorter.stats()
+    return aggregator.summary(), aggregator.matrix(), stats
+
+
+def _print_matrix(matrix: RetentionMatrix, show_days: int):
+    width = min(show_days, matrix.active.shape[1])
+    header = "Cohort        Users " + "".join(f"{'D' + str(d):>7}" for d in range(width))
+    print(header)
+    rates = matrix.rates()
+    for i, day in enumerate(matrix.cohort_days):
+        cells = "".join(f"{rates[i, d] * 100:6.1f}%" for d in range(width))
+        print(f"{_format_day(day)}  {matrix.cohort_sizes[i]:>5} {cells}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sessions and retention cohorts from a Mixpanel export")
+    parser.add_argument("export", help="Mixpanel events CSV export")
+    parser.add_argument("--gap", type=float, default=DEFAULT_SESSION_GAP / 60,
+                        help="inactivity gap in minutes that starts a new session")
+    parser.add_argument("--days", type=int, default=14, help="last day offset in the retention matrix")
+    parser.add_argument("--filter", action="append", default=[], metavar="COLUMN=VALUE",
+                        help="only keep events where COLUMN equals VALUE (repeatable)")
+    parser.add_argument("--aliases", type=Path, metavar="TABLE",
+                        help="count people instead of distinct IDs using an identity.py alias table")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="sort through spilled runs on disk instead of loading the export into memory")
+    parser.add_argument("--run-rows", type=int, default=1_000_000,
+                        help="events per sorted run in --out-of-core mode")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args(argv)
+
+    stats = None
+    if args.out_of_core:
+        summary, matrix, stats = _out_of_core(args)
+    else:
+        store = load_event_export(args.export)
+        if args.aliases:
+            from identity import AliasTable, resolve_store
+
+            store = resolve_store(store, AliasTable.load(args.aliases))
+        mask = store.mask(parse_filters(args.filter))
+        summary = summarize_sessions(sessionize(store, args.gap * 60, mask))
+        matrix = retention_matrix(store, args.days, mask)
+
+    if args.json:
+        output = {"sessions": summary, "retention": matrix.to_dict()}
+        if stats:
+            output["sort"] = stats
+        print(json.dumps(output))
+        return
+
+    print("📊 Sessions & Retention")
+    print("=" * 50)
+    for key, value in summary.items():
+        print(f"   {key}: {value:g}" if isinstance(value, float) else f"   {key}: {value}")
+    print()
+    _print_matrix(matrix, args.days + 1)
+    if stats:
+        print(f"\n💽 Sorted {stats['rows']} events in {stats['runs']} spilled run(s), "
+              f"{stats['spilled_bytes']} bytes spilled, peak RSS {stats['peak_rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
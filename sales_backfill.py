@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+App Store Sales Backfill
+Loads gzipped App Store Connect daily sales reports (TSV) into a columnar
+store of per-day, per-product, per-country unit totals.
+
+Reports are decoded as gzip streams across a process pool, and a manifest
+records every report already loaded (by size and mtime), so each one is only
+parsed once. Cumulative downloads are then a sum over the stored dailies
+instead of re-fetching and re-parsing 90 reports like sales-parser.js does.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import instrumentation
+from event_store import SECONDS_PER_DAY, EventStore
+
+STORE_NAME = "sales-dailies.npz"
+MANIFEST_NAME = "sales-manifest.json"
+MANIFEST_VERSION = 1
+REPORT_PATTERNS = ("*.txt.gz", "*.tsv.gz")
+
+PRODUCT_COLUMN = "SKU"
+TYPE_COLUMN = "Product Type Identifier"
+COUNTRY_COLUMN = "Country Code"
+UNITS_COLUMN = "Units"
+DATE_COLUMN = "Begin Date"
+REPORT_COLUMN = "Report"
+
+# First-time downloads exactly as vercel-email-api's sales-parser.js counts them:
+# 1 (paid app) and 1F (free/universal app). 1T (iPad) and F1 (Mac) are left out
+# like 3 (re-download) and 7 (update), so backfilled totals match the emails
+DOWNLOAD_TYPES = ("1", "1F")
+
+STORE_COLUMNS = [PRODUCT_COLUMN, TYPE_COLUMN, COUNTRY_COLUMN, REPORT_COLUMN]
+
+DailyKey = Tuple[int, str, str, str]
+
+
+def _day_number(value: str) -> int:
+    """Days since epoch for an Apple report date (MM/DD/YYYY, or YYYY-MM-DD)"""
+    if "/" in value:
+        month, day, year = value.split("/")
+    else:
+        year, month, day = value.split("-")
+    return datetime(int(year), int(month), int(day), tzinfo=timezone.utc).toordinal() - 719163
+
+
+def parse_report(path: str) -> Tuple[str, Dict[DailyKey, int]]:
+    """Unit totals by (day, product, type, country) from one gzipped report"""
+    totals: Dict[DailyKey, int] = {}
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        header = f.readline().rstrip("\r\n").split("\t")
+        date_idx = header.index(DATE_COLUMN)
+        product_idx = header.index(PRODUCT_COLUMN)
+        type_idx = header.index(TYPE_COLUMN)
+        country_idx = header.index(COUNTRY_COLUMN)
+        units_idx = header.index(UNITS_COLUMN)
+        days: Dict[str, int] = {}
+        for line in f:
+            row = line.rstrip("\r\n").split("\t")
+            if len(row) <= units_idx:
+                continue
+            date = row[date_idx]
+            day = days.get(date)
+            if day is None:
+                day = days[date] = _day_number(date)
+            key = (day, row[product_idx], row[type_idx], row[country_idx])
+            totals[key] = totals.get(key, 0) + int(float(row[units_idx] or 0))
+    return path, totals
+
+
+def find_reports(directory: Path) -> List[Path]:
+    return sorted({p for pattern in REPORT_PATTERNS for p in directory.glob(pattern)})
+
+
+def _load_manifest(path: Path) -> Dict[str, list]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest["reports"]
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _empty_store() -> EventStore:
+    return EventStore(
+        times=np.zeros(0, dtype=np.float64),
+        codes={name: np.zeros(0, dtype=np.int32) for name in STORE_COLUMNS},
+        dictionaries={name: [] for name in STORE_COLUMNS},
+        columns=STORE_COLUMNS,
+        values={UNITS_COLUMN: np.zeros(0, dtype=np.int64)},
+    )
+
+
+def _append(store: EventStore, parsed: List[Tuple[str, Dict[DailyKey, int]]]) -> EventStore:
+    """Store with the parsed reports' rows added, codes extended in place of re-encoding"""
+    lookups = {name: {v: i for i, v in enumerate(store.dictionaries[name])} for name in STORE_COLUMNS}
+    dictionaries = {name: list(store.dictionaries[name]) for name in STORE_COLUMNS}
+
+    def encode(name: str, value: str) -> int:
+        code = lookups[name].get(value)
+        if code is None:
+            code = lookups[name][value] = len(dictionaries[name])
+            dictionaries[name].append(value)
+        return code
+
+    days: List[int] = []
+    units: List[int] = []
+    codes: Dict[str, List[int]] = {name: [] for name in STORE_COLUMNS}
+    for path, totals in parsed:
+        report = encode(REPORT_COLUMN, os.path.basename(path))
+        for (day, product, product_type, country), count in totals.items():
+            days.append(day)
+            units.append(count)
+            codes[PRODUCT_COLUMN].append(encode(PRODUCT_COLUMN, product))
+            codes[TYPE_COLUMN].append(encode(TYPE_COLUMN, product_type))
+            codes[COUNTRY_COLUMN].append(encode(COUNTRY_COLUMN, country))
+            codes[REPORT_COLUMN].append(report)
+
+    return EventStore(
+        times=np.concatenate([store.times, np.array(days, dtype=np.float64) * SECONDS_PER_DAY]),
+        codes={name: np.concatenate([store.codes[name], np.array(codes[name], dtype=np.int32)])
+               for name in STORE_COLUMNS},
+        dictionaries=dictionaries,
+        columns=STORE_COLUMNS,
+        values={UNITS_COLUMN: np.concatenate([store.values[UNITS_COLUMN], np.array(units, dtype=np.int64)])},
+    )
+
+
+def backfill(report_dir: Path, store_path: Path, manifest_path: Optional[Path] = None,
+             max_workers: Optional[int] = None) -> Tuple[EventStore, dict]:
+    """Load every report not in the manifest (or changed since) into the store"""
+    manifest_path = manifest_path or store_path.with_name(MANIFEST_NAME)
+    # The manifest only means something together with the store it describes
+    manifest = _load_manifest(manifest_path) if store_path.exists() else {}
+    store = EventStore.load(str(store_path)) if manifest else _empty_store()
+
+    reports = find_reports(report_dir)
+    stale: List[str] = []
+    for path in reports:
+        st = path.stat()
+        if manifest.get(path.name) == [st.st_size, st.st_mtime_ns]:
+            instrumentation.record_cache(True)
+        else:
+            instrumentation.record_cache(False)
+            stale.append(str(path))
+
+    # A report that changed replaces its old rows rather than adding to them
+    replaced = [store.code_of(REPORT_COLUMN, os.path.basename(p)) for p in stale]
+    replaced = [code for code in replaced if code >= 0]
+    if replaced:
+        store = store.take(~np.isin(store.codes[REPORT_COLUMN], replaced))
+
+    with instrumentation.stage("parse reports"):
+        if len(stale) > 1:
+            workers = min(len(stale), max_workers or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(parse_report, stale))
+        else:
+            parsed = [parse_report(p) for p in stale]
+        for path in stale:
+            instrumentation.record_read(path)
+
+    if parsed or not store_path.exists():
+        store = _append(store, parsed)
+        with instrumentation.stage("write"):
+            store.save(str(store_path))
+            instrumentation.record_write(store_path)
+            for path in map(Path, stale):
+                st = path.stat()
+                manifest[path.name] = [st.st_size, st.st_mtime_ns]
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "reports": manifest}, f, indent=1, sort_keys=True)
+            instrumentation.record_write(manifest_path)
+
+    return store, {"reports": len(reports), "parsed": len(stale), "skipped": len(reports) - len(stale),
+                   "rows": len(store)}
+
+
+def daily_units(store: EventStore, product_types=DOWNLOAD_TYPES, since: Optional[int] = None,
+                product: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(day numbers, units) with units summed over products and countries"""
+    mask = store.mask({TYPE_COLUMN: list(product_types)})
+    if product:
+        mask &= store.mask({PRODUCT_COLUMN: product})
+    days = store.days()
+    if since is not None:
+        mask &= days >= since
+    unique_days, index = np.unique(days[mask], return_inverse=True)
+    return unique_days, np.bincount(index, weights=store.values[UNITS_COLUMN][mask],
+                                    minlength=len(unique_days)).astype(np.int64)
+
+
+def units_by_country(store: EventStore, product_types=DOWNLOAD_TYPES, since: Optional[int] = None) -> Dict[str, int]:
+    mask = store.mask({TYPE_COLUMN: list(product_types)})
+    if since is not None:
+        mask &= store.days() >= since
+    totals = np.bincount(store.codes[COUNTRY_COLUMN][mask], weights=store.values[UNITS_COLUMN][mask],
+                         minlength=len(store.dictionaries[COUNTRY_COLUMN]))
+    return {country: int(total) for country, total in
+            sorted(zip(store.dictionaries[COUNTRY_COLUMN], totals), key=lambda item: -item[1]) if total}
+
+
+def _format_day(day: int) -> str:
+    return datetime.fromtimestamp(int(day) * SECONDS_PER_DAY, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Backfill App Store sales reports into a daily units store")
+    parser.add_argument("reports", type=Path, help="folder of gzipped daily sales reports (.txt.gz / .tsv.gz)")
+    parser.add_argument("--store", type=Path, default=root / STORE_NAME, help="columnar dailies store (.npz)")
+    parser.add_argument("--days", type=int, help="only count the last N days of the store")
+    parser.add_argument("--product", help="only count this SKU")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    store, summary = backfill(args.reports, args.store, max_workers=args.jobs)
+    since = None
+    if args.days and len(store):
+        since = int(store.days().max()) - args.days + 1
+    days, units = daily_units(store, since=since, product=args.product)
+    summary["downloads"] = int(units.sum())
+
+    if args.json:
+        summary["daily"] = {_format_day(d): int(u) for d, u in zip(days, units)}
+        summary["countries"] = units_by_country(store, since=since)
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"📦 {summary['reports']} reports: {summary['parsed']} parsed, {summary['skipped']} already loaded")
+    if len(days):
+        print(f"📅 {_format_day(days[0])} – {_format_day(days[-1])}: {summary['downloads']} downloads")
+        for country, total in list(units_by_country(store, since=since).items())[:10]:
+            print(f"   {country}: {total}")
+    else:
+        print("📅 No download rows in the store")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Screen Path Analysis
+Orders every user's screen_view events and counts screen-to-screen
+transitions, the most common paths, back-and-forth loops and exit screens.
+
+Raw screen names are mapped to canonical IDs once per distinct name (see
+screen-ids.json), never per event: truncated quiz titles and numbered step
+names collapse to stable IDs. Transitions are a sparse COO matrix built with
+one sort and one unique() over the whole event stream.
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from event_store import EVENT_COLUMN, EventStore, load_event_export, parse_filters
+from retention import DEFAULT_SESSION_GAP
+
+SCREEN_EVENT = "screen_view"
+# Mixpanel property names first, then the Firebase report column
+SCREEN_COLUMNS = ("screen_name", "Screen Name", "screen_class", "Page path and screen class")
+SCREEN_IDS_NAME = "screen-ids.json"
+
+
+@dataclass
+class TransitionMatrix:
+    """Sparse screen-to-screen transition counts in COO form"""
+    screens: List[str]
+    rows: np.ndarray      # source screen code
+    cols: np.ndarray      # destination screen code
+    counts: np.ndarray
+
+    def dense(self) -> np.ndarray:
+        matrix = np.zeros((len(self.screens), len(self.screens)), dtype=np.int64)
+        matrix[self.rows, self.cols] = self.counts
+        return matrix
+
+    def top(self, limit: int = 10) -> List[Tuple[str, str, int]]:
+        order = np.argsort(-self.counts, kind="stable")[:limit]
+        return [(self.screens[self.rows[i]], self.screens[self.cols[i]], int(self.counts[i])) for i in order]
+
+    def to_dict(self) -> dict:
+        return {"screens": self.screens, "rows": self.rows.tolist(), "cols": self.cols.tolist(),
+                "counts": self.counts.tolist()}
+
+
+@dataclass
+class PathReport:
+    transitions: TransitionMatrix
+    paths: List[Tuple[List[str], int]]
+    loops: List[Tuple[str, str, int]]
+    exits: List[Tuple[str, int]]
+    sessions: int
+    views: int
+
+
+def load_screen_ids(path: Path) -> dict:
+    if not path.exists():
+        return {"exact": {}, "patterns": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def canonical_codes(names: List[str], screen_ids: dict) -> Tuple[np.ndarray, List[str]]:
+    """Map each raw name to a canonical screen code (-1 to drop it); returns (codes, canonical names)"""
+    exact = screen_ids.get("exact", {})
+    patterns = [(re.compile(pattern), replacement) for pattern, replacement in screen_ids.get("patterns", [])]
+    lookup: Dict[str, int] = {}
+    canonical: List[str] = []
+    codes = np.full(len(names), -1, dtype=np.int64)
+    for i, name in enumerate(names):
+        if name in exact:
+            name = exact[name]
+        else:
+            for pattern, replacement in patterns:
+                name = pattern.sub(replacement, name)
+        if not name:
+            continue
+        code = lookup.get(name)
+        if code is None:
+            code = lookup[name] = len(canonical)
+            canonical.append(name)
+        codes[i] = code
+    return codes, canonical
+
+
+def screen_column(store: EventStore) -> str:
+    for column in SCREEN_COLUMNS:
+        if column in store.codes:
+            return column
+    raise ValueError(f"export has no screen column (expected one of: {', '.join(SCREEN_COLUMNS)}); "
+                     f"include the screen_name property when exporting")
+
+
+def _ngrams(screens: np.ndarray, session_ids: np.ndarray, length: int, base: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(encoded n-gram, count) for every window of ``length`` views inside one session"""
+    windows = len(screens) - length + 1
+    if windows <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    same_session = session_ids[:windows] == session_ids[length - 1:]
+    encoded = np.zeros(windows, dtype=np.int64)
+    for offset in range(length):
+        encoded = encoded * base + screens[offset:offset + windows]
+    return np.unique(encoded[same_session], return_counts=True)
+
+
+def analyze_paths(store: EventStore, screen_ids: dict, mask: Optional[np.ndarray] = None,
+                  gap_seconds: float = DEFAULT_SESSION_GAP, path_length: int = 3, limit: int = 10) -> PathReport:
+    column = screen_column(store)
+    rows = store.events == store.code_of(EVENT_COLUMN, SCREEN_EVENT)
+    if mask is not None:
+        rows &= mask
+    canonical_of, screens = canonical_codes(store.dictionaries[column], screen_ids)
+    codes = canonical_of[store.codes[column][rows]]
+    users, times = store.users[rows], store.times[rows]
+    keep = codes >= 0
+    codes, users, times = codes[keep], users[keep], times[keep]
+    if len(codes) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return PathReport(transitions=TransitionMatrix(screens, empty, empty, empty), paths=[], loops=[],
+                          exits=[], sessions=0, views=0)
+
+    order = np.lexsort((times, users))
+    codes, users, times = codes[order], users[order], times[order]
+    new_session = np.ones(len(codes), dtype=bool)
+    new_session[1:] = (users[1:] != users[:-1]) | (np.diff(times) > gap_seconds)
+    session_ids = np.cumsum(new_session)
+    n = max(len(screens), 1)
+
+    # Transitions: consecutive views in one session, including A -> A re-entries
+    follows = ~new_session[1:]
+    pair_keys, pair_counts = np.unique(codes[:-1][follows] * n + codes[1:][follows], return_counts=True)
+    transitions = TransitionMatrix(screens, pair_keys // n, pair_keys % n, pair_counts)
+
+    # Loops: self transitions plus A <-> B pairs seen in both directions
+    counts = dict(zip(pair_keys.tolist(), pair_counts.tolist()))
+    loops = []
+    for key, count in counts.items():
+        src, dst = divmod(key, n)
+        if src == dst:
+            loops.append((screens[src], screens[dst], count))
+        elif src < dst and dst * n + src in counts:
+            loops.append((screens[src], screens[dst], min(count, counts[dst * n + src])))
+    loops.sort(key=lambda loop: -loop[2])
+
+    # Exits: the last view of every session
+    last = np.append(new_session[1:], True)
+    exit_counts = np.bincount(codes[last], minlength=len(screens))
+    exits = [(screens[i], int(exit_counts[i])) for i in np.argsort(-exit_counts, kind="stable") if exit_counts[i]]
+
+    # Paths: n-grams after collapsing repeated views of the same screen
+    changed = new_session | np.append(True, codes[1:] != codes[:-1])
+    paths = []
+    if n ** path_length < 2 ** 62:
+        grams, gram_counts = _ngrams(codes[changed], session_ids[changed], path_length, n)
+        for i in np.argsort(-gram_counts, kind="stable")[:limit]:
+            gram, steps = int(grams[i]), []
+            for _ in range(path_length):
+                gram, code = divmod(gram, n)
+                steps.append(screens[code])
+            paths.append((steps[::-1], int(gram_counts[i])))
+
+    return PathReport(transitions=transitions, paths=paths, loops=loops[:limit], exits=exits[:limit],
+                      sessions=int(new_session.sum()), views=len(codes))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Screen transitions, top paths, loops and exit screens")
+    parser.add_argument("export", help="Mixpanel events CSV export with a screen_name property")
+    parser.add_argument("--screen-ids", type=Path, default=root / SCREEN_IDS_NAME,
+                        help="raw screen name -> canonical ID table")
+    parser.add_argument("--gap", type=float, default=DEFAULT_SESSION_GAP / 60,
+                        help="inactivity gap in minutes that ends a path")
+    parser.add_argument("--length", type=int, default=3, help="screens per reported path")
+    parser.add_argument("--top", type=int, default=10, help="rows per section")
+    parser.add_argument("--filter", action="append", default=[], metavar="COLUMN=VALUE",
+                        help="only keep events where COLUMN equals VALUE (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args(argv)
+
+    store = load_event_export(args.export)
+    try:
+        report = analyze_paths(store, load_screen_ids(args.screen_ids), store.mask(parse_filters(args.filter)),
+                               args.gap * 60, args.length, args.top)
+    except (KeyError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps({
+            "views": report.views,
+            "sessions": report.sessions,
+            "transitions": report.transitions.to_dict(),
+            "paths": [{"screens": steps, "count": count} for steps, count in report.paths],
+            "loops": [{"from": a, "to": b, "count": count} for a, b, count in report.loops],
+            "exits": dict(report.exits),
+        }))
+        return 0
+
+    print(f"🧭 {report.views} screen views in {report.sessions} sessions, "
+          f"{len(report.transitions.screens)} screens")
+    print("\nTop transitions:")
+    for src, dst, count in report.transitions.top(args.top):
+        print(f"   {count:>6}  {src} → {dst}")
+    print(f"\nTop {args.length}-screen paths:")
+    for steps, count in report.paths:
+        print(f"   {count:>6}  {' → '.join(steps)}")
+    print("\nLoops:")
+    for a, b, count in report.loops:
+        print(f"   {count:>6}  {a} ↺" if a == b else f"   {count:>6}  {a} ⇄ {b}")
+    print("\nExit screens:")
+    for screen, count in report.exits:
+        print(f"   {count:>6}  {screen}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+String Occurrence Store
+Every string literal in the Swift sources of both targets, with the file,
+line, column and kind (the localizable API it is passed to, if any) of each
+occurrence.
+
+Literals are interned once in a string table and occurrences are parallel
+integer columns of one structured array, so the whole index of NoteWall/ and
+idol/ takes tens of kilobytes. It is persisted as a single binary file
+that loads with one read. Files are content-addressed: on update only files
+whose contents changed are rescanned, and identical copies share one scan.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+import instrumentation
+from localize_app import read_existing_translations
+from swift_scan import (INTERPOLATED_BODY, compile_scanner, find_swift_files, literal, read_swift_source,
+                        scan_literals)
+
+STORE_NAME = ".string-occurrences.bin"
+MAGIC = b"NWSTROC2"
+DIGEST_SIZE = 16
+
+KINDS = ("text", "interpolated", "localized", "title", "literal")
+OCCURRENCE = np.dtype([("string", "<i4"), ("file", "<i4"), ("line", "<i4"), ("column", "<i4"), ("kind", "<i4")])
+
+# Same Text("...") form as localize_app's extractor, plus the other APIs that take a localized key.
+# Any other literal (TextField placeholders, subtitle: arguments...) is still recorded, as "literal"
+OCCURRENCE_SCANNER = compile_scanner({
+    "text": r'Text\(' + literal("text", r'[^"]+') + r'\)',
+    "localized": r'NSLocalizedString\(' + literal("localized"),
+    "title": r'(?:Button|Label|Toggle|navigationTitle)\(' + literal("title", r'[^"]+') + r'[,)]',
+    "literal": literal("literal", INTERPOLATED_BODY),
+})
+# SwiftUI turns Text("\(count) days, 96%") into the key "%lld days, 96%%": both sides are compared
+# with interpolations and format specifiers as %@ and %% as %
+INTERPOLATION = re.compile(r'\\\((?:[^()]|\((?:[^()]|\([^()]*\))*\))*\)')
+FORMAT_SPECIFIER = re.compile(r'%(?:\d+\$)?[-+ #0]*\d*(?:\.\d+)?(?:ll|l|hh|h|q|z|t|j)?[@dDuUixXoOfFeEgGcCsSaAp]|%%')
+
+
+def format_key(value: str) -> str:
+    """Catalog key or literal with interpolations and format specifiers normalized"""
+    value = FORMAT_SPECIFIER.sub(lambda m: "%" if m.group() == "%%" else "%@", value)
+    return INTERPOLATION.sub("%@", value)
+
+
+def _digest(content: str) -> bytes:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+def _pack_strings(values: List[str]) -> Tuple[np.ndarray, bytes]:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def _unpack_strings(offsets: np.ndarray, blob: bytes) -> List[str]:
+    bounds = offsets.tolist()
+    return [blob[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])]
+
+
+class OccurrenceStore:
+    """Interned string table plus one row of integer codes per occurrence"""
+
+    def __init__(self, strings: Optional[List[str]] = None, files: Optional[List[str]] = None,
+                 digests: Optional[List[bytes]] = None, occurrences: Optional[np.ndarray] = None):
+        self.strings: List[str] = list(strings or [])
+        self.lookup: Dict[str, int] = {value: code for code, value in enumerate(self.strings)}
+        self.files: List[str] = list(files or [])
+        self.digests: List[bytes] = list(digests or [])
+        self.occurrences = np.zeros(0, dtype=OCCURRENCE) if occurrences is None else occurrences
+
+    def __len__(self) -> int:
+        return len(self.occurrences)
+
+    def intern(self, value: str) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def _occurrences(self, content: str, file_code: int, line_offset: int = 0,
+                     column_offset: int = 0) -> Iterator[Tuple[int, int, int, int, int]]:
+        for kind, value, line, column in scan_literals(content, OCCURRENCE_SCANNER):
+            if kind in ("text", "title") and "\\(" in value:
+                kind = "interpolated"
+            line, column = line + line_offset, column + (column_offset if line == 1 else 0)
+            yield self.intern(value), file_code, line, column, KINDS.index(kind)
+            if kind == "literal" and "\\(" in value:
+                # e.g. Text("what matters") inside "Never forget \(Text("what matters")...)"
+                yield from self._occurrences(value, file_code, line - 1, column - 1)
+
+    def _scan(self, content: str, file_code: int) -> np.ndarray:
+        return np.array(list(self._occurrences(content, file_code)), dtype=OCCURRENCE)
+
+    def update(self, root: Path, paths: Iterable[Path]) -> dict:
+        """Re-index the given files (paths relative to ``root`` are stored), rescanning only changed contents"""
+        previous = {digest: code for code, digest in enumerate(self.digests)}
+        by_file = np.argsort(self.occurrences["file"], kind="stable")
+        bounds = np.searchsorted(self.occurrences["file"][by_file], np.arange(len(self.files) + 1))
+        files, digests, parts = [], [], []
+        scanned: Dict[bytes, int] = {}
+        reused = 0
+        for path in paths:
+            content = read_swift_source(path)
+            digest = _digest(content)
+            code = len(files)
+            files.append(path.resolve().relative_to(root.resolve()).as_posix())
+            digests.append(digest)
+            if digest in scanned:
+                # Byte-identical copy (e.g. idol/PhotoSaver.swift): reuse this run's scan
+                rows = parts[scanned[digest]].copy()
+            elif digest in previous:
+                old = previous[digest]
+                rows = self.occurrences[by_file[bounds[old]:bounds[old + 1]]].copy()
+                reused += 1
+            else:
+                rows = self._scan(content, code)
+            rows["file"] = code
+            scanned.setdefault(digest, code)
+            parts.append(rows)
+
+        removed = len(set(self.files) - set(files))
+        self.files, self.digests = files, digests
+        self.occurrences = np.concatenate(parts) if parts else np.zeros(0, dtype=OCCURRENCE)
+        self._compact()
+        return {"files": len(files), "rescanned": len(scanned) - reused,
+                "reused": reused, "removed": removed, "occurrences": len(self), "strings": len(self.strings)}
+
+    def _compact(self):
+        # Drop strings no occurrence refers to any more and renumber the rest
+        used, codes = np.unique(self.occurrences["string"], return_inverse=True)
+        self.strings = [self.strings[code] for code in used.tolist()]
+        self.lookup = {value: code for code, value in enumerate(self.strings)}
+        self.occurrences["string"] = codes
+
+    def strings_of(self, kinds: Iterable[str] = KINDS, files: Optional[Iterable[str]] = None) -> Set[str]:
+        mask = np.isin(self.occurrences["kind"], [KINDS.index(kind) for kind in kinds])
+        if files is not None:
+            prefixes = tuple(files)
+            mask &= np.isin(self.occurrences["file"],
+                            [code for code, name in enumerate(self.files) if name.startswith(prefixes)])
+        return {self.strings[code] for code in np.unique(self.occurrences["string"][mask]).tolist()}
+
+    def where(self, value: str) -> List[Tuple[str, int, int, str]]:
+        """(file, line, column, kind) of every occurrence of a string"""
+        code = self.lookup.get(value)
+        if code is None:
+            return []
+        rows = self.occurrences[self.occurrences["string"] == code]
+        return [(self.files[f], line, column, KINDS[kind]) for _, f, line, column, kind in rows.tolist()]
+
+    def counts(self) -> Dict[str, int]:
+        """Occurrences per string, most used first"""
+        counts = np.bincount(self.occurrences["string"], minlength=len(self.strings))
+        return {self.strings[code]: int(counts[code]) for code in np.argsort(-counts, kind="stable").tolist()}
+
+    def diff(self, other: "OccurrenceStore") -> Dict[str, List[str]]:
+        """Strings this store has that ``other`` lacks, and the reverse"""
+        ours, theirs = set(self.strings), set(other.strings)
+        return {"added": sorted(ours - theirs), "removed": sorted(theirs - ours)}
+
+    def save(self, path: Path):
+        string_offsets, string_blob = _pack_strings(self.strings)
+        path_offsets, path_blob = _pack_strings(self.files)
+        header = np.array([len(self.strings), len(self.files), len(self), len(string_blob), len(path_blob)],
+                          dtype=np.int64)
+        parts = [MAGIC, header.tobytes(), string_offsets.tobytes(), path_offsets.tobytes(),
+                 b"".join(self.digests), self.occurrences.tobytes(), string_blob, path_blob]
+        with open(path, "wb") as f:
+            f.write(b"".join(parts))
+        instrumentation.record_write(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "OccurrenceStore":
+        with open(path, "rb") as f:
+            data = f.read()
+        instrumentation.record_read(path, len(data))
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a string occurrence store")
+        n_strings, n_files, n_rows, string_bytes, path_bytes = np.frombuffer(data, np.int64, 5, len(MAGIC)).tolist()
+        offset = len(MAGIC) + 40
+
+        def take(dtype, count):
+            nonlocal offset
+            array = np.frombuffer(data, dtype, count, offset)
+            offset += array.nbytes
+            return array
+
+        string_offsets = take(np.int64, n_strings + 1)
+        path_offsets = take(np.int64, n_files + 1)
+        digests = take(f"S{DIGEST_SIZE}", n_files)
+        occurrences = take(OCCURRENCE, n_rows).copy()
+        string_blob = data[offset:offset + string_bytes]
+        path_blob = data[offset + string_bytes:offset + string_bytes + path_bytes]
+        return cls(_unpack_strings(string_offsets, string_blob), _unpack_strings(path_offsets, path_blob),
+                   [bytes(d).ljust(DIGEST_SIZE, b"\0") for d in digests.tolist()], occurrences)
+
+
+def load_store(path: Path) -> OccurrenceStore:
+    try:
+        return OccurrenceStore.load(path)
+    except (OSError, ValueError):
+        return OccurrenceStore()
+
+
+def index_sources(root: Path, source_dirs: List[Path], store_path: Path) -> Tuple[OccurrenceStore, dict]:
+    """Bring the persistent store up to date with the Swift files in ``source_dirs``"""
+    store = load_store(store_path)
+    with instrumentation.stage("index strings"):
+        summary = store.update(root, find_swift_files(source_dirs))
+    store.save(store_path)
+    return store, summary
+
+
+def catalog_report(store: OccurrenceStore, catalog_path: Path) -> dict:
+    """Catalog keys no string literal spells (directly or as a format), and Text()/title strings the catalog lacks"""
+    catalog = read_existing_translations(str(catalog_path))
+    used = set(store.strings)
+    formats = {format_key(value) for value in store.strings}
+    keyed = store.strings_of(("text", "title"))
+    return {
+        "unused_keys": sorted(key for key in catalog if key not in used and format_key(key) not in formats),
+        "uncataloged": sorted(value for value in keyed if value not in catalog and len(value) > 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Index and query where localizable strings occur in the Swift sources")
+    parser.add_argument("--root", type=Path, default=root, help="repository root")
+    parser.add_argument("--source", action="append", type=Path, metavar="DIR",
+                        help="Swift source folder (repeatable, default: NoteWall and idol)")
+    parser.add_argument("--store", type=Path, help=f"occurrence store file (default: ROOT/{STORE_NAME})")
+    parser.add_argument("--catalog", type=Path, help="base catalog (default: ROOT/NoteWall/en.lproj/Localizable.strings)")
+    parser.add_argument("--where", metavar="STRING", help="list every occurrence of this string")
+    parser.add_argument("--diff", type=Path, metavar="STORE", help="compare the strings with an older store file")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args(argv)
+
+    sources = [args.root / d for d in (args.source or ["NoteWall", "idol"])]
+    store_path = args.store or args.root / STORE_NAME
+    baseline = OccurrenceStore.load(args.diff) if args.diff else None
+    store, summary = index_sources(args.root, [d for d in sources if d.exists()], store_path)
+
+    if args.where is not None:
+        result = {"string": args.where, "occurrences": [
+            {"file": f, "line": line, "column": column, "kind": kind}
+            for f, line, column, kind in store.where(args.where)]}
+    elif baseline is not None:
+        result = store.diff(baseline)
+    else:
+        result = dict(summary, **catalog_report(
+            store, args.catalog or args.root / "NoteWall" / "en.lproj" / "Localizable.strings"))
+        result["kinds"] = {kind: int(n) for kind, n in zip(KINDS, np.bincount(store.occurrences["kind"],
+                                                                              minlength=len(KINDS)))}
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"🗂  {summary['occurrences']} occurrences of {summary['strings']} strings in {summary['files']} files "
+          f"({summary['rescanned']} scanned, {summary['reused']} unchanged)")
+    if args.where is not None:
+        for entry in result["occurrences"]:
+            print(f"   {entry['file']}:{entry['line']}:{entry['column']} ({entry['kind']})")
+        if not result["occurrences"]:
+            print(f"   \"{args.where}\" does not occur in the sources")
+    elif baseline is not None:
+        for value in result["added"]:
+            print(f"   + {value}")
+        for value in result["removed"]:
+            print(f"   - {value}")
+    else:
+        print("   " + ", ".join(f"{kind}: {count}" for kind, count in result["kinds"].items()))
+        print(f"🔑 {len(result['unused_keys'])} catalog keys no string literal in the sources spells")
+        print(f"📝 {len(result['uncataloged'])} Text()/title strings missing from the catalog")
+        for value in result["uncataloged"][:20]:
+            print(f"   {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
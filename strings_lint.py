@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Localizable.strings Linter
+Checks every locale catalog against the base (English) catalog for missing
+keys, stray keys, duplicates and mismatched format specifiers.
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+ENTRY_PATTERN = re.compile(r'^\s*"((?:[^"\\]|\\.)*)"\s*=\s*"((?:[^"\\]|\\.)*)"\s*;')
+FORMAT_SPECIFIER = re.compile(r'%(?:\d+\$)?[-+#0]*\d*(?:\.\d+)?(?:ll|l|h|hh|q|z|t|j)?[@dDiuUxXoOfFeEgGcCsSpaA]')
+
+
+def iter_entries(path: Path) -> Iterator[Tuple[int, str, str]]:
+    """Yield (line, key, value) for each single-line entry in a .strings file"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            match = ENTRY_PATTERN.match(line)
+            if match:
+                yield line_number, match.group(1), match.group(2)
+
+
+def format_specifiers(text: str) -> List[str]:
+    # Positional specifiers (%1$@) may be reordered, so compare them as a sorted list
+    return sorted(spec.replace("ll", "l") for spec in FORMAT_SPECIFIER.findall(text.replace("%%", "")))
+
+
+def lint_catalog(path: Path, base_keys: Dict[str, str], locale: str, delta: bool = False) -> List[Dict]:
+    issues = []
+    seen: Dict[str, int] = {}
+    for line, key, value in iter_entries(path):
+        if key in seen:
+            issues.append({"locale": locale, "line": line, "kind": "duplicate", "key": key,
+                           "message": f"duplicate of line {seen[key]}"})
+        seen[key] = line
+
+        if base_keys and key not in base_keys:
+            issues.append({"locale": locale, "line": line, "kind": "stray", "key": key,
+                           "message": "key is not in the base catalog"})
+        if key in base_keys and format_specifiers(base_keys[key]) != format_specifiers(value):
+            issues.append({"locale": locale, "line": line, "kind": "format", "key": key,
+                           "message": f"format specifiers differ: {value!r}"})
+
+    # Delta catalogs leave untranslated keys to the base localization on purpose
+    for key in ({} if delta else base_keys):
+        if key not in seen:
+            issues.append({"locale": locale, "line": 0, "kind": "missing", "key": key,
+                           "message": "key is missing from this catalog"})
+    return issues
+
+
+def lint_strings(notewall_dir: Path, languages: List[str], base: str = "en", delta: bool = False) -> List[Dict]:
+    """Lint every locale's Localizable.strings, the base catalog first"""
+    catalogs = {lang: notewall_dir / f"{lang}.lproj" / "Localizable.strings" for lang in languages}
+    base_path = catalogs.get(base)
+    base_keys = {key: value for _, key, value in iter_entries(base_path)} if base_path and base_path.exists() else {}
+
+    issues = []
+    for lang, path in catalogs.items():
+        if not path.exists():
+            issues.append({"locale": lang, "line": 0, "kind": "missing-file", "key": "",
+                           "message": f"{path} does not exist"})
+            continue
+        issues.extend(lint_catalog(path, {} if lang == base else base_keys, lang, delta))
+    return issues
+
+
+def main():
+    paths = [arg for arg in sys.argv[1:] if arg != "--delta"]
+    notewall_dir = Path(paths[0]) if paths else Path(__file__).resolve().parent / "NoteWall"
+    issues = lint_strings(notewall_dir, ["en", "de", "es", "fr"], delta="--delta" in sys.argv)
+
+    for issue in issues:
+        print(f"{issue['locale']}:{issue['line']}: {issue['kind']}: \"{issue['key']}\" {issue['message']}")
+    print(f"\n{'❌' if issues else '✅'} {len(issues)} issues")
+    sys.exit(1 if issues else 0)
+
+
+if __name__ == "__main__":
+    main()
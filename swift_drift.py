@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Shared Source Drift Detector
+Finds where the Swift files another target copied from NoteWall/ (idol/) have
+drifted from the originals, per file and per line range.
+
+Every file is tokenized with comments and whitespace dropped, hashed as
+rolling k-token windows and reduced to winnowed fingerprints, the smallest
+hash of every w consecutive windows. Files are then compared on fingerprint
+sets only: shared fingerprints mark shared code, the rest diverged regions,
+and an inverted index finds the best-matching file in the other target
+without diffing every pair of files.
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from localize_app import SKIPPED_SWIFT_FILES, TEXT_SCANNER, read_existing_translations
+from swift_scan import find_swift_files, read_swift_source, scan_literals
+
+DEFAULT_TARGETS = ("NoteWall", "idol")
+# Matches of at least K + W - 1 tokens are always found; shorter ones of at least K may be
+DEFAULT_K = 12
+DEFAULT_WINDOW = 8
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<skip>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<token>"""(?:.|\n)*?"""|"(?:[^"\\\n]|\\.)*"|[A-Za-z_]\w*|\d[\w.]*|\S)
+''', re.VERBOSE | re.DOTALL)
+
+
+class TokenTable:
+    """Random 64-bit value per distinct token, shared by every file so equal tokens hash equally"""
+
+    def __init__(self, seed: int = 0):
+        self._rng = np.random.default_rng(seed)
+        self._values: Dict[str, int] = {}
+
+    def values(self, tokens: List[str]) -> np.ndarray:
+        unseen = [token for token in dict.fromkeys(tokens) if token not in self._values]
+        if unseen:
+            self._values.update(zip(unseen, self._rng.integers(0, 2 ** 63, len(unseen), dtype=np.int64).tolist()))
+        return np.array([self._values[token] for token in tokens], dtype=np.int64).view(np.uint64)
+
+
+@dataclass
+class Fingerprints:
+    path: Path
+    hashes: np.ndarray       # winnowed k-gram hashes
+    positions: np.ndarray    # token index where each k-gram starts
+    token_lines: np.ndarray  # source line of every token
+    k: int
+
+    @property
+    def unique(self) -> np.ndarray:
+        return np.unique(self.hashes)
+
+
+def tokenize(text: str) -> Tuple[List[str], np.ndarray]:
+    """Normalized tokens and the line each one starts on"""
+    tokens, offsets = [], []
+    for match in TOKEN_PATTERN.finditer(text):
+        if match.lastgroup == "token":
+            tokens.append(match.group("token"))
+            offsets.append(match.start())
+    newlines = np.flatnonzero(np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32) == ord("\n"))
+    return tokens, np.searchsorted(newlines, np.array(offsets, dtype=np.int64)) + 1
+
+
+def kgram_hashes(values: np.ndarray, k: int) -> np.ndarray:
+    """Polynomial hash of every k consecutive token values (uint64 arithmetic wraps, i.e. mod 2**64)"""
+    count = len(values) - k + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint64)
+    base = np.uint64(0x100000001B3)
+    hashes = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for offset in range(k):
+            hashes = hashes * base + values[offset:offset + count]
+    return hashes
+
+
+def winnow(hashes: np.ndarray, window: int) -> np.ndarray:
+    """Positions of the winnowed fingerprints: the rightmost minimum of every window"""
+    if len(hashes) <= window:
+        return np.array([len(hashes) - 1 - np.argmin(hashes[::-1])]) if len(hashes) else np.zeros(0, dtype=np.int64)
+    windows = np.lib.stride_tricks.sliding_window_view(hashes, window)
+    rightmost = window - 1 - np.argmin(windows[:, ::-1], axis=1)
+    return np.unique(np.arange(len(windows)) + rightmost)
+
+
+def fingerprint_file(path: Path, table: TokenTable, k: int = DEFAULT_K, window: int = DEFAULT_WINDOW) -> Fingerprints:
+    tokens, lines = tokenize(read_swift_source(path))
+    hashes = kgram_hashes(table.values(tokens), k)
+    positions = winnow(hashes, window)
+    return Fingerprints(path=path, hashes=hashes[positions], positions=positions, token_lines=lines, k=k)
+
+
+class FingerprintIndex:
+    """Inverted index from fingerprint hash to the files that contain it"""
+
+    def __init__(self, prints: List[Fingerprints]):
+        self.prints = prints
+        pairs = [(fp.unique, np.full(len(fp.unique), i)) for i, fp in enumerate(prints)]
+        hashes = np.concatenate([h for h, _ in pairs]) if pairs else np.zeros(0, dtype=np.uint64)
+        files = np.concatenate([f for _, f in pairs]) if pairs else np.zeros(0, dtype=np.int64)
+        order = np.argsort(hashes, kind="stable")
+        self.hashes, self.files = hashes[order], files[order]
+
+    def shared_counts(self, query: np.ndarray) -> np.ndarray:
+        """Number of the query's unique fingerprints each indexed file also has"""
+        query = np.unique(query)
+        start = np.searchsorted(self.hashes, query, side="left")
+        end = np.searchsorted(self.hashes, query, side="right")
+        lengths = end - start
+        # Every index row whose hash is in the query, without a Python loop over hashes
+        rows = np.repeat(start - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return np.bincount(self.files[rows], minlength=len(self.prints))
+
+
+def _line_ranges(lines: np.ndarray) -> List[Tuple[int, int]]:
+    lines = np.unique(lines)
+    if not len(lines):
+        return []
+    breaks = np.flatnonzero(np.diff(lines) > 1) + 1
+    return [(int(run[0]), int(run[-1])) for run in np.split(lines, breaks)]
+
+
+def diverged_lines(fp: Fingerprints, other: Fingerprints) -> List[Tuple[int, int]]:
+    """Line ranges of ``fp`` covered by fingerprints ``other`` lacks and by none it shares"""
+    shared = np.isin(fp.hashes, other.unique)
+    count = len(fp.token_lines)
+    coverage = []
+    for positions in (fp.positions[shared], fp.positions[~shared]):
+        marks = np.zeros(count + 1, dtype=np.int64)
+        np.add.at(marks, positions, 1)
+        np.add.at(marks, np.minimum(positions + fp.k, count), -1)
+        coverage.append(np.cumsum(marks[:count]) > 0)
+    return _line_ranges(fp.token_lines[coverage[1] & ~coverage[0]])
+
+
+def similarity(a: Fingerprints, b: Fingerprints) -> float:
+    """Jaccard similarity of the two fingerprint sets"""
+    ua, ub = a.unique, b.unique
+    union = len(np.union1d(ua, ub))
+    return len(np.intersect1d(ua, ub, assume_unique=True)) / union if union else 1.0
+
+
+def _literals(path: Path) -> Set[str]:
+    return {value for _, value, _, _ in scan_literals(read_swift_source(path), TEXT_SCANNER)}
+
+
+def drift_report(root: Path, base: str, target: str, k: int = DEFAULT_K, window: int = DEFAULT_WINDOW) -> dict:
+    """Per-file drift of ``target``'s Swift files against ``base``'s"""
+    table = TokenTable()
+    base_files = find_swift_files([root / base])
+    base_prints = [fingerprint_file(path, table, k, window) for path in base_files]
+    index = FingerprintIndex(base_prints)
+    by_name = {fp.path.name: fp for fp in base_prints}
+    catalog = read_existing_translations(str(root / base / "en.lproj" / "Localizable.strings"))
+
+    files = []
+    for path in find_swift_files([root / target]):
+        fp = fingerprint_file(path, table, k, window)
+        counts = index.shared_counts(fp.hashes)
+        best = int(np.argmax(counts)) if len(counts) else -1
+        entry = {
+            "file": str(path.relative_to(root)),
+            "fingerprints": len(fp.unique),
+            "best_match": str(base_prints[best].path.relative_to(root)) if best >= 0 and counts[best] else None,
+            "best_shared": int(counts[best]) if best >= 0 else 0,
+        }
+        counterpart = by_name.get(path.name)
+        if counterpart is not None:
+            ours, theirs = _literals(path), _literals(counterpart.path)
+            entry.update({
+                "counterpart": str(counterpart.path.relative_to(root)),
+                "similarity": round(similarity(fp, counterpart), 4),
+                "identical": path.read_bytes() == counterpart.path.read_bytes(),
+                "diverged": [list(r) for r in diverged_lines(fp, counterpart)],
+                "diverged_in_counterpart": [list(r) for r in diverged_lines(counterpart, fp)],
+                "strings_only_here": sorted(ours - theirs),
+            })
+        else:
+            ours = _literals(path)
+        if path.name not in SKIPPED_SWIFT_FILES:
+            entry["uncataloged_strings"] = sorted(s for s in ours if s not in catalog and len(s) > 1)
+        files.append(entry)
+    return {"base": base, "target": target, "k": k, "window": window, "files": files}
+
+
+def _format_ranges(ranges: List[List[int]], limit: int = 6) -> str:
+    text = ", ".join(f"{a}" if a == b else f"{a}-{b}" for a, b in ranges[:limit])
+    return text + (f" (+{len(ranges) - limit} more)" if len(ranges) > limit else "")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Report drift between Swift files shared by two targets")
+    parser.add_argument("target", nargs="?", default=DEFAULT_TARGETS[1], help="folder holding the copies (default: idol)")
+    parser.add_argument("--base", default=DEFAULT_TARGETS[0], help="folder holding the originals (default: NoteWall)")
+    parser.add_argument("--root", type=Path, default=root, help="repository root")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="tokens per hashed window")
+    parser.add_argument("-w", "--window", type=int, default=DEFAULT_WINDOW, help="winnowing window (hashes)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = drift_report(args.root, args.base, args.target, args.k, args.window)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"🧬 {args.target}/ vs {args.base}/ ({args.k}-token windows, winnowing window {args.window})")
+    for entry in report["files"]:
+        if "counterpart" not in entry:
+            match = f"closest: {entry['best_match']}" if entry["best_match"] else "no shared code"
+            print(f"\n   ❔ {entry['file']}: no {args.base}/ counterpart, {match}")
+            continue
+        mark = "✅" if entry["identical"] else ("⚠️ " if entry["similarity"] >= 0.5 else "❌")
+        print(f"\n   {mark} {entry['file']}: {entry['similarity']:.0%} similar to {entry['counterpart']}")
+        if entry["diverged"]:
+            print(f"      only here, lines {_format_ranges(entry['diverged'])}")
+        if entry["diverged_in_counterpart"]:
+            print(f"      only in {entry['counterpart']}, lines {_format_ranges(entry['diverged_in_counterpart'])}")
+        if entry["best_match"] != entry["counterpart"]:
+            print(f"      shares most code with {entry['best_match']}")
+        if entry.get("uncataloged_strings"):
+            print(f"      {len(entry['uncataloged_strings'])} Text() strings missing from the "
+                  f"{args.base} catalog")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Swift Literal Scanner
+Shared single-pass scanner for string literals in Swift sources, used by the
+localization extractor and the analytics tooling.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Pattern, Tuple
+
+import instrumentation
+
+# Body of a Swift string literal: anything but quotes/newlines, or an escape
+LITERAL_BODY = r'(?:[^"\\\n]|\\.)*'
+# Expression inside \( ), holding quoted strings and up to two levels of parentheses
+INTERPOLATION_EXPR = (r'(?:[^()"\n]|"' + LITERAL_BODY + r'"|\((?:[^()"\n]|"' + LITERAL_BODY
+                      + r'"|\([^()\n]*\))*\))*')
+# Literal body that also steps over \(...) interpolations holding quoted strings of their own
+INTERPOLATED_BODY = r'(?:[^"\\\n]|\\\(' + INTERPOLATION_EXPR + r'\)|\\.)*'
+
+
+def literal(kind: str, body: str = LITERAL_BODY) -> str:
+    """Regex for a quoted literal whose contents are captured as group ``kind``"""
+    return f'"(?P<{kind}>{body})"'
+
+
+def compile_scanner(patterns: Dict[str, str]) -> Pattern:
+    """Combine per-kind patterns into one alternation so a file is scanned once
+
+    Each pattern must contain exactly one named group, named after its kind
+    (build it with ``literal(kind)``), and no other capturing groups.
+    """
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns.values()))
+
+
+def read_swift_source(path) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    instrumentation.record_read(path)
+    return content
+
+
+def scan_literals(content: str, scanner: Pattern) -> Iterator[Tuple[str, str, int, int]]:
+    """Yield (kind, literal, line, column) for every match, in source order"""
+    line = 1
+    line_start = 0
+    last = 0
+    for match in scanner.finditer(content):
+        kind = match.lastgroup
+        start = match.start(kind)
+        # Count newlines incrementally instead of re-counting from the top
+        newlines = content.count("\n", last, start)
+        if newlines:
+            line += newlines
+            line_start = content.rfind("\n", last, start) + 1
+        last = start
+        yield kind, match.group(kind), line, start - line_start + 1
+
+
+def scan_file(path, scanner: Pattern) -> Iterator[Tuple[str, str, int, int]]:
+    return scan_literals(read_swift_source(path), scanner)
+
+
+def find_swift_files(roots: Iterable, exclude: Iterable[str] = ()) -> List[Path]:
+    """All .swift files under the given directories, sorted, minus excluded names"""
+    excluded = set(exclude)
+    files = []
+    for root in roots:
+        for path in Path(root).rglob("*.swift"):
+            if path.name not in excluded:
+                files.append(path)
+    return sorted(files)
@@ -0,0 +1,48 @@
+import json
+import struct
+
+from asset_audit import audit, inspect_imageset
+
+
+def write_png(path, width, height, padding=1000):
+    # Only the header is read; the padding stands in for the encoded pixels
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height)
+                     + b"\0" * padding)
+
+
+def make_imageset(tmp_path, name, renditions, empty_scales=()):
+    directory = tmp_path / f"{name}.imageset"
+    directory.mkdir()
+    images = []
+    for filename, scale, (width, height) in renditions:
+        write_png(directory / filename, width, height)
+        images.append({"idiom": "universal", "filename": filename, **({"scale": scale} if scale else {})})
+    images += [{"idiom": "universal", "scale": scale} for scale in empty_scales]
+    (directory / "Contents.json").write_text(json.dumps({"images": images}))
+    return inspect_imageset(directory)
+
+
+def over_resolution(imageset):
+    return [f for f in audit([imageset], {imageset.name}, set()) if f.kind == "over-resolution"]
+
+
+def test_lone_1x_rendition_is_limited_by_the_3x_screen(tmp_path):
+    # Shown on 3x screens as is: 1320x2868 px is the limit, not 440x956
+    fits = make_imageset(tmp_path, "mockup", [("mockup.png", "1x", (1290, 2796))], empty_scales=("2x", "3x"))
+    assert over_resolution(fits) == []
+
+    too_big = make_imageset(tmp_path, "mockup_dark", [("dark.png", "1x", (1892, 4300))], empty_scales=("2x", "3x"))
+    [finding] = over_resolution(too_big)
+    assert "up to 3x" in finding.message and "67%" in finding.message
+
+
+def test_universal_rendition_is_limited_by_the_3x_screen(tmp_path):
+    imageset = make_imageset(tmp_path, "backdrop", [("backdrop.png", None, (1320, 2868))])
+    assert over_resolution(imageset) == []
+
+
+def test_1x_slot_of_a_full_set_is_limited_by_1x_screens(tmp_path):
+    imageset = make_imageset(tmp_path, "logo", [("logo.png", "1x", (880, 880)), ("logo@2x.png", "2x", (880, 1912)),
+                                                 ("logo@3x.png", "3x", (1320, 2868))])
+    [finding] = over_resolution(imageset)
+    assert finding.message.startswith("logo.png is 880x880, shown at up to 1x")
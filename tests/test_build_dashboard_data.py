@@ -0,0 +1,44 @@
+import json
+
+from build_dashboard_data import SKETCH_SIZE, _bottom_k, _hash64, _sketch_count, build_dashboard_data
+
+HEADER = "Event Name,Time,Distinct ID,Country\n"
+
+
+def build(tmp_path):
+    summary = build_dashboard_data(str(tmp_path), str(tmp_path / "out" / "dashboard-data.json"))
+    data = json.loads((tmp_path / "out" / "dashboard-data.json").read_text())
+    return summary, data
+
+
+def opens(data, day):
+    return data["days"][day]["events"]["US"][data["events"].index("open")]
+
+
+def test_overlapping_exports_keep_every_row_once(tmp_path):
+    # Same day, partly overlapping: neither export alone has all the rows
+    rows = [f"open,{1771000000 + 60 * i},u{i % 4},US\n" for i in range(10)]
+    (tmp_path / "events-1.csv").write_text(HEADER + "".join(rows[:6]))
+    (tmp_path / "events-2.csv").write_text(HEADER + "".join(rows[3:]))
+    summary, data = build(tmp_path)
+    assert opens(data, "2026-02-13") == 10
+    assert data["distinct_users"] == [4]
+
+    # Unchanged exports reuse the cached overlap
+    assert build(tmp_path)[0]["recomputed_days"] == 0
+
+
+def test_identical_exports_are_not_double_counted(tmp_path):
+    rows = "".join(f"open,{1771000000 + 60 * i},u{i},US\n" for i in range(5))
+    (tmp_path / "events-1.csv").write_text(HEADER + rows)
+    (tmp_path / "events-2.csv").write_text(HEADER + rows)
+    _, data = build(tmp_path)
+    assert opens(data, "2026-02-13") == 5
+    assert data["distinct_users"] == [5]
+
+
+def test_sketch_is_exact_when_small_and_close_when_large():
+    small = _bottom_k(_hash64(f"u{i}") for i in range(SKETCH_SIZE - 1))
+    assert _sketch_count(small) == SKETCH_SIZE - 1
+    large = _bottom_k(_hash64(f"u{i}") for i in range(20000))
+    assert abs(_sketch_count(large) - 20000) < 20000 * 0.2
@@ -0,0 +1,80 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from build_settings import BuildSettingsError, load_build_settings
+
+PROJECT = Path(__file__).resolve().parent.parent / "NoteWall.xcodeproj" / "project.pbxproj"
+
+
+@pytest.fixture
+def project(tmp_path):
+    path = tmp_path / "NoteWall.xcodeproj" / "project.pbxproj"
+    path.parent.mkdir()
+    shutil.copy(PROJECT, path)
+    return path
+
+
+def test_set_round_trip(project):
+    settings = load_build_settings(project)
+    assert settings.set("SWIFT_VERSION", "6.0", targets=["NoteWall"], configs=["Release"]) == 1
+    assert settings.set("NOTEWALL_TEST_FLAG", "YES", targets=["NoteWall"]) == 2
+    assert settings.save()
+
+    reloaded = load_build_settings(project)
+    assert reloaded.get("NoteWall", "Release", "SWIFT_VERSION") == "6.0"
+    assert reloaded.get("NoteWall", "Debug", "SWIFT_VERSION") == settings.get("NoteWall", "Debug", "SWIFT_VERSION")
+    assert reloaded.get("NoteWall", "Debug", "NOTEWALL_TEST_FLAG") == "YES"
+    assert reloaded.get("NoteWall", "Release", "NOTEWALL_TEST_FLAG") == "YES"
+
+
+def test_unset_restores_original_text(project):
+    original = project.read_text(encoding="utf-8")
+    settings = load_build_settings(project)
+    settings.set("NOTEWALL_TEST_FLAG", "YES")
+    settings.save()
+
+    reloaded = load_build_settings(project)
+    assert reloaded.unset("NOTEWALL_TEST_FLAG") == len(reloaded.configurations)
+    reloaded.save()
+    assert project.read_text(encoding="utf-8") == original
+
+
+def test_unchanged_value_is_not_an_edit(project):
+    settings = load_build_settings(project)
+    current = settings.get("NoteWall", "Release", "SWIFT_VERSION", resolve=False)
+    assert settings.set("SWIFT_VERSION", current, targets=["NoteWall"], configs=["Release"]) == 0
+    assert not settings.save()
+
+
+def test_pin_round_trip(project):
+    settings = load_build_settings(project)
+    assert settings.set_package_requirement("superwall-ios", "exact", "4.2.0")
+    assert not settings.set_package_requirement("Superwall-iOS", "exact", "4.2.0")
+    settings.save()
+
+    reloaded = load_build_settings(project)
+    assert reloaded.packages()["Superwall-iOS"]["requirement"] == {"kind": "exactVersion", "version": "4.2.0"}
+    assert reloaded.packages()["mixpanel-swift"]["requirement"] == settings.packages()["mixpanel-swift"]["requirement"]
+
+    reloaded.set_package_requirement("Superwall-iOS", "versionRange", "4.0.0", "5.0.0")
+    reloaded.save()
+    assert load_build_settings(project).packages()["Superwall-iOS"]["requirement"] == {
+        "kind": "versionRange", "minimumVersion": "4.0.0", "maximumVersion": "5.0.0"}
+
+
+def test_pin_writes_keys_in_xcode_order(project):
+    settings = load_build_settings(project)
+    settings.set_package_requirement("Superwall-iOS", "branch", "main")
+    settings.save()
+    text = project.read_text(encoding="utf-8")
+    assert text.index("branch = main;") < text.index("kind = branch;")
+
+
+def test_unknown_package_and_configuration(project):
+    settings = load_build_settings(project)
+    with pytest.raises(BuildSettingsError):
+        settings.set_package_requirement("Alamofire", "exact", "5.0.0")
+    with pytest.raises(BuildSettingsError):
+        settings.set("SWIFT_VERSION", "6.0", configs=["Staging"])
@@ -0,0 +1,40 @@
+from event_anomaly import update
+
+HEADER = "Event Name,Time,Distinct ID,Country\n"
+
+
+def total(rolling):
+    return int(rolling.counts[[row for (_, country), row in rolling.series.items() if country == "*"]].sum())
+
+
+def test_last_line_without_newline_is_counted(tmp_path):
+    export = tmp_path / "events-export-1.csv"
+    export.write_text(HEADER + "open,1771000000,u1,US\nopen,1771000100,u2,DE")
+    rolling, read = update([export], tmp_path / "state.npz")
+    assert read[str(export)] == 2
+    assert total(rolling) == 2
+    # Nothing left to read: a rerun is a cache hit
+    assert update([export], tmp_path / "state.npz")[1][str(export)] == 0
+
+
+def test_cut_off_last_line_waits_for_the_rest(tmp_path):
+    export = tmp_path / "events-export-1.csv"
+    export.write_text(HEADER + "open,1771000000,u1,US\nopen,17710")
+    assert update([export], tmp_path / "state.npz")[1][str(export)] == 1
+
+    with open(export, "a") as f:
+        f.write("00100,u2,DE\nclose,1771000200,u2,DE\n")
+    rolling, read = update([export], tmp_path / "state.npz")
+    assert read[str(export)] == 2
+    assert total(rolling) == 3
+
+
+def test_overlapping_snapshots_are_counted_once(tmp_path):
+    rows = [f"open,{1771000000 + 60 * i},u{i},US\n" for i in range(10)]
+    first, second = tmp_path / "events-export-1.csv", tmp_path / "events-export-2.csv"
+    first.write_text(HEADER + "".join(rows[:6]))
+    second.write_text(HEADER + "".join(rows[3:]))
+    rolling, read = update([first, second], tmp_path / "state.npz")
+    assert (read[str(first)], read[str(second)]) == (6, 4)
+    assert total(rolling) == 10
+    assert rolling.overlapping == 3
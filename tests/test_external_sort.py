@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from external_sort import ExternalSorter
+
+
+def random_rows(count, seed=0):
+    rng = np.random.default_rng(seed)
+    users = rng.integers(0, 50, count).tolist()
+    # Coarse times so ties on (user, time) are broken by event
+    times = (rng.integers(0, 100, count) * 0.5).tolist()
+    events = rng.integers(0, 8, count).tolist()
+    return list(zip(users, times, events))
+
+
+@pytest.mark.parametrize("run_rows", [1_000_000, 97, 1])
+def test_sorted_rows_match_in_memory_sort(tmp_path, run_rows):
+    rows = random_rows(1500)
+    with ExternalSorter(run_rows=run_rows, temp_dir=str(tmp_path)) as sorter:
+        for row in rows:
+            sorter.add(*row)
+        result = list(sorter.sorted_rows())
+        stats = sorter.stats()
+    assert result == sorted(rows)
+    assert stats["rows"] == len(rows)
+    assert (stats["runs"] > 1) == (run_rows < len(rows))
+
+
+def test_temp_runs_are_removed(tmp_path):
+    with ExternalSorter(run_rows=10, temp_dir=str(tmp_path)) as sorter:
+        for row in random_rows(100):
+            sorter.add(*row)
+        list(sorter.sorted_rows())
+        assert any(tmp_path.iterdir())
+    assert not any(tmp_path.iterdir())
+
+
+def test_empty_sorter():
+    with ExternalSorter() as sorter:
+        assert list(sorter.sorted_rows()) == []
@@ -0,0 +1,67 @@
+import numpy as np
+
+from identity import AliasTable
+
+
+def reference_sets(size, pairs):
+    """Plain scalar union-find with the same earliest-root rule"""
+    parent = list(range(size))
+
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return [find(x) for x in range(size)]
+
+
+def test_union_matches_scalar_reference():
+    rng = np.random.default_rng(7)
+    for size, count in ((10, 4), (200, 150), (2000, 3000)):
+        table = AliasTable([f"id{i}" for i in range(size)])
+        a = rng.integers(0, size, count)
+        b = rng.integers(0, size, count)
+        merges = table.union(a, b)
+        expected = reference_sets(size, zip(a.tolist(), b.tolist()))
+        assert table.roots().tolist() == expected
+        assert merges == size - len(set(expected))
+
+
+def test_union_in_batches_matches_one_batch():
+    rng = np.random.default_rng(3)
+    a, b = rng.integers(0, 500, 800), rng.integers(0, 500, 800)
+    whole = AliasTable([str(i) for i in range(500)])
+    whole.union(a, b)
+    batched = AliasTable([str(i) for i in range(500)])
+    for start in range(0, 800, 64):
+        batched.union(a[start:start + 64], b[start:start + 64])
+    assert batched.roots().tolist() == whole.roots().tolist()
+
+
+def test_chains_collapse_to_earliest_id():
+    table = AliasTable()
+    table.add_pairs([("c", "d"), ("b", "c"), ("a", "b"), ("x", "y")])
+    assert table.set_count() == 2
+    assert sorted(map(sorted, table.groups())) == [["a", "b", "c", "d"], ["x", "y"]]
+    # IDs are interned pair by pair, so "c" is the earliest-seen ID of its set
+    assert {table.labels()[table.lookup[i]] for i in "abcd"} == {"c"}
+
+
+def test_labels_prefer_identified_ids():
+    table = AliasTable()
+    table.add_pairs([("$device:1", "user@example.com"), ("$device:1", "$device:2")])
+    labels = table.labels()
+    assert {labels[table.lookup[i]] for i in table.ids} == {"user@example.com"}
+
+
+def test_save_and_load(tmp_path):
+    table = AliasTable()
+    table.add_pairs([("a", "b"), ("c", "d"), ("b", "d")])
+    table.save(tmp_path / "aliases.npz")
+    loaded = AliasTable.load(tmp_path / "aliases.npz")
+    assert loaded.ids == table.ids
+    assert loaded.roots().tolist() == table.roots().tolist()
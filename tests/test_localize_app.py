@@ -0,0 +1,39 @@
+from localize_app import merge_locale
+
+ENGLISH = {"Done": "Done", "Next": "Next", "OK": "OK", "Welcome": "Welcome"}
+MEMORY = {"de": {"Next": "Weiter", "OK": "OK"}}
+
+
+def test_full_mode_keeps_every_key():
+    existing = {"Done": "Fertig", "Welcome": "Welcome"}
+    translations, missing = merge_locale("de", ENGLISH, existing, MEMORY)
+    assert translations == {"Done": "Fertig", "Next": "Weiter", "OK": "OK", "Welcome": "Welcome"}
+    assert missing == []
+
+
+def test_full_mode_falls_back_to_english():
+    translations, missing = merge_locale("de", ENGLISH, {}, MEMORY)
+    assert translations["Done"] == "Done"
+    assert translations["Welcome"] == "Welcome"
+    assert sorted(missing) == ["Done", "Welcome"]
+
+
+def test_delta_mode_only_writes_real_translations():
+    # "Welcome" = "Welcome" is an old English fallback. "OK" is the same in German by the
+    # memory: translated, but left to the English fallback like any identical text
+    existing = {"Done": "Fertig", "Welcome": "Welcome"}
+    translations, missing = merge_locale("de", ENGLISH, existing, MEMORY, delta=True)
+    assert translations == {"Done": "Fertig", "Next": "Weiter"}
+    assert missing == ["Welcome"]
+
+
+def test_existing_translation_wins_over_memory():
+    translations, _ = merge_locale("de", ENGLISH, {"Next": "Nächste"}, MEMORY, delta=True)
+    assert translations["Next"] == "Nächste"
+
+
+def test_english_is_the_key_set():
+    for delta in (False, True):
+        translations, missing = merge_locale("en", ENGLISH, {"Stale": "Stale"}, MEMORY, delta=delta)
+        assert translations == ENGLISH
+        assert missing == []
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pipeline
+from pipeline import Stage
+
+
+def make_stages(tmp_path: Path, calls: list):
+    source, middle, final = tmp_path / "source.txt", tmp_path / "middle.txt", tmp_path / "final.txt"
+
+    def build_middle(config, out):
+        calls.append("middle")
+        middle.write_text(source.read_text().upper())
+        print(f"wrote {middle.name}", file=out)
+
+    def build_final(config, out):
+        calls.append("final")
+        final.write_text(middle.read_text() + "!")
+
+    return [
+        Stage("middle", build_middle, inputs=lambda c: [source], outputs=lambda c: [middle]),
+        Stage("final", build_final, inputs=lambda c: [middle], outputs=lambda c: [final], deps=["middle"]),
+    ]
+
+
+def run(monkeypatch, tmp_path, stages, **kwargs):
+    monkeypatch.setattr(pipeline, "select_stages", lambda names: list(stages))
+    results = pipeline.run_pipeline({"root": tmp_path}, stamps_path=tmp_path / "stamps.json", **kwargs)
+    return {result["stage"]: result["status"] for result in results}
+
+
+def test_unchanged_inputs_skip(monkeypatch, tmp_path):
+    calls = []
+    stages = make_stages(tmp_path, calls)
+    (tmp_path / "source.txt").write_text("note")
+
+    assert run(monkeypatch, tmp_path, stages) == {"middle": "ran", "final": "ran"}
+    assert run(monkeypatch, tmp_path, stages) == {"middle": "skipped", "final": "skipped"}
+    assert calls == ["middle", "final"]
+    assert (tmp_path / "final.txt").read_text() == "NOTE!"
+
+
+def test_changed_input_reruns_stage_and_dependents(monkeypatch, tmp_path):
+    calls = []
+    stages = make_stages(tmp_path, calls)
+    (tmp_path / "source.txt").write_text("note")
+    run(monkeypatch, tmp_path, stages)
+
+    (tmp_path / "source.txt").write_text("wall")
+    assert run(monkeypatch, tmp_path, stages) == {"middle": "ran", "final": "ran"}
+    assert (tmp_path / "final.txt").read_text() == "WALL!"
+
+
+def test_edited_output_reruns_only_its_stage(monkeypatch, tmp_path):
+    calls = []
+    stages = make_stages(tmp_path, calls)
+    (tmp_path / "source.txt").write_text("note")
+    run(monkeypatch, tmp_path, stages)
+
+    (tmp_path / "final.txt").write_text("tampered")
+    assert run(monkeypatch, tmp_path, stages) == {"middle": "skipped", "final": "ran"}
+    assert (tmp_path / "final.txt").read_text() == "NOTE!"
+
+
+def test_force_and_dry_run(monkeypatch, tmp_path):
+    calls = []
+    stages = make_stages(tmp_path, calls)
+    (tmp_path / "source.txt").write_text("note")
+
+    assert run(monkeypatch, tmp_path, stages, dry_run=True) == {"middle": "stale", "final": "stale"}
+    assert calls == []
+    run(monkeypatch, tmp_path, stages)
+    assert run(monkeypatch, tmp_path, stages, force=True) == {"middle": "ran", "final": "ran"}
+    assert calls == ["middle", "final"] * 2
+
+
+def test_failed_stage_blocks_dependents(monkeypatch, tmp_path):
+    calls = []
+    stages = make_stages(tmp_path, calls)
+    # No source.txt: the first stage raises
+    assert run(monkeypatch, tmp_path, stages) == {"middle": "failed", "final": "blocked"}
+
+    (tmp_path / "source.txt").write_text("note")
+    assert run(monkeypatch, tmp_path, stages) == {"middle": "ran", "final": "ran"}
+
+
+def test_stage_output_goes_to_its_log(monkeypatch, tmp_path, capsys):
+    (tmp_path / "source.txt").write_text("note")
+    stages = make_stages(tmp_path, [])
+    monkeypatch.setattr(pipeline, "select_stages", lambda names: list(stages))
+    results = pipeline.run_pipeline({"root": tmp_path}, stamps_path=tmp_path / "stamps.json")
+    assert results[0]["log"] == "wrote middle.txt\n"
+    assert capsys.readouterr().out == ""
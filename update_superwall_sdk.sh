@@ -66,6 +66,10 @@ resolved_path.write_text(json.dumps(data, indent=2) + "\n")
 print("Updated" if updated else "No changes needed")
 PY
 
+echo "Raising the project's Superwall requirement to $LATEST_TAG..."
+python3 "$ROOT_DIR/build_settings.py" --project "$PROJECT_PATH/project.pbxproj" \
+  pin-package Superwall-iOS "$LATEST_TAG" --kind upToNextMajorVersion
+
 echo "Validating package resolution from lockfile..."
 xcodebuild -resolvePackageDependencies \
   -project "$PROJECT_PATH" \
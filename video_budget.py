@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Video Budget Checker
+Reads duration, resolution, codec, bitrate and faststart placement from the
+bundled MP4s and fails when a video is over its size or bitrate budget.
+
+Only box headers and the moov metadata are read; mdat (the media data) is
+skipped with a seek, so even multi-gigabyte files take milliseconds.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import struct
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import instrumentation
+
+BUDGETS_NAME = "video-budgets.json"
+VIDEO_EXTENSIONS = {".mp4", ".m4v", ".mov"}
+
+LFS_POINTER_PREFIX = b"version https://git-lfs.github.com/spec/"
+
+
+class MP4Error(ValueError):
+    pass
+
+
+@dataclass
+class Track:
+    kind: str
+    codec: str
+    duration: float
+    width: int = 0
+    height: int = 0
+    bytes: int = 0
+    samples: int = 0
+
+    @property
+    def bitrate(self) -> int:
+        return int(self.bytes * 8 / self.duration) if self.duration else 0
+
+
+@dataclass
+class VideoInfo:
+    path: str
+    size: int
+    duration: float = 0.0
+    width: int = 0
+    height: int = 0
+    codec: str = ""
+    bitrate: int = 0
+    faststart: bool = False
+    fragmented: bool = False
+    brand: str = ""
+    lfs_pointer: bool = False
+    tracks: List[Track] = field(default_factory=list)
+
+
+def iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payload offset, payload size) for the boxes in [start, end) of a file"""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            raise MP4Error(f"bad {box_type!r} box size {size} at offset {offset}")
+        yield box_type, offset + header_size, size - header_size
+        offset += size
+
+
+def _iter_children(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    # Same as iter_boxes, over an in-memory moov
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise MP4Error(f"bad {box_type!r} box size {size} inside moov")
+        yield box_type, offset + header_size, size - header_size
+        offset += size
+
+
+def _find(data: bytes, start: int, end: int, path: List[bytes]) -> Optional[Tuple[int, int]]:
+    """(offset, size) of the first box at the given path below [start, end)"""
+    for box_type, offset, size in _iter_children(data, start, end):
+        if box_type == path[0]:
+            if len(path) == 1:
+                return offset, size
+            found = _find(data, offset, offset + size, path[1:])
+            if found:
+                return found
+    return None
+
+
+def _duration(data: bytes, offset: int) -> Tuple[int, int]:
+    """(timescale, duration) from an mvhd or mdhd full box"""
+    version = data[offset]
+    if version == 1:
+        return struct.unpack_from(">IQ", data, offset + 4 + 16)
+    return struct.unpack_from(">II", data, offset + 4 + 8)
+
+
+def _parse_track(data: bytes, start: int, end: int) -> Optional[Track]:
+    mdhd = _find(data, start, end, [b"mdia", b"mdhd"])
+    hdlr = _find(data, start, end, [b"mdia", b"hdlr"])
+    stbl = _find(data, start, end, [b"mdia", b"minf", b"stbl"])
+    if not (mdhd and hdlr and stbl):
+        return None
+
+    timescale, duration = _duration(data, mdhd[0])
+    handler = data[hdlr[0] + 8:hdlr[0] + 12].decode("latin-1")
+    kind = {"vide": "video", "soun": "audio"}.get(handler, handler)
+    track = Track(kind=kind, codec="", duration=duration / timescale if timescale else 0.0)
+
+    stbl_start, stbl_end = stbl[0], stbl[0] + stbl[1]
+    stsd = _find(data, stbl_start, stbl_end, [b"stsd"])
+    if stsd and struct.unpack_from(">I", data, stsd[0] + 4)[0]:
+        # First sample entry: size, format, then for video a VisualSampleEntry
+        entry = stsd[0] + 8
+        track.codec = data[entry + 4:entry + 8].decode("latin-1")
+        if kind == "video":
+            track.width, track.height = struct.unpack_from(">HH", data, entry + 8 + 24)
+
+    stsz = _find(data, stbl_start, stbl_end, [b"stsz"])
+    if stsz:
+        sample_size, count = struct.unpack_from(">II", data, stsz[0] + 4)
+        track.samples = count
+        if sample_size:
+            track.bytes = sample_size * count
+        else:
+            table = stsz[0] + 12
+            track.bytes = sum(struct.unpack_from(f">{count}I", data, table))
+
+    if kind == "video" and not track.width:
+        tkhd = _find(data, start, end, [b"tkhd"])
+        if tkhd:
+            # Fixed-point 16.16 width/height close the tkhd box
+            width, height = struct.unpack_from(">II", data, tkhd[0] + tkhd[1] - 8)
+            track.width, track.height = width >> 16, height >> 16
+    return track
+
+
+def _lfs_pointer_size(f: BinaryIO) -> Optional[int]:
+    f.seek(0)
+    head = f.read(200)
+    if not head.startswith(LFS_POINTER_PREFIX):
+        return None
+    for line in head.decode("utf-8", "replace").splitlines():
+        if line.startswith("size "):
+            return int(line[5:])
+    return 0
+
+
+def inspect_video(path) -> VideoInfo:
+    """Box-level metadata for one MP4/MOV file"""
+    path = Path(path)
+    size = path.stat().st_size
+    info = VideoInfo(path=str(path), size=size)
+    with open(path, "rb") as f:
+        pointer_size = _lfs_pointer_size(f) if size < 1024 else None
+        if pointer_size is not None:
+            # Not checked out: only the size recorded in the LFS pointer is known
+            info.lfs_pointer = True
+            info.size = pointer_size
+            return info
+
+        moov = mdat = None
+        for box_type, offset, box_size in iter_boxes(f, 0, size):
+            if box_type == b"ftyp":
+                f.seek(offset)
+                info.brand = f.read(4).decode("latin-1")
+            elif box_type == b"moov" and moov is None:
+                moov = (offset, box_size)
+            elif box_type == b"mdat" and mdat is None:
+                mdat = offset
+            elif box_type == b"moof":
+                info.fragmented = True
+        if moov is None:
+            raise MP4Error(f"{path} has no moov box")
+
+        f.seek(moov[0])
+        data = f.read(moov[1])
+        instrumentation.record_read(path, moov[1])
+
+    info.faststart = mdat is None or moov[0] < mdat
+    mvhd = _find(data, 0, len(data), [b"mvhd"])
+    if mvhd:
+        timescale, duration = _duration(data, mvhd[0])
+        info.duration = duration / timescale if timescale else 0.0
+
+    for box_type, offset, box_size in _iter_children(data):
+        if box_type == b"trak":
+            track = _parse_track(data, offset, offset + box_size)
+            if track:
+                info.tracks.append(track)
+
+    video = next((t for t in info.tracks if t.kind == "video"), None)
+    if video:
+        info.width, info.height, info.codec = video.width, video.height, video.codec
+    if not info.duration and info.tracks:
+        info.duration = max(t.duration for t in info.tracks)
+    if info.duration:
+        info.bitrate = int(info.size * 8 / info.duration)
+    return info
+
+
+def load_budgets(path: Path) -> Dict[str, dict]:
+    """Budgets by file name pattern; "*" is the default for everything else"""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def budget_for(path: str, budgets: Dict[str, dict]) -> dict:
+    name = os.path.basename(path)
+    budget = dict(budgets.get("*", {}))
+    for pattern, values in budgets.items():
+        if pattern != "*" and fnmatch.fnmatch(name, pattern):
+            budget.update(values)
+    return budget
+
+
+def check_budget(info: VideoInfo, budget: dict) -> List[str]:
+    violations = []
+    if "max_bytes" in budget and info.size > budget["max_bytes"]:
+        violations.append(f"size {info.size} > {budget['max_bytes']} bytes")
+    if info.lfs_pointer:
+        return violations
+    if "max_kbps" in budget and info.bitrate > budget["max_kbps"] * 1000:
+        violations.append(f"bitrate {info.bitrate // 1000} > {budget['max_kbps']} kbps")
+    if "max_side" in budget and max(info.width, info.height) > budget["max_side"]:
+        violations.append(f"resolution {info.width}x{info.height} > {budget['max_side']} px on the long side")
+    if budget.get("require_faststart") and not info.faststart:
+        violations.append("moov is after mdat (not faststart)")
+    return violations
+
+
+def find_videos(paths: List[Path]) -> List[Path]:
+    videos = []
+    for path in paths:
+        if path.is_dir():
+            videos.extend(p for p in sorted(path.iterdir()) if p.suffix.lower() in VIDEO_EXTENSIONS)
+        else:
+            videos.append(path)
+    return videos
+
+
+def check_videos(paths: List[Path], budgets: Dict[str, dict]) -> List[dict]:
+    results = []
+    with instrumentation.stage("inspect videos"):
+        for path in find_videos(paths):
+            try:
+                info = inspect_video(path)
+            except (MP4Error, struct.error) as e:
+                results.append({"path": str(path), "error": str(e), "violations": [str(e)]})
+                continue
+            result = asdict(info)
+            result["violations"] = check_budget(info, budget_for(info.path, budgets))
+            results.append(result)
+    return results
+
+
+def main(argv=None) -> int:
+    root = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Check bundled videos against size and bitrate budgets")
+    parser.add_argument("paths", nargs="*", type=Path, default=[root / "NoteWall"],
+                        help="videos or folders of videos (default: NoteWall/)")
+    parser.add_argument("--budgets", type=Path, default=root / BUDGETS_NAME)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = check_videos(args.paths, load_budgets(args.budgets))
+    failed = [r for r in results if r["violations"]]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 1 if failed else 0
+
+    for r in results:
+        name = os.path.basename(r["path"])
+        if "error" in r:
+            print(f"❌ {name}: {r['error']}")
+            continue
+        if r["lfs_pointer"]:
+            print(f"⚠️  {name}: Git LFS pointer ({r['size']} bytes), not checked out")
+        else:
+            print(f"🎬 {name}: {r['width']}x{r['height']} {r['codec']}, {r['duration']:.1f}s, "
+                  f"{r['bitrate'] // 1000} kbps, {r['size']} bytes, "
+                  f"{'faststart' if r['faststart'] else 'moov at end'}")
+        for violation in r["violations"]:
+            print(f"   ❌ {violation}")
+
+    print(f"\n{'❌' if failed else '✅'} {len(failed)} of {len(results)} videos over budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())